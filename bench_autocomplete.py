@@ -0,0 +1,123 @@
+# bench_autocomplete.py — ranking quality + latency benchmark for AutocompleteEngine.search
+#
+#   python bench_autocomplete.py                     # 1x, 10x, 100x catalog
+#   python bench_autocomplete.py --scales 1,1000 --iterations 500
+#   python bench_autocomplete.py --json > bench_output.txt
+#
+# The catalog is the built-in task types plus a typical group rank ladder. Each
+# labelled query (prefixes, mid-word fragments and typos) names the label a
+# member meant; it is a "hit" when that label is among the first --top results.
+# Larger scales pad the catalog with distinct decoy labels built from the same
+# vocabulary, so the indexes grow without the intended answers changing.
+
+import argparse
+import json
+import random
+import time
+
+from main import TASK_TYPES, AutocompleteEngine
+from bench_guidelines import percentile
+
+GROUP_RANKS = [
+    "Medical Student", "Nurse", "Senior Nurse", "Paramedic", "Resident", "Senior Resident",
+    "Doctor", "Senior Doctor", "Surgeon", "Head Surgeon", "Medical Director",
+    "Assistant Chief Medical Officer", "Chief Medical Officer",
+]
+
+LABELLED_QUERIES: list[tuple[str, str]] = [
+    # (what the member typed, label they meant)
+    ("check", "Checkup"),
+    ("chekup", "Checkup"),
+    ("anomaly chek", "Anomaly Checkup"),
+    ("anomoly test", "Anomaly Test"),
+    ("post op", "Post-Op Interview"),
+    ("postop intervew", "Post-Op Interview"),
+    ("intervw", "Interview"),
+    ("pharmcy", "Pharmacy"),
+    ("recruit", "Department of Medical Sciences Recruitment"),
+    ("recrutment", "Department of Medical Sciences Recruitment"),
+    ("ckup", "Checkup"),
+    ("surgon", "Surgeon"),
+    ("head surg", "Head Surgeon"),
+    ("cheif medical", "Chief Medical Officer"),
+    ("paramdic", "Paramedic"),
+    ("sr nurse", "Senior Nurse"),
+    ("med director", "Medical Director"),
+    ("resdent", "Resident"),
+]
+
+DECOY_WORDS = [
+    "Ward", "Triage", "Lab", "Shift", "Clinic", "Review", "Audit", "Training", "Patrol",
+    "Research", "Supply", "Night", "Escort", "Briefing", "Drill", "Inventory",
+]
+
+
+def build_catalog(scale: int) -> list[str]:
+    labels = list(TASK_TYPES) + GROUP_RANKS
+    rng = random.Random(scale)
+    seen = {label.casefold() for label in labels}
+    target = len(labels) * max(1, scale)
+    while len(labels) < target:
+        label = f"{rng.choice(DECOY_WORDS)} {rng.choice(DECOY_WORDS)} {len(labels)}"
+        if label.casefold() not in seen:
+            seen.add(label.casefold())
+            labels.append(label)
+    return labels
+
+
+def run_scale(labels: list[str], iterations: int, top: int) -> dict:
+    start = time.perf_counter()
+    engine = AutocompleteEngine(labels)
+    build_ms = (time.perf_counter() - start) * 1000
+    latencies_us: list[float] = []
+    hits = 0
+    misses: list[str] = []
+    for query, expected in LABELLED_QUERIES:
+        results: list[str] = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            results = engine.search(query)
+            latencies_us.append((time.perf_counter() - start) * 1_000_000)
+        if expected in results[:top]:
+            hits += 1
+        else:
+            misses.append(f"{query!r} -> {expected} (got {results[:top]})")
+    return {
+        "labels": len(labels),
+        "build_ms": build_ms,
+        "queries": len(LABELLED_QUERIES),
+        "hit_rate": hits / len(LABELLED_QUERIES),
+        "p50_us": percentile(latencies_us, 50),
+        "p99_us": percentile(latencies_us, 99),
+        "misses": misses,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark AutocompleteEngine ranking quality and latency.")
+    parser.add_argument("--scales", default="1,10,100", help="Comma-separated catalog size multipliers")
+    parser.add_argument("--iterations", type=int, default=200, help="search calls per query")
+    parser.add_argument("--top", type=int, default=5, help="a query hits when its label is in the first N results")
+    parser.add_argument("--json", action="store_true", help="Emit machine-readable JSON instead of a table")
+    args = parser.parse_args()
+
+    scales = [int(part) for part in args.scales.split(",") if part.strip()]
+    results = {scale: run_scale(build_catalog(scale), max(1, args.iterations), max(1, args.top)) for scale in scales}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'scale':>5} {'labels':>7} {'build ms':>8} {'hit rate':>8} {'p50 us':>8} {'p99 us':>8}")
+    for scale, r in results.items():
+        print(
+            f"{scale:>5} {r['labels']:>7} {r['build_ms']:>8.1f} {r['hit_rate']:>8.0%} "
+            f"{r['p50_us']:>8.1f} {r['p99_us']:>8.1f}"
+        )
+    for scale, r in results.items():
+        for miss in r["misses"]:
+            print(f"[x{scale}] miss: {miss}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# bench_guidelines.py — retrieval quality + latency benchmark for GuidelineStore.build_context
+#
+#   python bench_guidelines.py                      # 1x, 4x, 16x handbook
+#   python bench_guidelines.py --scales 1,64 --iterations 200
+#   python bench_guidelines.py --json > bench_output.txt
+#
+# Each labelled question names a marker: a short phrase that only appears in the
+# handbook section that should answer it. A question is a "hit" when that phrase
+# makes it into the context that would be sent to the model. A second, smaller
+# set checks classify_message(), which decides whether a message is answered at
+# all, including plurals and other inflections of the word lists.
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from main import GUIDELINES_FILE, GuidelineStore, classify_message
+
+LABELLED_QUESTIONS: list[tuple[str, str, str]] = [
+    # (question, expected section, marker text inside that section)
+    ("How do I file an LOA?", "Activity Quota §2 Exceptions", "Leave of Absence (LoA)"),
+    ("Am I excused from quota if I'm on leave?", "Activity Quota §2 Exceptions", "Leave of Absence (LoA)"),
+    ("When does the weekly quota reset?", "Activity Quota §1 Overview", "Quota resets weekly"),
+    ("What is the quota for regular members?", "Activity Quota §3 Member Quota", "2 miscellaneous departmental tasks"),
+    ("What quota do management have to do?", "Activity Quota §4 Management", "§4 | Management/Executive Quota"),
+    ("How do I use the cure cart?", "Utilities — Cure Cart", "Portable cure station"),
+    ("where is the cart and what does it do", "Utilities — Cure Cart", "Portable cure station"),
+    ("What are the disciplinary codes?", "Disciplinary §2 Codes", "§2 | Disciplinary Codes"),
+    ("What counts as a class felony?", "Disciplinary §6 Felonies", "§6 | Class Felonies"),
+    ("What happens if I get a class infraction?", "Disciplinary §4 Infractions", "§4 | Class Infractions"),
+    ("How do I run a Class-D checkup?", "Checkups §2 Class-D Procedure", "§2 | Class-D Checkup Procedure"),
+    ("How do I log a foundation personnel checkup?", "Checkups §5 Personnel Log", "§5 | Foundation Personnel Checkup Log"),
+    ("What is the procedure for an anomaly checkup?", "Anomaly Checkups §2 Procedure", "Go to SCP containment"),
+    ("How do post-op interviews work?", "Interviews §3 Post-Op", "§3 | Post-Op Interviews"),
+    ("How does the recruitment booth work?", "Recruitment Booth §2 Procedure", "Staff Interface booth"),
+    ("What's the dress code on site?", "Conduct §2 General Expectations", "dress code"),
+    ("How do marks and deductions work in grading?", "Grading §2 Marks", "§2 | Marks and Deductions"),
+    ("What do I need to become a nurse?", "Promotion Level 1 Nurse", "LEVEL 1 | NURSE"),
+    ("how do i use the MRI", "Utilities — MRI", "MRI"),
+]
+
+
+LABELLED_MESSAGES: list[tuple[str, tuple[bool, bool, bool]]] = [
+    # (message, expected (is_question, mentions_keyword, has_troll_word))
+    ("any promotions coming up soon?", (True, True, False)),
+    ("how do ranks work here", (True, True, False)),
+    ("who reads the logs we send", (True, True, False)),
+    ("when are the weekly reports posted", (True, True, False)),
+    ("i logged my checkups yesterday", (False, True, False)),
+    ("idiots, the lot of you", (False, False, True)),
+    ("stop trolling the clinic", (False, True, True)),
+    ("what island is the site on", (True, False, False)),
+    ("thanks everyone, see you tomorrow", (False, False, False)),
+]
+
+
+def run_traits() -> dict:
+    misses = [
+        f"{message!r} -> {classify_message(message)} (expected {expected})"
+        for message, expected in LABELLED_MESSAGES
+        if classify_message(message) != expected
+    ]
+    return {"messages": len(LABELLED_MESSAGES), "hit_rate": 1 - len(misses) / len(LABELLED_MESSAGES), "misses": misses}
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    k = max(0, min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def scaled_store(source: Path, scale: int, workdir: Path) -> GuidelineStore:
+    """Load ``scale`` concatenated copies of the handbook, each with distinct headings."""
+    if scale <= 1:
+        return GuidelineStore(str(source))
+    raw = source.read_text(encoding="utf-8")
+    copies = [raw]
+    for copy in range(2, scale + 1):
+        # Re-title headings so each copy parses into its own sections.
+        copies.append("\n".join(
+            f"{line} (copy {copy})" if line.startswith(("PART ", "§", "LEVEL ")) else line
+            for line in raw.splitlines()
+        ))
+    path = workdir / f"guidelines_x{scale}.txt"
+    path.write_text("\n---\n".join(copies), encoding="utf-8")
+    return GuidelineStore(str(path))
+
+
+def run_scale(store: GuidelineStore, iterations: int) -> dict:
+    latencies_ms: list[float] = []
+    hits = 0
+    misses: list[str] = []
+    context_chars: list[int] = []
+    for question, expected, marker in LABELLED_QUESTIONS:
+        context = ""
+        for _ in range(iterations):
+            start = time.perf_counter()
+            context = store.build_context(question)
+            latencies_ms.append((time.perf_counter() - start) * 1000)
+        context_chars.append(len(context))
+        if marker.casefold() in context.casefold():
+            hits += 1
+        else:
+            misses.append(f"{question!r} -> {expected}")
+    mean_chars = statistics.fmean(context_chars) if context_chars else 0.0
+    return {
+        "sections": len(store.sections),
+        "questions": len(LABELLED_QUESTIONS),
+        "hit_rate": hits / len(LABELLED_QUESTIONS),
+        "p50_ms": percentile(latencies_ms, 50),
+        "p99_ms": percentile(latencies_ms, 99),
+        "mean_context_chars": mean_chars,
+        # ~4 characters per token is the usual rule of thumb for English prose.
+        "mean_context_tokens": mean_chars / 4,
+        "misses": misses,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark GuidelineStore retrieval quality and latency.")
+    parser.add_argument("--file", default=GUIDELINES_FILE, help="Handbook file (default: GUIDELINES_FILE)")
+    parser.add_argument("--scales", default="1,4,16", help="Comma-separated handbook copy counts")
+    parser.add_argument("--iterations", type=int, default=50, help="build_context calls per question")
+    parser.add_argument("--json", action="store_true", help="Emit machine-readable JSON instead of a table")
+    args = parser.parse_args()
+
+    source = Path(args.file)
+    if not source.is_absolute():
+        source = Path(__file__).resolve().parent / source
+    scales = [int(part) for part in args.scales.split(",") if part.strip()]
+
+    results: dict[int, dict] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in scales:
+            store = scaled_store(source, scale, Path(tmp))
+            if not store.loaded:
+                raise SystemExit(f"Could not load guidelines from {source}")
+            results[scale] = run_scale(store, max(1, args.iterations))
+
+    traits = run_traits()
+
+    if args.json:
+        print(json.dumps({"retrieval": results, "classification": traits}, indent=2))
+        return
+
+    print(f"{'scale':>5} {'sections':>8} {'hit rate':>8} {'p50 ms':>8} {'p99 ms':>8} {'ctx chars':>9} {'ctx tok':>7}")
+    for scale, r in results.items():
+        print(
+            f"{scale:>5} {r['sections']:>8} {r['hit_rate']:>8.0%} {r['p50_ms']:>8.3f} {r['p99_ms']:>8.3f} "
+            f"{r['mean_context_chars']:>9.0f} {r['mean_context_tokens']:>7.0f}"
+        )
+    for scale, r in results.items():
+        for miss in r["misses"]:
+            print(f"[x{scale}] miss: {miss}")
+    print(f"classification: {traits['hit_rate']:.0%} of {traits['messages']} messages")
+    for miss in traits["misses"]:
+        print(f"[classify] miss: {miss}")
+
+
+if __name__ == "__main__":
+    main()
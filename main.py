@@ -14,11 +14,26 @@ from discord import app_commands
 import asyncio
 from urllib.parse import urlparse
 import json
+import contextlib
+import csv
+import gzip
+import hashlib
+import io
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import OrderedDict, deque
 from pathlib import Path
 import re
-from typing import Optional, Any
+import time
+from typing import Optional, Any, Awaitable, Callable
 from discord.utils import escape_markdown
 
+try:  # optional: without Pillow, proofs still get exact (SHA-256) duplicate checks
+    from PIL import Image
+except ImportError:
+    Image = None
+
 # === Configuration ===
 load_dotenv()
 
@@ -47,6 +62,11 @@ COMMS_CHANNEL_ID             = getenv_int("COMMS_CHANNEL_ID")
 PROMOTION_ALERT_CHANNEL_ID   = getenv_int("PROMOTION_ALERT_CHANNEL_ID")
 # DB / API
 DATABASE_URL   = os.getenv("DATABASE_URL")
+# Optional streaming replica for heavy read-only commands; falls back to the
+# primary when unreachable or lagging by more than REPLICA_MAX_LAG_SECONDS.
+DATABASE_REPLICA_URL   = os.getenv("DATABASE_REPLICA_URL") or None
+REPLICA_MAX_LAG_SECONDS = int(os.getenv("REPLICA_MAX_LAG_SECONDS", "10"))
+REPLICA_LAG_CHECK_SECONDS = 5
 API_SECRET_KEY = os.getenv("API_SECRET_KEY")  # for /roblox webhook auth
 
 # AI (application review)
@@ -55,6 +75,20 @@ AI_MODEL       = os.getenv("AI_MODEL", "gpt-4o-mini")
 AI_BASE_URL    = os.getenv("AI_BASE_URL", "https://api.openai.com/v1")
 GUIDELINES_FILE = os.getenv("GUIDELINES_FILE", "resources/guidelines.json")
 
+# Automatic guideline answers (opt-in per channel). Buckets are "burst, then N per hour".
+GUIDELINES_AUTO_CHANNEL_IDS = {
+    int(part) for part in (os.getenv("GUIDELINES_AUTO_CHANNEL_IDS") or "").replace(" ", "").split(",") if part.isdigit()
+}
+GUIDELINES_AUTO_USER_BURST       = int(os.getenv("GUIDELINES_AUTO_USER_BURST", "2"))
+GUIDELINES_AUTO_USER_PER_HOUR    = int(os.getenv("GUIDELINES_AUTO_USER_PER_HOUR", "6"))
+GUIDELINES_AUTO_CHANNEL_BURST    = int(os.getenv("GUIDELINES_AUTO_CHANNEL_BURST", "5"))
+GUIDELINES_AUTO_CHANNEL_PER_HOUR = int(os.getenv("GUIDELINES_AUTO_CHANNEL_PER_HOUR", "30"))
+GUIDELINES_AUTO_MAX_CHARS        = int(os.getenv("GUIDELINES_AUTO_MAX_CHARS", "600"))
+
+# Per-member guideline context + rank cache
+MEMBER_PROFILE_CACHE_SIZE = int(os.getenv("MEMBER_PROFILE_CACHE_SIZE", "2000"))
+MEMBER_PROFILE_CACHE_TTL  = int(os.getenv("MEMBER_PROFILE_CACHE_TTL", "900"))  # seconds
+
 # Tokens that should be expanded with extra context-specific synonyms when
 # members use shorthand in their questions.
 GUIDELINE_TOKEN_HINTS: dict[str, set[str]] = {
@@ -81,11 +115,37 @@ ROBLOX_REMOVE_SECRET = os.getenv("ROBLOX_REMOVE_SECRET") or None
 ROBLOX_GROUP_ID      = os.getenv("ROBLOX_GROUP_ID") or "745163328"  # optional, forwarded if present
 # Rank manager role (can run /rank)
 RANK_MANAGER_ROLE_ID = getenv_int("RANK_MANAGER_ROLE_ID", 1405979816120942702)
+# /rank autocomplete serves a cached copy of the group's ranks, refreshed in the background.
+GROUP_RANKS_TTL_SECONDS = int(os.getenv("GROUP_RANKS_TTL_SECONDS", "600"))
 
 # Weekly configs
 WEEKLY_TEST_REQUIREMENT = int(os.getenv("WEEKLY_TEST_REQUIREMENT", "1"))
 WEEKLY_MISC_REQUIREMENT = int(os.getenv("WEEKLY_MISC_REQUIREMENT", "2"))
 WEEKLY_TIME_REQUIREMENT = int(os.getenv("WEEKLY_TIME_REQUIREMENT", "20"))  # minutes
+# The in-memory weekly totals are rebuilt from the database this often, which
+# also picks up writes made by other instances.
+WEEKLY_STORE_RECONCILE_SECONDS = int(os.getenv("WEEKLY_STORE_RECONCILE_SECONDS", "300"))
+
+# task_logs is range-partitioned by month; keep this many future months pre-created.
+TASK_LOG_PARTITIONS_AHEAD = int(os.getenv("TASK_LOG_PARTITIONS_AHEAD", "3"))
+
+# proof_url/comments older than this move to task_log_payloads (0 disables).
+TASK_LOG_PAYLOAD_RETENTION_DAYS = int(os.getenv("TASK_LOG_PAYLOAD_RETENTION_DAYS", "180"))
+
+# Post-commit side effects (log embeds, audit log, promotion checks) run in the
+# background with at most this many in flight.
+SIDE_EFFECT_CONCURRENCY = int(os.getenv("SIDE_EFFECT_CONCURRENCY", "4"))
+SIDE_EFFECT_MAX_ATTEMPTS = 4
+
+# Proof attachments are fingerprinted after logging to flag re-used screenshots,
+# in their own queue so slow downloads never hold up a member's log embed.
+# Only files up to PROOF_HASH_MAX_BYTES are decoded for the perceptual hash.
+PROOF_HASH_WORKERS   = int(os.getenv("PROOF_HASH_WORKERS", "2"))
+PROOF_HASH_MAX_BYTES = int(os.getenv("PROOF_HASH_MAX_BYTES", str(10 * 1024 * 1024)))
+
+# Singleton jobs run on one elected instance; followers retry (and the leader
+# health-checks its lock session) this often.
+LEADER_RENEW_SECONDS = int(os.getenv("LEADER_RENEW_SECONDS", "15"))
 
 # === Bot Setup ===
 intents = discord.Intents.default()
@@ -163,6 +223,26 @@ def week_key(dt: datetime.datetime | None = None) -> str:
     iso = d.isocalendar()  # (year, week, weekday)
     return f"{iso.year}-W{iso.week:02d}"
 
+# The quota week runs Sunday 04:00 UTC -> Sunday 04:00 UTC. Shifting by the
+# remaining 20 hours makes that window line up with an ISO week, so a task's
+# quota week is simply the ISO week of (timestamp + shift).
+QUOTA_RESET_HOUR = 4
+QUOTA_WEEK_SHIFT = datetime.timedelta(hours=24 - QUOTA_RESET_HOUR)
+
+def quota_week_key(dt: datetime.datetime | None = None) -> str:
+    return week_key((dt or utcnow()) + QUOTA_WEEK_SHIFT)
+
+def quota_day(dt: datetime.datetime | None = None) -> datetime.date:
+    """Shifted UTC date whose Monday..Sunday run matches the quota week (SQL twin: md_quota_day)."""
+    return ((dt or utcnow()) + QUOTA_WEEK_SHIFT).astimezone(datetime.timezone.utc).date()
+
+def quota_week_bounds(key: str) -> tuple[datetime.datetime, datetime.datetime]:
+    """Return the [start, end) UTC datetimes of a quota week key such as ``2024-W07``."""
+    year, week = key.split("-W")
+    monday = datetime.datetime.fromisocalendar(int(year), int(week), 1).replace(tzinfo=datetime.timezone.utc)
+    start = monday - QUOTA_WEEK_SHIFT
+    return start, start + datetime.timedelta(days=7)
+
 def pretty_date(dt: datetime.datetime) -> str:
     day = dt.day
     if 10 <= day % 100 <= 20:
@@ -234,39 +314,183 @@ TROLL_KEYWORDS = {
 }
 
 
+QUESTION_WORDS = {
+    "who",
+    "what",
+    "when",
+    "where",
+    "why",
+    "how",
+    "can",
+    "does",
+    "do",
+    "should",
+    "is",
+    "are",
+    "will",
+    "could",
+    "would",
+    "may",
+}
+
+
+def _alternation(words: set[str]) -> str:
+    # Longest first so multi-word phrases win over their prefixes.
+    return "|".join(re.escape(word) for word in sorted(words, key=lambda w: (-len(w), w)))
+
+
+# One precompiled pass classifies a message against every word list at once.
+# Callers lowercase first; that is measurably cheaper than re.IGNORECASE here.
+# Troll words match anywhere, as a plain substring test would; topic keywords
+# match at a word start with any suffix ("promotions", "logged"); question
+# words must be whole words ("is" but not "island").
+MESSAGE_TRAIT_PATTERN = re.compile(
+    r"(?P<mark>\?)"
+    rf"|(?P<troll>{_alternation(TROLL_KEYWORDS)})"
+    rf"|\b(?P<keyword>(?:{_alternation(QUESTION_KEYWORDS)})\w*)"
+    rf"|\b(?P<qword>{_alternation(QUESTION_WORDS)})\b"
+)
+
+
+def classify_message(text: str) -> tuple[bool, bool, bool]:
+    """Return ``(is_question, mentions_keyword, has_troll_word)`` from a single regex scan."""
+    question = keyword = troll = False
+    for match in MESSAGE_TRAIT_PATTERN.finditer(text.lower()):
+        group = match.lastgroup
+        if group == "troll":
+            troll = True
+        elif group == "keyword":
+            keyword = True
+        else:
+            question = True
+        if question and keyword and troll:
+            break
+    return question, keyword, troll
+
+
 def looks_like_question(text: str) -> bool:
-    lower = text.lower()
-    if "?" in text:
-        return True
-    question_words = {
-        "who",
-        "what",
-        "when",
-        "where",
-        "why",
-        "how",
-        "can",
-        "does",
-        "do",
-        "should",
-        "is",
-        "are",
-        "will",
-        "could",
-        "would",
-        "may",
-    }
-    tokens = set(re.findall(r"[a-zA-Z]+", lower))
-    return bool(tokens & question_words)
+    return classify_message(text)[0]
 
 
 def is_probably_troll(text: str) -> bool:
-    lower = text.lower()
-    if len(lower) < 8:
+    if len(text) < 8:
+        return True
+    if sum(ch.isalpha() for ch in text) < 4:
         return True
-    if sum(ch.isalpha() for ch in lower) < 4:
+    return classify_message(text)[2]
+
+
+class TokenBucket:
+    """Classic token bucket: ``capacity`` tokens, refilled continuously at ``rate`` per second."""
+
+    __slots__ = ("capacity", "rate", "tokens", "updated")
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def available(self) -> bool:
+        self._refill(time.monotonic())
+        return self.tokens >= 1.0
+
+    def is_full(self) -> bool:
+        self._refill(time.monotonic())
+        return self.tokens >= self.capacity
+
+    def consume(self) -> bool:
+        self._refill(time.monotonic())
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
         return True
-    return any(keyword in lower for keyword in TROLL_KEYWORDS)
+
+
+class TokenBucketRegistry:
+    """Keyed token buckets that forget idle keys so memory stays bounded."""
+
+    def __init__(self, burst: int, per_hour: int, max_keys: int = 5000):
+        self.burst = max(1, burst)
+        self.rate = max(0, per_hour) / 3600.0
+        self.max_keys = max_keys
+        self.buckets: dict[int, TokenBucket] = {}
+
+    def get(self, key: int) -> TokenBucket:
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            if len(self.buckets) >= self.max_keys:
+                self.prune()
+            bucket = self.buckets[key] = TokenBucket(self.burst, self.rate)
+        return bucket
+
+    def prune(self) -> None:
+        # A full bucket behaves exactly like a fresh one, so it is safe to drop.
+        for key in [k for k, b in self.buckets.items() if b.is_full()]:
+            del self.buckets[key]
+
+
+class MemberProfileCache:
+    """Bounded LRU of per-member guideline context and resolved rank.
+
+    Each field is cached independently with its own TTL; ``None`` is a valid
+    cached value (no saved context), so misses are signalled with a flag.
+    """
+
+    _UNSET = object()
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max(1, max_entries)
+        self.ttl = max(1, ttl_seconds)
+        # member_id -> [context, context_expires, rank, rank_expires]
+        self.entries: OrderedDict[int, list[Any]] = OrderedDict()
+
+    def _entry(self, member_id: int) -> list[Any]:
+        entry = self.entries.get(member_id)
+        if entry is None:
+            entry = self.entries[member_id] = [self._UNSET, 0.0, self._UNSET, 0.0]
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        else:
+            self.entries.move_to_end(member_id)
+        return entry
+
+    def _get(self, member_id: int, slot: int) -> tuple[bool, Any]:
+        entry = self.entries.get(member_id)
+        if entry is None or entry[slot] is self._UNSET or entry[slot + 1] < time.monotonic():
+            return False, None
+        self.entries.move_to_end(member_id)
+        return True, entry[slot]
+
+    def _put(self, member_id: int, slot: int, value: Any) -> None:
+        entry = self._entry(member_id)
+        entry[slot] = value
+        entry[slot + 1] = time.monotonic() + self.ttl
+
+    def get_context(self, member_id: int) -> tuple[bool, str | None]:
+        return self._get(member_id, 0)
+
+    def put_context(self, member_id: int, details: str | None) -> None:
+        self._put(member_id, 0, details)
+
+    def get_rank(self, member_id: int) -> tuple[bool, str | None]:
+        return self._get(member_id, 2)
+
+    def put_rank(self, member_id: int, rank_name: str) -> None:
+        self._put(member_id, 2, rank_name)
+
+    def invalidate_rank(self, member_id: int) -> None:
+        entry = self.entries.get(member_id)
+        if entry is not None:
+            entry[2] = self._UNSET
+
+    def invalidate(self, member_id: int) -> None:
+        self.entries.pop(member_id, None)
 
 
 class GuidelineStore:
@@ -443,17 +667,58 @@ class GuidelineStore:
         return combined[:limit_chars]
 
 
-async def send_long_embed(target, title, description, color, footer_text, author_name=None, author_icon_url=None, image_url=None):
+def build_long_embeds(title, description, color, footer_text, author_name=None, author_icon_url=None, image_url=None) -> list[discord.Embed]:
     chunks = smart_chunk(description)
     embed = discord.Embed(title=title, description=chunks[0], color=color, timestamp=utcnow())
     if footer_text: embed.set_footer(text=footer_text)
     if author_name: embed.set_author(name=author_name, icon_url=author_icon_url)
     if image_url: embed.set_image(url=image_url)
-    await target.send(embed=embed)
+    embeds = [embed]
     for i, chunk in enumerate(chunks[1:], start=2):
         follow_up = discord.Embed(description=chunk, color=color)
         follow_up.set_footer(text=f"Part {i}/{len(chunks)}")
-        await target.send(embed=follow_up)
+        embeds.append(follow_up)
+    return embeds
+
+
+async def send_long_embed(target, title, description, color, footer_text, author_name=None, author_icon_url=None, image_url=None):
+    for embed in build_long_embeds(title, description, color, footer_text, author_name, author_icon_url, image_url):
+        await target.send(embed=embed)
+
+
+class ResumableSend:
+    """A pipeline job that sends ``embeds`` in order; a retry resumes at the first one not yet sent."""
+
+    def __init__(self, target, embeds: list[discord.Embed]):
+        self.target = target
+        self.embeds = embeds
+        self.messages: list[discord.Message] = []
+
+    async def __call__(self) -> None:
+        while len(self.messages) < len(self.embeds):
+            self.messages.append(await self.target.send(embed=self.embeds[len(self.messages)]))
+
+    async def flag(self, warning: str, color: discord.Color) -> None:
+        """Prepend ``warning`` to the first embed, editing the posted message if it already went out.
+
+        Submit it to the same pipeline key after this job, so it runs once the send is done.
+        """
+        first = self.embeds[0]
+        if not (first.description or "").startswith(warning):
+            first.description = f"{warning}\n\n{first.description or ''}"
+        first.colour = color
+        if self.messages:
+            await self.messages[0].edit(embed=first)
+
+
+async def send_ephemeral_embeds(interaction: discord.Interaction, title: str, description: str, color: discord.Color):
+    """Like send_long_embed, but as ephemeral follow-ups to a deferred interaction."""
+    chunks = smart_chunk(description)
+    for i, chunk in enumerate(chunks, start=1):
+        embed = discord.Embed(title=title if i == 1 else None, description=chunk, color=color, timestamp=utcnow())
+        if len(chunks) > 1:
+            embed.set_footer(text=f"Part {i}/{len(chunks)}")
+        await interaction.followup.send(embed=embed, ephemeral=True)
 
 
 def parse_embed_color(raw: str | None) -> discord.Color | None:
@@ -499,6 +764,10 @@ async def log_action(title: str, description: str):
     embed = discord.Embed(title=title, description=description, color=discord.Color.dark_gray(), timestamp=utcnow())
     await ch.send(embed=embed)
 
+def is_management(user: discord.abc.User) -> bool:
+    """Whether ``user`` holds the management role; nobody does when it is not configured."""
+    return bool(MANAGEMENT_ROLE_ID) and any(r.id == MANAGEMENT_ROLE_ID for r in getattr(user, "roles", []))
+
 def find_member(discord_id: int) -> Optional[discord.Member]:
     for g in bot.guilds:
         m = g.get_member(discord_id)
@@ -762,288 +1031,1864 @@ class SimpleOpenAI:
                 return data["choices"][0]["message"]["content"].strip()
 
 
-# === Bot class ===
-class MD_BOT(commands.Bot):
-    def __init__(self):
-        super().__init__(command_prefix='!', intents=intents)
-        self.db_pool: Optional[asyncpg.Pool] = None
-        self.ai = SimpleOpenAI(OPENAI_API_KEY or "", AI_BASE_URL)
-        self.guidelines = GuidelineStore(GUIDELINES_FILE)
-        self._bootstrap_lock = asyncio.Lock()
-        self._bootstrap_complete = False
-        self.web_runner: web.AppRunner | None = None
-        self.web_site: web.TCPSite | None = None
+# === Schema migrations ===
+# Each migration runs exactly once, inside its own transaction, and is recorded
+# in schema_version. Warm starts only pay for a single version check. Never edit
+# a migration that has shipped; append a new one instead.
+SCHEMA_MIGRATION_LOCK_KEY = 0x4D445F5343484D41  # "MD_SCHMA"
+SCHEMA_MIGRATIONS: list[tuple[int, str, Any]] = []
+
+
+def schema_migration(version: int, description: str):
+    def register(func):
+        SCHEMA_MIGRATIONS.append((version, description, func))
+        SCHEMA_MIGRATIONS.sort(key=lambda item: item[0])
+        return func
+    return register
+
+
+@schema_migration(1, "baseline schema")
+async def _migration_baseline(conn: asyncpg.Connection) -> None:
+    # Existing tables
+    await conn.execute('''
+        CREATE TABLE IF NOT EXISTS weekly_tasks (
+            member_id BIGINT PRIMARY KEY,
+            tasks_completed INT DEFAULT 0
+        );
+    ''')
+    await conn.execute('''
+        CREATE TABLE IF NOT EXISTS task_logs (
+            log_id SERIAL PRIMARY KEY,
+            member_id BIGINT,
+            task TEXT,
+            task_type TEXT,
+            proof_url TEXT,
+            comments TEXT,
+            timestamp TIMESTAMPTZ
+        );
+    ''')
+    await conn.execute('''
+        CREATE TABLE IF NOT EXISTS weekly_task_logs (
+            log_id SERIAL PRIMARY KEY,
+            member_id BIGINT,
+            task TEXT,
+            task_type TEXT,
+            proof_url TEXT,
+            comments TEXT,
+            timestamp TIMESTAMPTZ
+        );
+    ''')
+    await conn.execute('''
+        CREATE TABLE IF NOT EXISTS task_types (
+            task_type TEXT PRIMARY KEY,
+            enabled BOOLEAN NOT NULL DEFAULT TRUE,
+            robux_value INT NOT NULL DEFAULT 0,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+    ''')
+    await conn.execute('''
+        CREATE TABLE IF NOT EXISTS roblox_verification (
+            discord_id BIGINT PRIMARY KEY,
+            roblox_id BIGINT UNIQUE
+        );
+    ''')
+    await conn.execute('''
+        CREATE TABLE IF NOT EXISTS roblox_time (
+            member_id BIGINT PRIMARY KEY,
+            time_spent INT DEFAULT 0
+        );
+    ''')
+    await conn.execute('''
+        CREATE TABLE IF NOT EXISTS roblox_sessions (
+            roblox_id BIGINT PRIMARY KEY,
+            start_time TIMESTAMPTZ
+        );
+    ''')
+    await conn.execute('''
+        CREATE TABLE IF NOT EXISTS orientations (
+            discord_id BIGINT PRIMARY KEY,
+            assigned_at TIMESTAMPTZ,
+            deadline TIMESTAMPTZ,
+            passed BOOLEAN DEFAULT FALSE,
+            passed_at TIMESTAMPTZ,
+            warned_5d BOOLEAN DEFAULT FALSE,
+            expired_handled BOOLEAN DEFAULT FALSE
+        );
+    ''')
+    await conn.execute('''
+        CREATE TABLE IF NOT EXISTS strikes (
+            strike_id SERIAL PRIMARY KEY,
+            member_id BIGINT NOT NULL,
+            reason TEXT,
+            issued_at TIMESTAMPTZ NOT NULL,
+            expires_at TIMESTAMPTZ NOT NULL,
+            set_by BIGINT,
+            auto BOOLEAN DEFAULT FALSE
+        );
+    ''')
+
+    # Safety ALTERs for legacy DBs
+    await conn.execute("ALTER TABLE weekly_task_logs ADD COLUMN IF NOT EXISTS task TEXT;")
+    await conn.execute("ALTER TABLE task_logs ADD COLUMN IF NOT EXISTS task TEXT;")
+    await conn.execute("ALTER TABLE task_types ADD COLUMN IF NOT EXISTS robux_value INT NOT NULL DEFAULT 0;")
+    await conn.execute("UPDATE weekly_task_logs SET task = COALESCE(task, task_type) WHERE task IS NULL;")
+    await conn.execute("UPDATE task_logs SET task = COALESCE(task, task_type) WHERE task IS NULL;")
+    await conn.executemany(
+        '''
+        INSERT INTO task_types (task_type, enabled, robux_value)
+        VALUES ($1, TRUE, $2)
+        ON CONFLICT (task_type) DO NOTHING
+        ''',
+        [(task_type, TASK_ROBUX_PAYOUTS.get(task_type, 0)) for task_type in TASK_TYPES]
+    )
+    await conn.execute("ALTER TABLE orientations ADD COLUMN IF NOT EXISTS passed_at TIMESTAMPTZ;")
+    await conn.execute("ALTER TABLE orientations ADD COLUMN IF NOT EXISTS warned_5d BOOLEAN DEFAULT FALSE;")
+    await conn.execute("ALTER TABLE orientations ADD COLUMN IF NOT EXISTS expired_handled BOOLEAN DEFAULT FALSE;")
+    await conn.execute("ALTER TABLE strikes ADD COLUMN IF NOT EXISTS set_by BIGINT;")
+    await conn.execute("ALTER TABLE strikes ADD COLUMN IF NOT EXISTS auto BOOLEAN DEFAULT FALSE;")
+
+    await conn.execute('''
+        CREATE TABLE IF NOT EXISTS member_ranks (
+            discord_id BIGINT PRIMARY KEY,
+            rank TEXT,
+            set_by BIGINT,
+            set_at TIMESTAMPTZ
+        );
+    ''')
+    await conn.execute('''
+        CREATE TABLE IF NOT EXISTS guideline_context (
+            discord_id BIGINT PRIMARY KEY,
+            details TEXT NOT NULL,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+    ''')
+    await conn.execute('''
+        CREATE TABLE IF NOT EXISTS bot_settings (
+            setting_key TEXT PRIMARY KEY,
+            setting_value BOOLEAN NOT NULL,
+            updated_by BIGINT,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+    ''')
+    await conn.execute(
+        "INSERT INTO bot_settings (setting_key, setting_value) VALUES ('quota_paused', FALSE) "
+        "ON CONFLICT (setting_key) DO NOTHING"
+    )
 
-    async def setup_hook(self):
-        # DB pool
-        try:
-            self.db_pool = await asyncpg.create_pool(DATABASE_URL, min_size=1, max_size=10)
-            async with self.db_pool.acquire() as c:
-                await c.execute('SELECT 1')
-            print("[DB] Connected.")
-        except Exception as e:
-            print(f"[DB] FAILED: {e}")
-            # Even if the DB is down, still attempt to register slash commands so the
-            # tree stays current. The commands that rely on the DB will surface
-            # their own errors when invoked.
-            try:
-                synced = await self.tree.sync()
-                print(f"[Slash] Synced {len(synced)} command(s) (DB unavailable)")
-            except Exception as sync_err:
-                print(f"[Slash] Sync failed without DB: {sync_err}")
-            return
 
-        # Run bootstrap (schema, web server, slash sync)
-        await self.ensure_bootstrap()
+@schema_migration(2, "secondary indexes for hot member lookups")
+async def _migration_hot_indexes(conn: asyncpg.Connection) -> None:
+    # Covering indexes let the per-member GROUP BY ttype / weekly counts run as index-only scans.
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS task_logs_member_idx "
+        "ON task_logs (member_id) INCLUDE (task_type, task, timestamp)"
+    )
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS weekly_task_logs_member_ts_idx "
+        "ON weekly_task_logs (member_id, timestamp DESC) INCLUDE (task_type, task)"
+    )
+    await conn.execute("CREATE INDEX IF NOT EXISTS strikes_member_expires_idx ON strikes (member_id, expires_at)")
+    await conn.execute("CREATE INDEX IF NOT EXISTS strikes_member_issued_idx ON strikes (member_id, issued_at)")
+    # Only unpassed orientations are ever scanned by the reminder loop.
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS orientations_pending_idx "
+        "ON orientations (deadline) INCLUDE (warned_5d, expired_handled) WHERE passed = FALSE"
+    )
 
-    async def ensure_bootstrap(self) -> None:
-        if self._bootstrap_complete or not self.db_pool:
-            return
 
-        async with self._bootstrap_lock:
-            if self._bootstrap_complete or not self.db_pool:
-                return
+def _month_start(dt: datetime.datetime) -> datetime.datetime:
+    return datetime.datetime(dt.year, dt.month, 1, tzinfo=datetime.timezone.utc)
 
-            # Schema (create/ensure)
-            async with self.db_pool.acquire() as connection:
-                # Existing tables
-                await connection.execute('''
-                    CREATE TABLE IF NOT EXISTS weekly_tasks (
-                        member_id BIGINT PRIMARY KEY,
-                        tasks_completed INT DEFAULT 0
-                    );
-                ''')
-                await connection.execute('''
-                    CREATE TABLE IF NOT EXISTS task_logs (
-                        log_id SERIAL PRIMARY KEY,
-                        member_id BIGINT,
-                        task TEXT,
-                        task_type TEXT,
-                        proof_url TEXT,
-                        comments TEXT,
-                        timestamp TIMESTAMPTZ
-                    );
-                ''')
-                await connection.execute('''
-                    CREATE TABLE IF NOT EXISTS weekly_task_logs (
-                        log_id SERIAL PRIMARY KEY,
-                        member_id BIGINT,
-                        task TEXT,
-                        task_type TEXT,
-                        proof_url TEXT,
-                        comments TEXT,
-                        timestamp TIMESTAMPTZ
-                    );
-                ''')
-                await connection.execute('''
-                    CREATE TABLE IF NOT EXISTS task_types (
-                        task_type TEXT PRIMARY KEY,
-                        enabled BOOLEAN NOT NULL DEFAULT TRUE,
-                        robux_value INT NOT NULL DEFAULT 0,
-                        created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
-                        updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
-                    );
-                ''')
-                await connection.execute('''
-                    CREATE TABLE IF NOT EXISTS roblox_verification (
-                        discord_id BIGINT PRIMARY KEY,
-                        roblox_id BIGINT UNIQUE
-                    );
-                ''')
-                await connection.execute('''
-                    CREATE TABLE IF NOT EXISTS roblox_time (
-                        member_id BIGINT PRIMARY KEY,
-                        time_spent INT DEFAULT 0
-                    );
-                ''')
-                await connection.execute('''
-                    CREATE TABLE IF NOT EXISTS roblox_sessions (
-                        roblox_id BIGINT PRIMARY KEY,
-                        start_time TIMESTAMPTZ
-                    );
-                ''')
-                await connection.execute('''
-                    CREATE TABLE IF NOT EXISTS orientations (
-                        discord_id BIGINT PRIMARY KEY,
-                        assigned_at TIMESTAMPTZ,
-                        deadline TIMESTAMPTZ,
-                        passed BOOLEAN DEFAULT FALSE,
-                        passed_at TIMESTAMPTZ,
-                        warned_5d BOOLEAN DEFAULT FALSE,
-                        expired_handled BOOLEAN DEFAULT FALSE
-                    );
-                ''')
-                await connection.execute('''
-                    CREATE TABLE IF NOT EXISTS strikes (
-                        strike_id SERIAL PRIMARY KEY,
-                        member_id BIGINT NOT NULL,
-                        reason TEXT,
-                        issued_at TIMESTAMPTZ NOT NULL,
-                        expires_at TIMESTAMPTZ NOT NULL,
-                        set_by BIGINT,
-                        auto BOOLEAN DEFAULT FALSE
-                    );
-                ''')
-
-                # Safety ALTERs for legacy DBs
-                await connection.execute("ALTER TABLE weekly_task_logs ADD COLUMN IF NOT EXISTS task TEXT;")
-                await connection.execute("ALTER TABLE task_logs ADD COLUMN IF NOT EXISTS task TEXT;")
-                await connection.execute("ALTER TABLE task_types ADD COLUMN IF NOT EXISTS robux_value INT NOT NULL DEFAULT 0;")
-                await connection.execute("UPDATE weekly_task_logs SET task = COALESCE(task, task_type) WHERE task IS NULL;")
-                await connection.execute("UPDATE task_logs SET task = COALESCE(task, task_type) WHERE task IS NULL;")
-                await connection.executemany(
-                    '''
-                    INSERT INTO task_types (task_type, enabled, robux_value)
-                    VALUES ($1, TRUE, $2)
-                    ON CONFLICT (task_type) DO UPDATE
-                    SET enabled = EXCLUDED.enabled,
-                        robux_value = EXCLUDED.robux_value,
-                        updated_at = now()
-                    ''',
-                    [(task_type, TASK_ROBUX_PAYOUTS.get(task_type, 0)) for task_type in TASK_TYPES]
+
+def _add_months(dt: datetime.datetime, months: int) -> datetime.datetime:
+    index = dt.year * 12 + (dt.month - 1) + months
+    return dt.replace(year=index // 12, month=index % 12 + 1, day=1)
+
+
+def task_log_partition_name(month: datetime.datetime) -> str:
+    return f"task_logs_p{month.year:04d}{month.month:02d}"
+
+
+async def ensure_task_log_partitions(
+    conn: asyncpg.Connection,
+    first_month: datetime.datetime | None = None,
+    months_ahead: int = TASK_LOG_PARTITIONS_AHEAD,
+) -> list[str]:
+    """Create any missing monthly task_logs partitions up to ``months_ahead`` past now.
+
+    Rows that already landed in task_logs_default for a month being created are
+    moved into the new partition in the same transaction; Postgres refuses to
+    create a partition whose range still has rows in the default partition.
+    """
+    month = _month_start(first_month or utcnow())
+    last = _add_months(_month_start(utcnow()), max(0, months_ahead))
+    existing = {
+        r["name"]
+        for r in await conn.fetch(
+            "SELECT c.relname AS name FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = 'task_logs'::regclass"
+        )
+    }
+    created: list[str] = []
+    while month <= last:
+        name = task_log_partition_name(month)
+        if name not in existing:
+            upper = _add_months(month, 1)
+            async with conn.transaction():
+                stranded = "task_logs_default" in existing and await conn.fetchval(
+                    "SELECT EXISTS (SELECT 1 FROM task_logs_default WHERE timestamp >= $1 AND timestamp < $2)",
+                    month, upper,
                 )
-                await connection.execute("ALTER TABLE orientations ADD COLUMN IF NOT EXISTS passed_at TIMESTAMPTZ;")
-                await connection.execute("ALTER TABLE orientations ADD COLUMN IF NOT EXISTS warned_5d BOOLEAN DEFAULT FALSE;")
-                await connection.execute("ALTER TABLE orientations ADD COLUMN IF NOT EXISTS expired_handled BOOLEAN DEFAULT FALSE;")
-                await connection.execute("ALTER TABLE strikes ADD COLUMN IF NOT EXISTS set_by BIGINT;")
-                await connection.execute("ALTER TABLE strikes ADD COLUMN IF NOT EXISTS auto BOOLEAN DEFAULT FALSE;")
-
-                await connection.execute('''
-                    CREATE TABLE IF NOT EXISTS member_ranks (
-                        discord_id BIGINT PRIMARY KEY,
-                        rank TEXT,
-                        set_by BIGINT,
-                        set_at TIMESTAMPTZ
-                    );
-                ''')
-                await connection.execute('''
-                    CREATE TABLE IF NOT EXISTS guideline_context (
-                        discord_id BIGINT PRIMARY KEY,
-                        details TEXT NOT NULL,
-                        updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
-                    );
-                ''')
-                await connection.execute('''
-                    CREATE TABLE IF NOT EXISTS bot_settings (
-                        setting_key TEXT PRIMARY KEY,
-                        setting_value BOOLEAN NOT NULL,
-                        updated_by BIGINT,
-                        updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
-                    );
-                ''')
-                await connection.execute(
-                    "INSERT INTO bot_settings (setting_key, setting_value) VALUES ('quota_paused', FALSE) "
-                    "ON CONFLICT (setting_key) DO NOTHING"
+                if stranded:
+                    # The rows only change partition, so the rollups stay as they are.
+                    await conn.execute("SET LOCAL md.skip_rollup = 'on'")
+                    await conn.execute("CREATE TEMP TABLE task_logs_stranded (LIKE task_logs)")
+                    await conn.execute(
+                        "WITH moved AS (DELETE FROM task_logs_default WHERE timestamp >= $1 AND timestamp < $2 "
+                        "RETURNING task_logs_default.*) INSERT INTO task_logs_stranded SELECT * FROM moved",
+                        month, upper,
+                    )
+                await conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF task_logs "
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
                 )
+                if stranded:
+                    await conn.execute("INSERT INTO task_logs SELECT * FROM task_logs_stranded")
+                    await conn.execute("DROP TABLE task_logs_stranded")
+            created.append(name)
+        month = _add_months(month, 1)
+    return created
+
+
+@schema_migration(3, "partition task_logs by month")
+async def _migration_partition_task_logs(conn: asyncpg.Connection) -> None:
+    await conn.execute("ALTER TABLE task_logs RENAME TO task_logs_unpartitioned")
+    await conn.execute("ALTER TABLE task_logs_unpartitioned RENAME CONSTRAINT task_logs_pkey TO task_logs_unpartitioned_pkey")
+    await conn.execute("ALTER INDEX IF EXISTS task_logs_member_idx RENAME TO task_logs_unpartitioned_member_idx")
+    # Keep handing out log_ids from the same sequence so existing IDs stay stable.
+    seq = await conn.fetchval("SELECT pg_get_serial_sequence('task_logs_unpartitioned', 'log_id')")
+    if seq:
+        await conn.execute(f"ALTER SEQUENCE {seq} OWNED BY NONE")
+    else:
+        seq = "task_logs_log_id_seq"
+        await conn.execute(f"CREATE SEQUENCE IF NOT EXISTS {seq}")
+        await conn.execute(
+            f"SELECT setval('{seq}', COALESCE((SELECT max(log_id) FROM task_logs_unpartitioned), 0) + 1, false)"
+        )
+    await conn.execute(f'''
+        CREATE TABLE task_logs (
+            log_id BIGINT NOT NULL DEFAULT nextval('{seq}'),
+            member_id BIGINT,
+            task TEXT,
+            task_type TEXT,
+            proof_url TEXT,
+            comments TEXT,
+            timestamp TIMESTAMPTZ NOT NULL DEFAULT now(),
+            PRIMARY KEY (log_id, timestamp)
+        ) PARTITION BY RANGE (timestamp);
+    ''')
+    # Legacy rows without a timestamp (and anything outside the monthly range) land here.
+    await conn.execute("CREATE TABLE task_logs_default PARTITION OF task_logs DEFAULT")
+    first_logged = await conn.fetchval("SELECT min(timestamp) FROM task_logs_unpartitioned")
+    await ensure_task_log_partitions(conn, first_month=first_logged)
+    await conn.execute(
+        "INSERT INTO task_logs (log_id, member_id, task, task_type, proof_url, comments, timestamp) "
+        "SELECT log_id, member_id, task, task_type, proof_url, comments, COALESCE(timestamp, 'epoch') "
+        "FROM task_logs_unpartitioned"
+    )
+    await conn.execute(f"ALTER SEQUENCE {seq} AS BIGINT OWNED BY task_logs.log_id")
+    await conn.execute("DROP TABLE task_logs_unpartitioned")
+    await conn.execute(
+        "CREATE INDEX task_logs_member_idx ON task_logs (member_id) INCLUDE (task_type, task, timestamp)"
+    )
 
+async def rebuild_member_task_totals(conn: asyncpg.Connection) -> int:
+    """Recompute member_task_totals from task_logs; call inside a transaction."""
+    # SHARE mode blocks concurrent log writes (and their trigger updates) until we commit.
+    await conn.execute("LOCK TABLE task_logs IN SHARE MODE")
+    await conn.execute("TRUNCATE member_task_totals")
+    status = await conn.execute(
+        "INSERT INTO member_task_totals (member_id, normalized_type, task_type, count, first_at, last_at) "
+        "SELECT member_id, md_normalize_label(label), max(label), COUNT(*), min(timestamp), max(timestamp) "
+        "FROM (SELECT member_id, COALESCE(NULLIF(task_type, ''), task, '') AS label, timestamp "
+        "      FROM task_logs WHERE member_id IS NOT NULL) logs "
+        "GROUP BY member_id, md_normalize_label(label)"
+    )
+    return int(status.split()[-1])
 
-            print("[DB] Tables ready.")
 
-            if not self.web_runner:
-                app = web.Application()
-                app.router.add_get('/health', lambda _: web.Response(text='ok', status=200))
-                app.router.add_post('/roblox', self.roblox_handler)
-                app.router.add_post('/roblox/audit', self.roblox_audit_handler)
-                self.web_runner = web.AppRunner(app)
-                await self.web_runner.setup()
-                self.web_site = web.TCPSite(self.web_runner, '0.0.0.0', 8080)
-                await self.web_site.start()
-                print("[Web] Server up on :8080 (GET /health, POST /roblox, POST /roblox/audit).")
+async def rebuild_member_daily_tasks(conn: asyncpg.Connection) -> int:
+    """Recompute member_daily_tasks from task_logs; call inside a transaction."""
+    await conn.execute("LOCK TABLE task_logs IN SHARE MODE")
+    await conn.execute("TRUNCATE member_daily_tasks")
+    status = await conn.execute(
+        "INSERT INTO member_daily_tasks (day, member_id, count) "
+        "SELECT md_quota_day(timestamp), member_id, COUNT(*) FROM task_logs "
+        "WHERE member_id IS NOT NULL GROUP BY 1, 2"
+    )
+    return int(status.split()[-1])
 
-            # Sync slash commands once
+
+async def apply_task_rollup_delta(
+    conn: asyncpg.Connection, records: list[tuple[int, str, datetime.datetime]]
+) -> None:
+    """Fold newly inserted (member_id, task_type, timestamp) rows into the rollups in two statements.
+
+    For bulk inserts made with ``SET LOCAL md.skip_rollup = 'on'``; call in the
+    same transaction so the rollups commit (or roll back) with the rows.
+    """
+    if not records:
+        return
+    member_ids, labels, stamps = (list(col) for col in zip(*records))
+    await conn.execute(
+        "INSERT INTO member_task_totals AS t (member_id, normalized_type, task_type, count, first_at, last_at) "
+        "SELECT member_id, md_normalize_label(label), max(label), COUNT(*), min(ts), max(ts) "
+        "FROM unnest($1::bigint[], $2::text[], $3::timestamptz[]) AS u(member_id, label, ts) "
+        "GROUP BY member_id, md_normalize_label(label) "
+        "ON CONFLICT (member_id, normalized_type) DO UPDATE SET "
+        "count = t.count + EXCLUDED.count, task_type = EXCLUDED.task_type, "
+        "first_at = LEAST(t.first_at, EXCLUDED.first_at), last_at = GREATEST(t.last_at, EXCLUDED.last_at)",
+        member_ids, labels, stamps,
+    )
+    await conn.execute(
+        "INSERT INTO member_daily_tasks AS d (day, member_id, count) "
+        "SELECT md_quota_day(ts), member_id, COUNT(*) "
+        "FROM unnest($1::bigint[], $2::timestamptz[]) AS u(member_id, ts) GROUP BY 1, 2 "
+        "ON CONFLICT (day, member_id) DO UPDATE SET count = d.count + EXCLUDED.count",
+        member_ids, stamps,
+    )
+
+
+async def revert_task_rollup_delta(
+    conn: asyncpg.Connection, records: list[tuple[int, str, datetime.datetime]]
+) -> None:
+    """Take deleted (member_id, task_type, timestamp) rows back out of the rollups.
+
+    The counterpart of apply_task_rollup_delta for bulk deletes made with
+    ``SET LOCAL md.skip_rollup = 'on'``. first_at/last_at are re-read once per
+    affected (member, type) pair rather than once per row.
+    """
+    if not records:
+        return
+    member_ids, labels, stamps = (list(col) for col in zip(*records))
+    await conn.execute(
+        "UPDATE member_task_totals t SET count = t.count - d.cnt, first_at = b.first_at, last_at = b.last_at "
+        "FROM (SELECT member_id, md_normalize_label(label) AS norm, COUNT(*) AS cnt "
+        "      FROM unnest($1::bigint[], $2::text[]) AS u(member_id, label) GROUP BY 1, 2) d "
+        "CROSS JOIN LATERAL (SELECT min(l.timestamp) AS first_at, max(l.timestamp) AS last_at FROM task_logs l "
+        "      WHERE l.member_id = d.member_id "
+        "        AND md_normalize_label(COALESCE(NULLIF(l.task_type, ''), l.task, '')) = d.norm) b "
+        "WHERE t.member_id = d.member_id AND t.normalized_type = d.norm",
+        member_ids, labels,
+    )
+    await conn.execute(
+        "UPDATE member_daily_tasks d SET count = d.count - x.cnt "
+        "FROM (SELECT md_quota_day(ts) AS day, member_id, COUNT(*) AS cnt "
+        "      FROM unnest($1::bigint[], $2::timestamptz[]) AS u(member_id, ts) GROUP BY 1, 2) x "
+        "WHERE d.day = x.day AND d.member_id = x.member_id",
+        member_ids, stamps,
+    )
+    await conn.execute("DELETE FROM member_task_totals WHERE member_id = ANY($1::bigint[]) AND count <= 0", member_ids)
+    await conn.execute("DELETE FROM member_daily_tasks WHERE member_id = ANY($1::bigint[]) AND count <= 0", member_ids)
+
+
+@schema_migration(4, "member_task_totals rollup maintained by trigger")
+async def _migration_member_task_totals(conn: asyncpg.Connection) -> None:
+    # SQL twin of _normalize_label(): hyphens to spaces, collapse whitespace, lowercase.
+    await conn.execute(r'''
+        CREATE OR REPLACE FUNCTION md_normalize_label(value TEXT) RETURNS TEXT
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+            SELECT lower(btrim(regexp_replace(replace(COALESCE(value, ''), '-', ' '), '\s+', ' ', 'g')))
+        $$;
+    ''')
+    await conn.execute('''
+        CREATE TABLE IF NOT EXISTS member_task_totals (
+            member_id BIGINT NOT NULL,
+            normalized_type TEXT NOT NULL,
+            task_type TEXT NOT NULL,
+            count INT NOT NULL,
+            first_at TIMESTAMPTZ,
+            last_at TIMESTAMPTZ,
+            PRIMARY KEY (member_id, normalized_type)
+        );
+    ''')
+    await conn.execute('''
+        CREATE OR REPLACE FUNCTION member_task_totals_apply() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            label TEXT;
+            norm TEXT;
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                IF NEW.member_id IS NULL THEN
+                    RETURN NULL;
+                END IF;
+                label := COALESCE(NULLIF(NEW.task_type, ''), NEW.task, '');
+                norm := md_normalize_label(label);
+                INSERT INTO member_task_totals AS t (member_id, normalized_type, task_type, count, first_at, last_at)
+                VALUES (NEW.member_id, norm, label, 1, NEW.timestamp, NEW.timestamp)
+                ON CONFLICT (member_id, normalized_type) DO UPDATE SET
+                    count = t.count + 1,
+                    task_type = EXCLUDED.task_type,
+                    first_at = LEAST(t.first_at, EXCLUDED.first_at),
+                    last_at = GREATEST(t.last_at, EXCLUDED.last_at);
+                RETURN NULL;
+            END IF;
+
+            IF OLD.member_id IS NULL THEN
+                RETURN NULL;
+            END IF;
+            label := COALESCE(NULLIF(OLD.task_type, ''), OLD.task, '');
+            norm := md_normalize_label(label);
+            DELETE FROM member_task_totals
+             WHERE member_id = OLD.member_id AND normalized_type = norm AND count <= 1;
+            IF NOT FOUND THEN
+                UPDATE member_task_totals SET count = count - 1
+                 WHERE member_id = OLD.member_id AND normalized_type = norm;
+                -- Only rescan this member's rows when the deleted log was a boundary.
+                UPDATE member_task_totals t
+                   SET first_at = b.first_at, last_at = b.last_at
+                  FROM (SELECT min(l.timestamp) AS first_at, max(l.timestamp) AS last_at
+                          FROM task_logs l
+                         WHERE l.member_id = OLD.member_id
+                           AND md_normalize_label(COALESCE(NULLIF(l.task_type, ''), l.task, '')) = norm) b
+                 WHERE t.member_id = OLD.member_id AND t.normalized_type = norm
+                   AND (t.first_at = OLD.timestamp OR t.last_at = OLD.timestamp);
+            END IF;
+            RETURN NULL;
+        END;
+        $$;
+    ''')
+    await conn.execute(
+        "CREATE TRIGGER task_logs_member_totals AFTER INSERT OR DELETE ON task_logs "
+        "FOR EACH ROW EXECUTE FUNCTION member_task_totals_apply()"
+    )
+    await rebuild_member_task_totals(conn)
+
+@schema_migration(5, "week-keyed task_logs replaces weekly_task_logs and weekly_tasks")
+async def _migration_week_keyed_task_logs(conn: asyncpg.Connection) -> None:
+    await conn.execute("ALTER TABLE task_logs ADD COLUMN week_key TEXT")
+    # Same arithmetic as quota_week_key(): shift into the ISO week, then format.
+    await conn.execute(
+        "UPDATE task_logs SET week_key = to_char((timestamp AT TIME ZONE 'UTC') + interval '20 hours', 'IYYY-\"W\"IW')"
+    )
+    await conn.execute("ALTER TABLE task_logs ALTER COLUMN week_key SET NOT NULL")
+    await conn.execute(
+        "CREATE INDEX task_logs_week_member_idx ON task_logs (week_key, member_id) INCLUDE (task_type, task)"
+    )
+    # Every weekly row was also written to task_logs, but the old /tasks undo
+    # only deleted the weekly copy, so this week's task_logs may hold rows that
+    # were undone. Matching them up is guesswork (each copy took its own now()),
+    # so nothing is deleted: rows this week with no weekly copy left per
+    # member/type/proof are listed in task_log_undo_suspects for management to
+    # review and remove by hand if they really were undone. The old undo took
+    # the newest weekly row, so the newest unmatched rows are the suspects.
+    await conn.execute('''
+        CREATE TABLE IF NOT EXISTS task_log_undo_suspects (
+            log_id BIGINT NOT NULL,
+            timestamp TIMESTAMPTZ NOT NULL,
+            member_id BIGINT NOT NULL,
+            task_type TEXT,
+            proof_url TEXT,
+            week_key TEXT NOT NULL,
+            flagged_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            PRIMARY KEY (log_id, timestamp)
+        );
+    ''')
+    if await conn.fetchval("SELECT to_regclass('weekly_task_logs') IS NOT NULL"):
+        week_key_sql = "to_char((timestamp AT TIME ZONE 'UTC') + interval '20 hours', 'IYYY-\"W\"IW')"
+        status = await conn.execute(
+            "WITH weekly AS ("
+            "  SELECT member_id, task_type, proof_url, COUNT(*) AS n FROM weekly_task_logs "
+            f"  WHERE {week_key_sql} = $1 GROUP BY member_id, task_type, proof_url"
+            "), ranked AS ("
+            "  SELECT t.log_id, t.timestamp, t.member_id, t.task_type, t.proof_url, t.week_key, "
+            "         COALESCE(w.n, 0) AS kept, "
+            "         row_number() OVER (PARTITION BY t.member_id, t.task_type, t.proof_url "
+            "                            ORDER BY t.timestamp, t.log_id) AS rn "
+            "  FROM task_logs t "
+            "  LEFT JOIN weekly w ON (w.member_id, w.task_type, w.proof_url) IS NOT DISTINCT FROM (t.member_id, t.task_type, t.proof_url) "
+            "  WHERE t.week_key = $1"
+            ") "
+            "INSERT INTO task_log_undo_suspects (log_id, timestamp, member_id, task_type, proof_url, week_key) "
+            "SELECT log_id, timestamp, member_id, task_type, proof_url, week_key FROM ranked WHERE rn > kept "
+            "ON CONFLICT DO NOTHING",
+            quota_week_key(utcnow()),
+        )
+        flagged = int(status.split()[-1])
+        if flagged:
+            print(
+                f"[DB] {flagged} task log(s) this week may have been undone before the upgrade; "
+                "they are listed in task_log_undo_suspects for review and still count."
+            )
+    await conn.execute("DROP TABLE IF EXISTS weekly_task_logs")
+    await conn.execute("DROP TABLE IF EXISTS weekly_tasks")
+
+@schema_migration(6, "weekly_reports snapshot archive")
+async def _migration_weekly_reports(conn: asyncpg.Connection) -> None:
+    await conn.execute('''
+        CREATE TABLE IF NOT EXISTS weekly_reports (
+            week_key TEXT NOT NULL,
+            member_id BIGINT NOT NULL,
+            tasks INT NOT NULL DEFAULT 0,
+            test_count INT NOT NULL DEFAULT 0,
+            misc_count INT NOT NULL DEFAULT 0,
+            minutes INT NOT NULL DEFAULT 0,
+            robux INT NOT NULL DEFAULT 0,
+            breakdown JSONB NOT NULL DEFAULT '[]'::jsonb,
+            outcome TEXT NOT NULL CHECK (outcome IN ('met', 'below', 'zero')),
+            generated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            PRIMARY KEY (week_key, member_id)
+        );
+    ''')
+
+@schema_migration(7, "NOTIFY bot_settings changes")
+async def _migration_settings_notify(conn: asyncpg.Connection) -> None:
+    await conn.execute('''
+        CREATE OR REPLACE FUNCTION bot_settings_notify() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                PERFORM pg_notify('bot_settings_changed', json_build_object('key', OLD.setting_key, 'value', NULL)::text);
+            ELSE
+                PERFORM pg_notify('bot_settings_changed', json_build_object('key', NEW.setting_key, 'value', NEW.setting_value)::text);
+            END IF;
+            RETURN NULL;
+        END;
+        $$;
+    ''')
+    await conn.execute(
+        "CREATE TRIGGER bot_settings_changed AFTER INSERT OR UPDATE OR DELETE ON bot_settings "
+        "FOR EACH ROW EXECUTE FUNCTION bot_settings_notify()"
+    )
+
+@schema_migration(8, "NOTIFY task_types changes")
+async def _migration_task_types_notify(conn: asyncpg.Connection) -> None:
+    await conn.execute('''
+        CREATE OR REPLACE FUNCTION task_types_notify() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                PERFORM pg_notify('task_types_changed', json_build_object(
+                    'task_type', OLD.task_type, 'deleted', TRUE)::text);
+            ELSE
+                IF TG_OP = 'UPDATE' AND lower(OLD.task_type) <> lower(NEW.task_type) THEN
+                    PERFORM pg_notify('task_types_changed', json_build_object(
+                        'task_type', OLD.task_type, 'deleted', TRUE)::text);
+                END IF;
+                PERFORM pg_notify('task_types_changed', json_build_object(
+                    'task_type', NEW.task_type, 'enabled', NEW.enabled, 'robux_value', NEW.robux_value)::text);
+            END IF;
+            RETURN NULL;
+        END;
+        $$;
+    ''')
+    await conn.execute(
+        "CREATE TRIGGER task_types_changed AFTER INSERT OR UPDATE OR DELETE ON task_types "
+        "FOR EACH ROW EXECUTE FUNCTION task_types_notify()"
+    )
+
+@schema_migration(9, "task_log_payloads cold storage and task_log_history view")
+async def _migration_task_log_payloads(conn: asyncpg.Connection) -> None:
+    await conn.execute('''
+        CREATE TABLE IF NOT EXISTS task_log_payloads (
+            log_id BIGINT NOT NULL,
+            timestamp TIMESTAMPTZ NOT NULL,
+            proof_url TEXT,
+            comments TEXT,
+            archived_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            PRIMARY KEY (log_id, timestamp)
+        );
+    ''')
+    # Reads that need proof or comments go through this view, so they never
+    # have to care whether the retention job has moved a row's payload yet.
+    await conn.execute('''
+        CREATE OR REPLACE VIEW task_log_history AS
+        SELECT l.log_id, l.member_id, l.task, l.task_type, l.timestamp, l.week_key,
+               COALESCE(l.proof_url, p.proof_url) AS proof_url,
+               COALESCE(l.comments, p.comments) AS comments,
+               p.log_id IS NOT NULL AS archived
+        FROM task_logs l
+        LEFT JOIN task_log_payloads p ON p.log_id = l.log_id AND p.timestamp = l.timestamp;
+    ''')
+
+@schema_migration(10, "member_daily_tasks rollup for leaderboards")
+async def _migration_member_daily_tasks(conn: asyncpg.Connection) -> None:
+    shift_hours = int(QUOTA_WEEK_SHIFT.total_seconds() // 3600)
+    await conn.execute(f'''
+        CREATE OR REPLACE FUNCTION md_quota_day(ts TIMESTAMPTZ) RETURNS DATE
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+            SELECT ((ts AT TIME ZONE 'UTC') + interval '{shift_hours} hours')::date
+        $$;
+    ''')
+    await conn.execute('''
+        CREATE TABLE IF NOT EXISTS member_daily_tasks (
+            day DATE NOT NULL,
+            member_id BIGINT NOT NULL,
+            count INT NOT NULL,
+            PRIMARY KEY (day, member_id)
+        );
+    ''')
+    await conn.execute('''
+        CREATE OR REPLACE FUNCTION member_daily_tasks_apply() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                IF NEW.member_id IS NOT NULL THEN
+                    INSERT INTO member_daily_tasks AS d (day, member_id, count)
+                    VALUES (md_quota_day(NEW.timestamp), NEW.member_id, 1)
+                    ON CONFLICT (day, member_id) DO UPDATE SET count = d.count + 1;
+                END IF;
+                RETURN NULL;
+            END IF;
+            IF OLD.member_id IS NOT NULL THEN
+                DELETE FROM member_daily_tasks
+                 WHERE day = md_quota_day(OLD.timestamp) AND member_id = OLD.member_id AND count <= 1;
+                IF NOT FOUND THEN
+                    UPDATE member_daily_tasks SET count = count - 1
+                     WHERE day = md_quota_day(OLD.timestamp) AND member_id = OLD.member_id;
+                END IF;
+            END IF;
+            RETURN NULL;
+        END;
+        $$;
+    ''')
+    await conn.execute(
+        "CREATE TRIGGER task_logs_member_daily AFTER INSERT OR DELETE ON task_logs "
+        "FOR EACH ROW EXECUTE FUNCTION member_daily_tasks_apply()"
+    )
+    await rebuild_member_daily_tasks(conn)
+
+@schema_migration(11, "keyset index for task history")
+async def _migration_task_history_index(conn: asyncpg.Connection) -> None:
+    # Matches /tasks history's ORDER BY exactly, and still covers every query
+    # the member_id-only index served, so that one can go.
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS task_logs_member_ts_idx "
+        "ON task_logs (member_id, timestamp DESC, log_id DESC) INCLUDE (task_type, task)"
+    )
+    await conn.execute("DROP INDEX IF EXISTS task_logs_member_idx")
+
+@schema_migration(12, "let bulk inserts skip the per-row rollup triggers")
+async def _migration_rollup_skip(conn: asyncpg.Connection) -> None:
+    # Bulk writers SET LOCAL md.skip_rollup = 'on' and apply one aggregated
+    # delta instead (see apply_task_rollup_delta).
+    skip_unless = "WHEN (current_setting('md.skip_rollup', true) IS DISTINCT FROM 'on')"
+    await conn.execute("DROP TRIGGER task_logs_member_totals ON task_logs")
+    await conn.execute(
+        "CREATE TRIGGER task_logs_member_totals AFTER INSERT OR DELETE ON task_logs "
+        f"FOR EACH ROW {skip_unless} EXECUTE FUNCTION member_task_totals_apply()"
+    )
+    await conn.execute("DROP TRIGGER task_logs_member_daily ON task_logs")
+    await conn.execute(
+        "CREATE TRIGGER task_logs_member_daily AFTER INSERT OR DELETE ON task_logs "
+        f"FOR EACH ROW {skip_unless} EXECUTE FUNCTION member_daily_tasks_apply()"
+    )
+
+@schema_migration(13, "proof_hashes for duplicate proof detection")
+async def _migration_proof_hashes(conn: asyncpg.Connection) -> None:
+    # bands holds the dHash split into four tagged 16-bit pieces; any two hashes
+    # within PROOF_NEAR_DUPLICATE_DISTANCE bits share at least one piece, so the
+    # GIN index finds every near-duplicate candidate.
+    await conn.execute('''
+        CREATE TABLE IF NOT EXISTS proof_hashes (
+            log_id BIGINT NOT NULL,
+            timestamp TIMESTAMPTZ NOT NULL,
+            member_id BIGINT NOT NULL,
+            sha256 BYTEA NOT NULL,
+            dhash BIGINT,
+            bands INT[],
+            created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            PRIMARY KEY (log_id, timestamp)
+        );
+    ''')
+    await conn.execute("CREATE INDEX IF NOT EXISTS proof_hashes_sha256_idx ON proof_hashes (sha256)")
+    await conn.execute("CREATE INDEX IF NOT EXISTS proof_hashes_bands_idx ON proof_hashes USING GIN (bands)")
+
+@schema_migration(14, "batch_id tags the rows written by one command")
+async def _migration_task_log_batches(conn: asyncpg.Connection) -> None:
+    await conn.execute("CREATE SEQUENCE IF NOT EXISTS task_log_batch_seq")
+    await conn.execute("ALTER TABLE task_logs ADD COLUMN IF NOT EXISTS batch_id BIGINT")
+    # Set apart from ADD COLUMN: a volatile default there would rewrite every
+    # partition. Existing rows keep NULL and undo treats each as its own batch.
+    await conn.execute("ALTER TABLE task_logs ALTER COLUMN batch_id SET DEFAULT nextval('task_log_batch_seq')")
+
+
+@schema_migration(15, "per-member index on member_daily_tasks")
+async def _migration_member_daily_index(conn: asyncpg.Connection) -> None:
+    # The primary key leads with day; promotion checks count one member's days.
+    await conn.execute("CREATE INDEX IF NOT EXISTS member_daily_tasks_member_idx ON member_daily_tasks (member_id, day)")
+
+
+@schema_migration(16, "weekly_runs tracks each quota week's close-out")
+async def _migration_weekly_runs(conn: asyncpg.Connection) -> None:
+    # close_quota_week marks each step, so a leader that takes over mid-run
+    # resumes where the previous one stopped instead of skipping the week.
+    await conn.execute('''
+        CREATE TABLE IF NOT EXISTS weekly_runs (
+            week_key TEXT PRIMARY KEY,
+            reported_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            announced_at TIMESTAMPTZ,
+            completed_at TIMESTAMPTZ
+        );
+    ''')
+    await conn.execute(
+        "INSERT INTO weekly_runs (week_key, reported_at, announced_at, completed_at) "
+        "SELECT week_key, min(generated_at), min(generated_at), min(generated_at) FROM weekly_reports "
+        "GROUP BY week_key ON CONFLICT DO NOTHING"
+    )
+    # At most one quota strike per member and week, however often a run resumes.
+    await conn.execute("ALTER TABLE strikes ADD COLUMN IF NOT EXISTS quota_week TEXT")
+    await conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS strikes_quota_week_idx ON strikes (member_id, quota_week) "
+        "WHERE quota_week IS NOT NULL"
+    )
+
+
+async def apply_schema_migrations(conn: asyncpg.Connection) -> int:
+    """Bring the schema up to date and return how many migrations were applied."""
+    latest = SCHEMA_MIGRATIONS[-1][0]
+    try:
+        current = await conn.fetchval("SELECT max(version) FROM schema_version")
+    except asyncpg.UndefinedTableError:
+        current = None
+    if current is not None and current >= latest:
+        return 0
+
+    async with conn.transaction():
+        await conn.execute("SELECT pg_advisory_xact_lock($1)", SCHEMA_MIGRATION_LOCK_KEY)
+        await conn.execute(
+            "CREATE TABLE IF NOT EXISTS schema_version ("
+            "version INT PRIMARY KEY, description TEXT NOT NULL, applied_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+        )
+
+    applied = 0
+    for version, description, migrate in SCHEMA_MIGRATIONS:
+        if current is not None and version <= current:
+            continue
+        async with conn.transaction():
+            # Another instance may be migrating too; the lock serialises us and
+            # the re-check skips anything it already applied.
+            await conn.execute("SELECT pg_advisory_xact_lock($1)", SCHEMA_MIGRATION_LOCK_KEY)
+            if await conn.fetchval("SELECT 1 FROM schema_version WHERE version = $1", version):
+                continue
+            await migrate(conn)
+            await conn.execute(
+                "INSERT INTO schema_version (version, description) VALUES ($1, $2)",
+                version, description,
+            )
+        applied += 1
+        print(f"[DB] Applied migration {version}: {description}")
+    return applied
+
+
+# === Cross-instance change notifications ===
+class DbNotifier:
+    """One dedicated LISTEN connection shared by every in-memory cache.
+
+    Subscribers register a payload handler plus a ``resync`` coroutine; after a
+    dropped connection we cannot know what was missed, so every subscriber
+    resyncs once the LISTEN connection is back.
+    """
+
+    def __init__(self, dsn: str | None):
+        self.dsn = dsn
+        self.conn: asyncpg.Connection | None = None
+        self.handlers: dict[str, list[Any]] = {}
+        self.resyncs: list[Any] = []
+        self._reconnect_task: asyncio.Task | None = None
+        self._closing = False
+
+    def subscribe(self, channel: str, handler, resync=None) -> None:
+        self.handlers.setdefault(channel, []).append(handler)
+        if resync is not None:
+            self.resyncs.append(resync)
+
+    async def start(self) -> None:
+        if self.conn is not None or not self.dsn:
+            return
+        conn = await asyncpg.connect(self.dsn)
+        try:
+            for channel in self.handlers:
+                await conn.add_listener(channel, self._dispatch)
+        except BaseException:
+            await conn.close()
+            raise
+        conn.add_termination_listener(self._on_terminated)
+        self.conn = conn
+
+    def schedule_reconnect(self) -> None:
+        """Keep retrying start() in the background, resyncing subscribers once it succeeds."""
+        if not self._closing and (self._reconnect_task is None or self._reconnect_task.done()):
+            self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def close(self) -> None:
+        self._closing = True
+        if self.conn is not None:
+            await self.conn.close()
+            self.conn = None
+
+    def _dispatch(self, _conn, _pid, channel: str, payload: str) -> None:
+        for handler in self.handlers.get(channel, []):
             try:
-                synced = await self.tree.sync()
-                print(f"[Slash] Synced {len(synced)} command(s)")
+                handler(payload)
             except Exception as e:
-                print(f"[Slash] Sync failed: {e}")
+                print(f"[notify] Handler for {channel} failed: {e}")
 
-            self._bootstrap_complete = True
+    def _on_terminated(self, _conn) -> None:
+        self.conn = None
+        self.schedule_reconnect()
 
-    async def resolve_member_rank(self, member: discord.Member) -> str:
-        stored_rank: str | None = None
-        if self.db_pool:
+    async def _reconnect(self) -> None:
+        delay = 1.0
+        while not self._closing:
             try:
-                async with self.db_pool.acquire() as conn:
-                    stored_rank = await conn.fetchval("SELECT rank FROM member_ranks WHERE discord_id=$1", member.id)
+                await self.start()
+                print("[notify] LISTEN connection restored.")
+                for resync in self.resyncs:
+                    await resync()
+                return
             except Exception as e:
-                print(f"[WARN] Failed to fetch stored rank for {member.id}: {e}")
-        if stored_rank:
-            return stored_rank
-        roles = [role for role in member.roles if not getattr(role, "is_default", lambda: role.id == member.guild.id)()]
-        if not roles:
-            roles = [role for role in member.roles if role.id != member.guild.id]
-        if roles:
-            roles.sort(key=lambda r: r.position, reverse=True)
-            return roles[0].name
-        return "Member"
+                print(f"[notify] Reconnect failed ({e}); retrying in {delay:.0f}s")
+                self.conn = None
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60.0)
 
-    async def get_roblox_id(self, discord_id: int) -> int | None:
-        if not self.db_pool:
-            return None
-        try:
-            async with self.db_pool.acquire() as conn:
-                return await conn.fetchval(
-                    "SELECT roblox_id FROM roblox_verification WHERE discord_id = $1",
-                    discord_id,
-                )
-        except Exception as e:
-            print(f"[WARN] Failed to fetch Roblox ID for {discord_id}: {e}")
-            return None
 
-    async def get_guideline_context(self, discord_id: int) -> str | None:
-        if not self.db_pool:
-            return None
-        try:
-            async with self.db_pool.acquire() as conn:
-                return await conn.fetchval(
-                    "SELECT details FROM guideline_context WHERE discord_id=$1",
-                    discord_id,
-                )
-        except Exception as e:
-            print(f"[WARN] Failed to load guideline context for {discord_id}: {e}")
-            return None
+SETTING_DEFAULTS: dict[str, bool] = {
+    "quota_paused": False,
+}
 
-    async def set_guideline_context(self, discord_id: int, details: str) -> None:
-        if not self.db_pool:
-            return
-        try:
-            async with self.db_pool.acquire() as conn:
-                await conn.execute(
-                    "INSERT INTO guideline_context (discord_id, details, updated_at) VALUES ($1, $2, $3) "
-                    "ON CONFLICT (discord_id) DO UPDATE SET details = EXCLUDED.details, updated_at = EXCLUDED.updated_at",
-                    discord_id,
-                    details,
-                    utcnow(),
-                )
-        except Exception as e:
-            print(f"[WARN] Failed to store guideline context for {discord_id}: {e}")
 
-    async def clear_guideline_context(self, discord_id: int) -> None:
-        if not self.db_pool:
-            return
-        try:
-            async with self.db_pool.acquire() as conn:
-                await conn.execute(
-                    "DELETE FROM guideline_context WHERE discord_id=$1",
-                    discord_id,
-                )
-        except Exception as e:
-            print(f"[WARN] Failed to clear guideline context for {discord_id}: {e}")
+class SettingsCache:
+    """In-memory copy of bot_settings, refreshed by NOTIFY on every committed write."""
 
-    async def on_message(self, message: discord.Message):
-        if message.author.bot:
-            return
+    CHANNEL = "bot_settings_changed"
 
-        await self.ensure_bootstrap()
+    def __init__(self):
+        self.values: dict[str, bool] = dict(SETTING_DEFAULTS)
 
-        channel_id: int | None = None
-        if isinstance(message.channel, discord.Thread):
-            channel_id = message.channel.parent_id
-        elif isinstance(message.channel, discord.abc.GuildChannel):
-            channel_id = message.channel.id
+    def get(self, key: str) -> bool:
+        return self.values.get(key, SETTING_DEFAULTS.get(key, False))
+
+    def set_local(self, key: str, value: bool | None) -> None:
+        if value is None:
+            self.values[key] = SETTING_DEFAULTS.get(key, False)
+        else:
+            self.values[key] = type(SETTING_DEFAULTS.get(key, False))(value)
+
+    async def load(self, pool: asyncpg.Pool) -> None:
+        async with pool.acquire() as conn:
+            rows = await conn.fetch("SELECT setting_key, setting_value FROM bot_settings")
+        values = dict(SETTING_DEFAULTS)
+        for r in rows:
+            values[r["setting_key"]] = bool(r["setting_value"])
+        self.values = values
+
+    def on_notify(self, payload: str) -> None:
+        data = json.loads(payload)
+        self.set_local(data["key"], data.get("value"))
+
+
+def _normalize_label(value: str | None) -> str:
+    return " ".join((value or "").replace("-", " ").split()).strip().casefold()
+
+
+def _label_trigrams(normalized: str) -> set[str]:
+    # Each word is padded on its own, so word starts weigh most and trigrams
+    # never straddle two words.
+    grams: set[str] = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class AutocompleteEngine:
+    """Ranked, typo-tolerant search over an in-memory list of labels.
+
+    ``rebuild`` precomputes normalized keys, a word-start prefix index and a
+    trigram index; ``search`` only touches those dicts. Results rank whole-label
+    prefixes, then word prefixes, then substrings, then fuzzy (trigram) matches,
+    keeping the catalog's own order within each tier.
+    """
+
+    PREFIX_LIMIT = 24  # longer queries look up their first 24 chars and filter the bucket
+    MIN_FUZZY_SCORE = 0.5  # share of the query's trigrams a fuzzy match must contain
+
+    def __init__(self, labels=()):
+        self.rebuild(labels)
+
+    def rebuild(self, labels) -> None:
+        self.labels: list[str] = list(labels)
+        self.keys = [_normalize_label(label) for label in self.labels]
+        prefix_index: dict[str, list[int]] = {}
+        trigram_index: dict[str, list[int]] = {}
+        for idx, key in enumerate(self.keys):
+            prefixes: set[str] = set()
+            # Index from every word start so "check" also finds "Anomaly Checkup".
+            for start in [0] + [i + 1 for i, ch in enumerate(key) if ch == " "]:
+                for end in range(start + 1, min(len(key), start + self.PREFIX_LIMIT) + 1):
+                    prefixes.add(key[start:end])
+            for prefix in prefixes:
+                prefix_index.setdefault(prefix, []).append(idx)
+            for gram in _label_trigrams(key):
+                trigram_index.setdefault(gram, []).append(idx)
+        for prefix, bucket in prefix_index.items():
+            # Whole-label prefix matches rank ahead of later-word matches (stable sort).
+            bucket.sort(key=lambda i: not self.keys[i].startswith(prefix))
+        self.prefix_index = prefix_index
+        self.trigram_index = trigram_index
+
+    def search(self, current: str | None, limit: int = 25) -> list[str]:
+        query = _normalize_label(current)
+        if not query:
+            return self.labels[:limit]
+        hits = self.prefix_index.get(query[:self.PREFIX_LIMIT], [])
+        if len(query) > self.PREFIX_LIMIT:
+            hits = [i for i in hits if query in self.keys[i]]
+        ranked = list(hits[:limit])
+        if len(ranked) < limit:
+            seen = set(ranked)
+            # Mid-word input ("ckup") isn't in the prefix index.
+            ranked += [i for i, key in enumerate(self.keys) if i not in seen and query in key][:limit - len(ranked)]
+        if len(ranked) < limit:
+            ranked += self._fuzzy(query, set(ranked), limit - len(ranked))
+        return [self.labels[i] for i in ranked]
+
+    def _fuzzy(self, query: str, exclude: set[int], limit: int) -> list[int]:
+        grams = _label_trigrams(query)
+        if not grams:
+            return []
+        shared: dict[int, int] = {}
+        for gram in grams:
+            for idx in self.trigram_index.get(gram, ()):
+                shared[idx] = shared.get(idx, 0) + 1
+        needed = self.MIN_FUZZY_SCORE * len(grams)
+        candidates = [
+            (-count, len(self.keys[idx]), idx)
+            for idx, count in shared.items()
+            if count >= needed and idx not in exclude
+        ]
+        # Most shared trigrams first; among equals, the shorter (closer) label.
+        candidates.sort()
+        return [idx for _, _, idx in candidates[:limit]]
+
+
+def task_type_plural(task_type: str) -> str:
+    return TASK_PLURALS.get(task_type, task_type + ("s" if not task_type.endswith("s") else ""))
+
+
+class TaskTypeEntry:
+    __slots__ = ("name", "enabled", "robux_value", "plural")
+
+    def __init__(self, name: str, enabled: bool, robux_value: int):
+        self.name = name
+        self.enabled = bool(enabled)
+        self.robux_value = int(robux_value or 0)
+        self.plural = task_type_plural(name)
+
+
+class TaskTypeCatalog:
+    """In-memory copy of task_types with O(1) lookups and a fuzzy autocomplete index.
+
+    Until the first load it serves the built-in TASK_TYPES, so commands keep
+    working when the database is unavailable.
+    """
+
+    CHANNEL = "task_types_changed"
+
+    def __init__(self):
+        self.entries: dict[str, TaskTypeEntry] = {}
+        self.enabled_names: list[str] = []
+        self.autocomplete = AutocompleteEngine()
+        self._fallback_payouts = {k.casefold(): v for k, v in TASK_ROBUX_PAYOUTS.items()}
+        self._replace((name, True, TASK_ROBUX_PAYOUTS.get(name, 0)) for name in TASK_TYPES)
+
+    def get(self, task_type: str | None) -> TaskTypeEntry | None:
+        return self.entries.get((task_type or "").strip().casefold())
+
+    def is_enabled(self, task_type: str | None) -> bool:
+        entry = self.get(task_type)
+        return entry is not None and entry.enabled
+
+    def payout(self, task_type: str | None) -> int:
+        entry = self.get(task_type)
+        if entry is not None:
+            return entry.robux_value
+        return self._fallback_payouts.get((task_type or "").strip().casefold(), 0)
+
+    def search(self, current: str, limit: int = 25) -> list[str]:
+        return self.autocomplete.search(current, limit)
+
+    def apply(self, task_type: str, enabled: bool, robux_value: int) -> None:
+        self.entries[task_type.casefold()] = TaskTypeEntry(task_type, enabled, robux_value)
+        self._reindex()
+
+    def discard(self, task_type: str) -> None:
+        if self.entries.pop(task_type.casefold(), None) is not None:
+            self._reindex()
+
+    async def load(self, pool: asyncpg.Pool) -> None:
+        async with pool.acquire() as conn:
+            rows = await conn.fetch("SELECT task_type, enabled, robux_value FROM task_types")
+        self._replace((r["task_type"], r["enabled"], r["robux_value"]) for r in rows)
+
+    def on_notify(self, payload: str) -> None:
+        data = json.loads(payload)
+        if data.get("deleted"):
+            self.discard(data["task_type"])
+        else:
+            self.apply(data["task_type"], data["enabled"], data["robux_value"])
+
+    def _replace(self, rows) -> None:
+        self.entries = {name.casefold(): TaskTypeEntry(name, enabled, robux) for name, enabled, robux in rows}
+        self._reindex()
+
+    def _reindex(self) -> None:
+        enabled = sorted((e for e in self.entries.values() if e.enabled), key=lambda e: e.name.casefold())
+        self.enabled_names = [e.name for e in enabled]
+        self.autocomplete.rebuild(self.enabled_names)
+
+
+# === Live weekly totals ===
+def sort_breakdown(items) -> list[tuple[str, int]]:
+    """Order (task type, count) pairs for display: most logged first, then by name."""
+    return sorted(items, key=lambda item: (-item[1], item[0].lower(), item[0]))
+
+
+class WeeklyMemberStats:
+    __slots__ = ("test_count", "misc_count", "seconds", "robux", "by_type")
+
+    def __init__(self):
+        self.test_count = 0
+        self.misc_count = 0
+        self.seconds = 0
+        self.robux = 0
+        self.by_type: dict[str, int] = {}
+
+    @property
+    def tasks(self) -> int:
+        return self.test_count + self.misc_count
+
+    @property
+    def minutes(self) -> int:
+        return self.seconds // 60
+
+    def add_tasks(self, task_type: str, count: int, payout: int) -> None:
+        if is_test_task_type(task_type):
+            self.test_count += count
+        else:
+            self.misc_count += count
+        self.robux += payout * count
+        remaining = self.by_type.get(task_type, 0) + count
+        if remaining > 0:
+            self.by_type[task_type] = remaining
+        else:
+            self.by_type.pop(task_type, None)
+
+    def breakdown(self) -> list[tuple[str, int]]:
+        return sort_breakdown(self.by_type.items())
+
+    def key(self) -> tuple:
+        return self.test_count, self.misc_count, self.seconds, self.robux, self.by_type
+
+
+# The writing transaction's id, in the form WeeklyAggregateStore.record_* take.
+CURRENT_XID_SQL = "pg_current_xact_id()::text::bigint"
+
+
+class WeeklyAggregateStore:
+    """Per-member totals for the current quota week, served from memory.
+
+    Seeded from the database, updated in place by this instance's task logs,
+    undos and session closes, and rebuilt every WEEKLY_STORE_RECONCILE_SECONDS
+    (which also picks up other instances' writes and payout changes). Reads
+    return None whenever the store can't vouch for the current week (not
+    loaded yet, or the week just rolled over) so callers fall back to SQL.
+    """
+
+    def __init__(self, catalog: TaskTypeCatalog):
+        self.catalog = catalog
+        self.week_key: str | None = None
+        self.members: dict[int, WeeklyMemberStats] = {}
+        self._pool: asyncpg.Pool | None = None
+        self._reload: asyncio.Task | None = None
+        # One buffer per load in flight: writes recorded while it reads are
+        # replayed onto its result instead of being overwritten by it, unless
+        # its snapshot already saw them.
+        self._pending: list[list[tuple]] = []
+
+    def is_current(self) -> bool:
+        if self.week_key is None:
+            return False
+        if self.week_key != quota_week_key():
+            # Minutes only reset when the weekly check truncates roblox_time, so re-read rather than guess.
+            self.schedule_reload()
+            return False
+        return True
+
+    def get(self, member_id: int) -> WeeklyMemberStats | None:
+        if not self.is_current():
+            return None
+        return self.members.get(member_id) or WeeklyMemberStats()
+
+    def snapshot(self, wk: str) -> dict[int, WeeklyMemberStats] | None:
+        return self.members if wk == self.week_key and self.is_current() else None
+
+    def leaderboard(self, limit: int, offset: int) -> list[dict[str, int]] | None:
+        """One page of this week's board, ordered like LEADERBOARD_QUERY."""
+        if not self.is_current():
+            return None
+        board = sorted(
+            ((member_id, st.tasks, st.minutes) for member_id, st in self.members.items() if st.tasks or st.minutes),
+            key=lambda row: (-row[1], -row[2], row[0]),
+        )
+        return [
+            {"member_id": member_id, "tasks": tasks, "minutes": minutes, "total": len(board)}
+            for member_id, tasks, minutes in board[offset:offset + limit]
+        ]
+
+    def record_tasks(self, member_id: int, task_type: str, ts: datetime.datetime, count: int = 1, *, xid: int) -> None:
+        """Apply committed task logs (negative ``count`` for removals); other weeks are ignored.
+
+        ``xid`` is the writing transaction's id (CURRENT_XID_SQL), so a reload
+        can tell whether its snapshot already holds the change.
+        """
+        for pending in self._pending:
+            pending.append((xid, member_id, task_type, ts, count, 0))
+        self._apply(self.members, self.week_key, member_id, task_type, ts, count, 0)
+
+    def record_seconds(self, member_id: int, seconds: int, ts: datetime.datetime, *, xid: int) -> None:
+        """Apply an on-site session that ended at ``ts``, written by transaction ``xid``; other weeks are ignored."""
+        for pending in self._pending:
+            pending.append((xid, member_id, None, ts, 0, seconds))
+        self._apply(self.members, self.week_key, member_id, None, ts, 0, seconds)
+
+    def _apply(self, members: dict[int, WeeklyMemberStats], wk: str | None, member_id: int,
+               task_type: str | None, ts: datetime.datetime, count: int, seconds: int) -> None:
+        if wk is None or quota_week_key(ts) != wk:
+            return
+        stats = members.get(member_id)
+        if stats is None:
+            stats = members[member_id] = WeeklyMemberStats()
+        if count:
+            stats.add_tasks(task_type or "Uncategorized", count, self.catalog.payout(task_type))
+        stats.seconds += seconds
+        if not stats.by_type and not stats.seconds:
+            del members[member_id]
+
+    async def load(self, pool: asyncpg.Pool) -> int:
+        """Rebuild from the database; returns how many members had drifted from it."""
+        self._pool = pool
+        wk = quota_week_key()
+        week_start, week_end = quota_week_bounds(wk)
+        pending: list[tuple] = []
+        self._pending.append(pending)
+        try:
+            async with pool.acquire() as conn:
+                # One snapshot for both tables, so a session close can't land between them.
+                async with conn.transaction(isolation="repeatable_read", readonly=True):
+                    task_rows = await conn.fetch(
+                        "SELECT member_id, COALESCE(NULLIF(task_type, ''), task) AS ttype, COUNT(*) AS cnt FROM task_logs "
+                        "WHERE week_key = $1 AND timestamp >= $2 AND timestamp < $3 GROUP BY member_id, ttype",
+                        wk, week_start, week_end,
+                    )
+                    time_rows = await conn.fetch("SELECT member_id, time_spent FROM roblox_time")
+                    members = build_weekly_stats(task_rows, time_rows, self.catalog)
+                    # Writers record after further awaits, so a change may have
+                    # committed before the snapshot yet be buffered here: replay
+                    # only transactions the snapshot can't see. Keep checking
+                    # until nothing new arrived during the check, then swap
+                    # without awaiting so no write slips between the two.
+                    checked = 0
+                    while checked < len(pending):
+                        batch, checked = pending[checked:], len(pending)
+                        seen = {
+                            r["xid"] for r in await conn.fetch(
+                                "SELECT x AS xid FROM unnest($1::bigint[]) x "
+                                "WHERE pg_visible_in_snapshot(x::text::xid8, pg_current_snapshot())",
+                                list({change[0] for change in batch}),
+                            )
+                        }
+                        for xid, *change in batch:
+                            if xid not in seen:
+                                self._apply(members, wk, *change)
+                    self._stop_buffering(pending)
+                    drifted = 0
+                    if wk == self.week_key:
+                        empty = WeeklyMemberStats().key()
+                        for member_id in members.keys() | self.members.keys():
+                            old, new = self.members.get(member_id), members.get(member_id)
+                            if (old.key() if old else empty) != (new.key() if new else empty):
+                                drifted += 1
+                    self.members, self.week_key = members, wk
+        finally:
+            self._stop_buffering(pending)
+        return drifted
+
+    def _stop_buffering(self, pending: list[tuple]) -> None:
+        # By identity: another load's buffer may hold equal changes.
+        self._pending = [p for p in self._pending if p is not pending]
+
+    def schedule_reload(self) -> None:
+        """Rebuild in the background (for bulk writes that are easier to re-read than replay)."""
+        if self._pool is not None and (self._reload is None or self._reload.done()):
+            self._reload = asyncio.create_task(self._background_load())
+
+    async def _background_load(self) -> None:
+        try:
+            await self.load(self._pool)
+        except Exception as e:
+            print(f"[weekly-store] Reload failed; reads fall back to the database: {e}")
+
+
+def build_weekly_stats(task_rows, time_rows, catalog: TaskTypeCatalog) -> dict[int, WeeklyMemberStats]:
+    """Fold (member_id, ttype, cnt) and (member_id, time_spent) rows into per-member stats."""
+    members: dict[int, WeeklyMemberStats] = {}
+    for row in task_rows:
+        stats = members.get(row["member_id"])
+        if stats is None:
+            stats = members[row["member_id"]] = WeeklyMemberStats()
+        task_type = row["ttype"] or "Uncategorized"
+        stats.add_tasks(task_type, int(row["cnt"] or 0), catalog.payout(task_type))
+    for row in time_rows:
+        stats = members.get(row["member_id"])
+        if stats is None:
+            stats = members[row["member_id"]] = WeeklyMemberStats()
+        stats.seconds += int(row["time_spent"] or 0)
+    return members
+
+
+# === Write-behind side effects ===
+class SideEffectPipeline:
+    """Runs side effects of an already-committed write off the interaction path.
+
+    Jobs sharing a key (a member ID) run strictly in submission order; jobs for
+    different keys run in parallel, at most ``concurrency`` at a time. A failed
+    job is retried with exponential backoff and dropped (logged) after
+    ``max_attempts`` so it can never wedge that member's queue.
+    """
+
+    def __init__(self, concurrency: int, max_attempts: int = SIDE_EFFECT_MAX_ATTEMPTS, base_delay: float = 1.0):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self._gate = asyncio.Semaphore(max(1, concurrency))
+        self._queues: dict[int, deque] = {}
+        self._drainers: set[asyncio.Task] = set()
+
+    def submit(self, key: int, label: str, job) -> None:
+        """Queue ``job`` (a zero-argument coroutine function, so retries can call it again)."""
+        queue = self._queues.get(key)
+        if queue is not None:
+            queue.append((label, job))
+            return
+        self._queues[key] = deque([(label, job)])
+        task = asyncio.create_task(self._drain(key))
+        self._drainers.add(task)
+        task.add_done_callback(self._drainers.discard)
+
+    async def join(self, timeout: float | None = None) -> None:
+        if self._drainers:
+            await asyncio.wait(set(self._drainers), timeout=timeout)
+
+    async def _drain(self, key: int) -> None:
+        queue = self._queues[key]
+        try:
+            while queue:
+                label, job = queue.popleft()
+                await self._run(key, label, job)
+        finally:
+            del self._queues[key]
+
+    async def _run(self, key: int, label: str, job) -> None:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                async with self._gate:
+                    await job()
+                return
+            except (discord.Forbidden, discord.NotFound) as e:
+                print(f"[pipeline] {label} for {key} failed permanently: {e}")
+                return
+            except Exception as e:
+                if attempt == self.max_attempts:
+                    print(f"[pipeline] {label} for {key} dropped after {attempt} attempts: {e}")
+                    return
+                # Back off outside the gate so other members' jobs keep flowing.
+                await asyncio.sleep(self.base_delay * 2 ** (attempt - 1))
+
+
+# === Proof fingerprints ===
+# Near-duplicate threshold in dHash bits. Must stay below the number of bands
+# (4) for the band lookup to be exhaustive.
+PROOF_NEAR_DUPLICATE_DISTANCE = 3
+
+PROOF_MATCH_QUERY = (
+    "SELECT log_id, member_id, sha256 = $1 AS exact FROM proof_hashes "
+    "WHERE (sha256 = $1 OR bands && $2::int[]) "
+    "AND NOT (log_id = ANY($4::bigint[]) AND timestamp = $5) "
+    # Counting the 1s of the bit string works on every Postgres; bit_count() needs 14+.
+    "AND (sha256 = $1 OR length(replace((dhash # $3)::bit(64)::text, '0', '')) <= $6) "
+    "ORDER BY exact DESC, log_id LIMIT 1"
+)
+
+
+def _dhash_image(data: bytes) -> int | None:
+    """64-bit difference hash of an image as a signed BIGINT, or None if it doesn't decode.
+
+    Top-level so it can be pickled into the worker processes.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            img.draft("L", (64, 64))  # JPEGs decode straight to a small grayscale
+            pixels = list(img.convert("L").resize((9, 8), Image.Resampling.LANCZOS).getdata())
+    except Exception:
+        return None
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return bits - (1 << 64) if bits >= 1 << 63 else bits
+
+
+def proof_hash_bands(dhash: int) -> list[int]:
+    """Split a dHash into four 16-bit pieces, each tagged with its position."""
+    unsigned = dhash & 0xFFFF_FFFF_FFFF_FFFF
+    return [(i << 16) | ((unsigned >> (16 * i)) & 0xFFFF) for i in range(4)]
+
+
+class ProofHasher:
+    """Fingerprints proof attachments so re-used screenshots can be flagged.
+
+    The download is streamed through SHA-256 (exact copies); images up to
+    ``max_bytes`` also get a dHash computed in a worker process (re-encodes,
+    resizes, small crops). Both land in proof_hashes, where the duplicate
+    lookup is a single index probe.
+    """
+
+    def __init__(self, workers: int, max_bytes: int):
+        self.workers = max(1, workers)
+        self.max_bytes = max_bytes
+        self._executor: ProcessPoolExecutor | None = None
+
+    async def fingerprint(self, url: str) -> tuple[bytes, int | None]:
+        digest = hashlib.sha256()
+        buffer: bytearray | None = bytearray() if Image is not None else None
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=60)) as session:
+            async with session.get(url) as resp:
+                resp.raise_for_status()
+                if not resp.content_type.startswith("image/"):
+                    buffer = None
+                async for chunk in resp.content.iter_chunked(64 * 1024):
+                    digest.update(chunk)
+                    if buffer is not None:
+                        buffer += chunk
+                        if len(buffer) > self.max_bytes:
+                            buffer = None
+        dhash = await self._dhash(bytes(buffer)) if buffer else None
+        return digest.digest(), dhash
+
+    async def _dhash(self, data: bytes) -> int | None:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, _dhash_image, data)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM on a hostile image); start fresh next time.
+            self._executor = None
+            return None
+
+    async def record(self, pool: asyncpg.Pool, log_ids: list[int], ts: datetime.datetime,
+                     member_id: int, url: str) -> asyncpg.Record | None:
+        """Store the fingerprint of the proof shared by task logs ``log_ids`` (all
+        written at ``ts``) and return the best earlier match (exact before near), if any."""
+        sha, dhash = await self.fingerprint(url)
+        bands = proof_hash_bands(dhash) if dhash is not None else None
+        async with pool.acquire() as conn:
+            await conn.executemany(
+                "INSERT INTO proof_hashes (log_id, timestamp, member_id, sha256, dhash, bands) "
+                "VALUES ($1, $2, $3, $4, $5, $6) ON CONFLICT DO NOTHING",
+                [(log_id, ts, member_id, sha, dhash, bands) for log_id in log_ids],
+            )
+            return await conn.fetchrow(
+                PROOF_MATCH_QUERY, sha, bands, dhash, log_ids, ts, PROOF_NEAR_DUPLICATE_DISTANCE
+            )
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def describe_proof_match(match: asyncpg.Record) -> str:
+    kind = "exact copy" if match["exact"] else "near match"
+    return f"⚠️ **Possible duplicate proof:** {kind} of log #{match['log_id']} by <@{match['member_id']}>."
+
+
+# === Leader election ===
+LEADER_LOCK_KEY = 0x4D445F4C45414452  # "MD_LEADR"
+
+
+class LeaderElector:
+    """Runs singleton jobs on exactly one instance, elected by a Postgres advisory lock.
+
+    The lock belongs to a dedicated session, so the lease lasts as long as that
+    connection: if the leader crashes or loses the database, Postgres releases
+    the lock and the next follower to poll takes over. Renewal is a health
+    check on the session; the moment it fails we stop the jobs.
+    """
+
+    def __init__(self, dsn: str | None, renew_seconds: int):
+        self.dsn = dsn
+        self.renew_seconds = max(1, renew_seconds)
+        self.jobs: list[tasks.Loop] = []
+        self.on_elected: Callable[[], Awaitable[None]] | None = None
+        self.conn: asyncpg.Connection | None = None
+        self.is_leader = False
+        self._task: asyncio.Task | None = None
+        self._elected_tasks: set[asyncio.Task] = set()
+
+    def start(self, jobs: list[tasks.Loop], on_elected: Callable[[], Awaitable[None]] | None = None) -> None:
+        """Campaign for the lock; the winner starts ``jobs`` and runs ``on_elected`` once per election."""
+        if not self.dsn or (self._task is not None and not self._task.done()):
+            return
+        self.jobs = list(jobs)
+        self.on_elected = on_elected
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+        await self._step_down("shutting down")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if self.is_leader:
+                    await asyncio.wait_for(self.conn.fetchval("SELECT 1"), timeout=self.renew_seconds)
+                else:
+                    await self._campaign()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await self._step_down(f"lock session failed: {e}")
+            await asyncio.sleep(self.renew_seconds)
+
+    async def _campaign(self) -> None:
+        if self.conn is None or self.conn.is_closed():
+            self.conn = await asyncpg.connect(self.dsn)
+            self.conn.add_termination_listener(self._on_terminated)
+        if not await self.conn.fetchval("SELECT pg_try_advisory_lock($1)", LEADER_LOCK_KEY):
+            return
+        self.is_leader = True
+        print("[leader] Elected; starting singleton jobs.")
+        for job in self.jobs:
+            if not job.is_running():
+                job.start()
+        if self.on_elected is not None:
+            # Its own task, never cancelled by _stop_jobs: catch-up work outlives the lease.
+            task = asyncio.create_task(self._run_on_elected())
+            self._elected_tasks.add(task)
+            task.add_done_callback(self._elected_tasks.discard)
+
+    async def _run_on_elected(self) -> None:
+        try:
+            await self.on_elected()
+        except Exception as e:
+            print(f"[leader] Election catch-up failed: {e}")
+
+    def _stop_jobs(self) -> None:
+        for job in self.jobs:
+            if job.is_running():
+                job.cancel()
+
+    def _on_terminated(self, _conn) -> None:
+        # The lock went with the session; stop now rather than at the next renewal.
+        if self.is_leader:
+            print("[leader] Lock session terminated; stopping singleton jobs.")
+        self.is_leader = False
+        self._stop_jobs()
+
+    async def _step_down(self, reason: str) -> None:
+        if self.is_leader:
+            print(f"[leader] Stepping down ({reason}).")
+        self.is_leader = False
+        self._stop_jobs()
+        conn, self.conn = self.conn, None
+        if conn is not None and not conn.is_closed():
+            try:
+                await asyncio.wait_for(conn.close(), timeout=5)
+            except Exception:
+                conn.terminate()
+
+
+# An idle primary makes replay timestamps look stale, so a fully replayed
+# standby counts as zero lag; one whose WAL receiver is down never does.
+REPLICA_LAG_QUERY = (
+    "SELECT NOT pg_is_in_recovery() "
+    "       OR EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') AS streaming, "
+    "CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END AS lag"
+)
+
+
+# === Bot class ===
+class MD_BOT(commands.Bot):
+    def __init__(self):
+        super().__init__(command_prefix='!', intents=intents)
+        self.db_pool: Optional[asyncpg.Pool] = None
+        self.replica_pool: Optional[asyncpg.Pool] = None
+        self._replica_lag: float | None = None
+        self._replica_checked_at = 0.0
+        self.ai = SimpleOpenAI(OPENAI_API_KEY or "", AI_BASE_URL)
+        self.guidelines = GuidelineStore(GUIDELINES_FILE)
+        self.auto_answer_user_buckets = TokenBucketRegistry(GUIDELINES_AUTO_USER_BURST, GUIDELINES_AUTO_USER_PER_HOUR)
+        self.auto_answer_channel_buckets = TokenBucketRegistry(GUIDELINES_AUTO_CHANNEL_BURST, GUIDELINES_AUTO_CHANNEL_PER_HOUR)
+        self.member_profiles = MemberProfileCache(MEMBER_PROFILE_CACHE_SIZE, MEMBER_PROFILE_CACHE_TTL)
+        self.settings = SettingsCache()
+        self.notifier = DbNotifier(DATABASE_URL)
+        self.leader = LeaderElector(DATABASE_URL, LEADER_RENEW_SECONDS)
+        self.side_effects = SideEffectPipeline(SIDE_EFFECT_CONCURRENCY)
+        self.proof_hasher = ProofHasher(PROOF_HASH_WORKERS, PROOF_HASH_MAX_BYTES)
+        self.proof_checks = SideEffectPipeline(PROOF_HASH_WORKERS)
+        self.task_catalog = TaskTypeCatalog()
+        self.weekly = WeeklyAggregateStore(self.task_catalog)
+        self.group_rank_autocomplete = AutocompleteEngine()
+        self._group_ranks_expires = 0.0
+        self._group_ranks_refresh: asyncio.Task | None = None
+        self._auto_answers: set[asyncio.Task] = set()
+        self.weekly_closes: set[asyncio.Task] = set()
+        self.notifier.subscribe(SettingsCache.CHANNEL, self.settings.on_notify, self._resync_settings)
+        self.notifier.subscribe(TaskTypeCatalog.CHANNEL, self.task_catalog.on_notify, self._resync_task_catalog)
+        self._bootstrap_lock = asyncio.Lock()
+        self._bootstrap_complete = False
+        self.web_runner: web.AppRunner | None = None
+        self.web_site: web.TCPSite | None = None
+
+    async def setup_hook(self):
+        # DB pool
+        try:
+            self.db_pool = await asyncpg.create_pool(DATABASE_URL, min_size=1, max_size=10)
+            async with self.db_pool.acquire() as c:
+                await c.execute('SELECT 1')
+            print("[DB] Connected.")
+            if DATABASE_REPLICA_URL:
+                try:
+                    self.replica_pool = await asyncpg.create_pool(DATABASE_REPLICA_URL, min_size=1, max_size=10)
+                    print("[DB] Read replica connected.")
+                except Exception as replica_err:
+                    print(f"[DB] Read replica unavailable; reads stay on the primary: {replica_err}")
+        except Exception as e:
+            print(f"[DB] FAILED: {e}")
+            # Even if the DB is down, still attempt to register slash commands so the
+            # tree stays current. The commands that rely on the DB will surface
+            # their own errors when invoked.
+            try:
+                synced = await self.tree.sync()
+                print(f"[Slash] Synced {len(synced)} command(s) (DB unavailable)")
+            except Exception as sync_err:
+                print(f"[Slash] Sync failed without DB: {sync_err}")
+            return
+
+        # Run bootstrap (schema, web server, slash sync)
+        await self.ensure_bootstrap()
+
+    async def ensure_bootstrap(self) -> None:
+        if self._bootstrap_complete or not self.db_pool:
+            return
+
+        async with self._bootstrap_lock:
+            if self._bootstrap_complete or not self.db_pool:
+                return
+
+            # Schema (versioned migrations; a warm start is one version check)
+            async with self.db_pool.acquire() as connection:
+                applied = await apply_schema_migrations(connection)
+
+            print(f"[DB] Tables ready ({applied} migration(s) applied).")
+
+            # In-memory caches, kept fresh across instances via LISTEN/NOTIFY.
+            # LISTEN first so a change committed during the initial load is not missed.
+            try:
+                await self.notifier.start()
+            except Exception as e:
+                print(f"[notify] LISTEN connection failed; retrying in the background: {e}")
+                self.notifier.schedule_reconnect()
+            await self.settings.load(self.db_pool)
+            await self.task_catalog.load(self.db_pool)
+            self.schedule_group_rank_refresh()
+
+            if not self.web_runner:
+                app = web.Application()
+                app.router.add_get('/health', lambda _: web.Response(text='ok', status=200))
+                app.router.add_post('/roblox', self.roblox_handler)
+                app.router.add_post('/roblox/audit', self.roblox_audit_handler)
+                self.web_runner = web.AppRunner(app)
+                await self.web_runner.setup()
+                self.web_site = web.TCPSite(self.web_runner, '0.0.0.0', 8080)
+                await self.web_site.start()
+                print("[Web] Server up on :8080 (GET /health, POST /roblox, POST /roblox/audit).")
+
+            # Sync slash commands once
+            try:
+                synced = await self.tree.sync()
+                print(f"[Slash] Synced {len(synced)} command(s)")
+            except Exception as e:
+                print(f"[Slash] Sync failed: {e}")
+
+            self._bootstrap_complete = True
+
+    async def close(self) -> None:
+        # Give queued log embeds and promotion checks a moment to go out. Proof
+        # checks first: a duplicate they find queues an edit on side_effects.
+        await self.proof_checks.join(timeout=5)
+        await self.side_effects.join(timeout=10)
+        self.proof_hasher.close()
+        # Release the leader lock and the LISTEN connection now, so a standby
+        # can take over without waiting for these sessions to time out.
+        await self.leader.close()
+        await self.notifier.close()
+        await super().close()
+        for pool in (self.replica_pool, self.db_pool):
+            if pool is not None:
+                try:
+                    await asyncio.wait_for(pool.close(), timeout=10)
+                except Exception:
+                    pool.terminate()
+
+    async def _resync_settings(self) -> None:
+        await self.settings.load(self.db_pool)
+
+    async def _resync_task_catalog(self) -> None:
+        await self.task_catalog.load(self.db_pool)
+
+    async def _replica_usable(self) -> bool:
+        if not self.replica_pool:
+            return False
+        now = time.monotonic()
+        if now - self._replica_checked_at >= REPLICA_LAG_CHECK_SECONDS:
+            self._replica_checked_at = now
+            try:
+                async with self.replica_pool.acquire(timeout=2) as conn:
+                    row = await conn.fetchrow(REPLICA_LAG_QUERY, timeout=2)
+                if not row["streaming"]:
+                    # Replay has caught up with what was received, but nothing
+                    # new arrives: the standby is frozen, however current it looks.
+                    if self._replica_lag is not None:
+                        print("[DB] Read replica stopped streaming WAL; routing reads to the primary.")
+                    self._replica_lag = None
+                else:
+                    self._replica_lag = float(row["lag"]) if row["lag"] is not None else None
+            except Exception as e:
+                if self._replica_lag is not None:
+                    print(f"[DB] Read replica check failed; routing reads to the primary: {e}")
+                self._replica_lag = None
+        return self._replica_lag is not None and self._replica_lag <= REPLICA_MAX_LAG_SECONDS
+
+    @contextlib.asynccontextmanager
+    async def acquire_read(self):
+        """Acquire a connection for read-only work: the replica when healthy, else the primary.
+
+        Only use this where a few seconds of staleness is acceptable.
+        """
+        pool = self.replica_pool if await self._replica_usable() else self.db_pool
+        try:
+            conn = await pool.acquire()
+        except Exception:
+            if pool is self.db_pool:
+                raise
+            self._replica_lag = None
+            pool = self.db_pool
+            conn = await pool.acquire()
+        try:
+            yield conn
+        finally:
+            await pool.release(conn)
+
+    async def resolve_member_rank(self, member: discord.Member) -> str:
+        hit, cached_rank = self.member_profiles.get_rank(member.id)
+        if hit:
+            return cached_rank
+        stored_rank: str | None = None
+        lookup_failed = False
+        if self.db_pool:
+            try:
+                async with self.db_pool.acquire() as conn:
+                    stored_rank = await conn.fetchval("SELECT rank FROM member_ranks WHERE discord_id=$1", member.id)
+            except Exception as e:
+                lookup_failed = True
+                print(f"[WARN] Failed to fetch stored rank for {member.id}: {e}")
+        if stored_rank:
+            resolved = stored_rank
+        else:
+            top_role = max(
+                (role for role in member.roles if not role.is_default()),
+                key=lambda r: r.position,
+                default=None,
+            )
+            resolved = top_role.name if top_role else "Member"
+        if not lookup_failed:
+            self.member_profiles.put_rank(member.id, resolved)
+        return resolved
+
+    def remember_member_rank(self, member_id: int, rank_name: str) -> None:
+        """Write-through hook for commands that just stored a new rank in member_ranks."""
+        self.member_profiles.put_rank(member_id, rank_name)
+
+    def search_group_ranks(self, current: str) -> list[str]:
+        """Autocomplete over the cached group ranks; never waits on the rank service."""
+        if time.monotonic() >= self._group_ranks_expires:
+            self.schedule_group_rank_refresh()
+        return self.group_rank_autocomplete.search(current)
+
+    def schedule_group_rank_refresh(self) -> None:
+        if self._group_ranks_refresh is None or self._group_ranks_refresh.done():
+            self._group_ranks_refresh = asyncio.create_task(self._refresh_group_ranks())
+
+    async def _refresh_group_ranks(self) -> None:
+        roles = await fetch_group_ranks()
+        if roles:
+            self.group_rank_autocomplete.rebuild(r["name"] for r in roles if r.get("name"))
+            self._group_ranks_expires = time.monotonic() + GROUP_RANKS_TTL_SECONDS
+        else:
+            # Keep serving the last good list and try again shortly.
+            self._group_ranks_expires = time.monotonic() + 30
+
+    async def get_roblox_id(self, discord_id: int) -> int | None:
+        if not self.db_pool:
+            return None
+        try:
+            async with self.db_pool.acquire() as conn:
+                return await conn.fetchval(
+                    "SELECT roblox_id FROM roblox_verification WHERE discord_id = $1",
+                    discord_id,
+                )
+        except Exception as e:
+            print(f"[WARN] Failed to fetch Roblox ID for {discord_id}: {e}")
+            return None
+
+    async def get_guideline_context(self, discord_id: int) -> str | None:
+        hit, cached = self.member_profiles.get_context(discord_id)
+        if hit:
+            return cached
+        if not self.db_pool:
+            return None
+        try:
+            async with self.db_pool.acquire() as conn:
+                details = await conn.fetchval(
+                    "SELECT details FROM guideline_context WHERE discord_id=$1",
+                    discord_id,
+                )
+        except Exception as e:
+            print(f"[WARN] Failed to load guideline context for {discord_id}: {e}")
+            return None
+        self.member_profiles.put_context(discord_id, details)
+        return details
+
+    async def set_guideline_context(self, discord_id: int, details: str) -> None:
+        if not self.db_pool:
+            return
+        try:
+            async with self.db_pool.acquire() as conn:
+                await conn.execute(
+                    "INSERT INTO guideline_context (discord_id, details, updated_at) VALUES ($1, $2, $3) "
+                    "ON CONFLICT (discord_id) DO UPDATE SET details = EXCLUDED.details, updated_at = EXCLUDED.updated_at",
+                    discord_id,
+                    details,
+                    utcnow(),
+                )
+        except Exception as e:
+            self.member_profiles.invalidate(discord_id)
+            print(f"[WARN] Failed to store guideline context for {discord_id}: {e}")
+            return
+        self.member_profiles.put_context(discord_id, details)
+
+    async def clear_guideline_context(self, discord_id: int) -> None:
+        if not self.db_pool:
+            return
+        try:
+            async with self.db_pool.acquire() as conn:
+                await conn.execute(
+                    "DELETE FROM guideline_context WHERE discord_id=$1",
+                    discord_id,
+                )
+        except Exception as e:
+            self.member_profiles.invalidate(discord_id)
+            print(f"[WARN] Failed to clear guideline context for {discord_id}: {e}")
+            return
+        self.member_profiles.put_context(discord_id, None)
+
+    async def on_message(self, message: discord.Message):
+        if message.author.bot:
+            return
+
+        await self.ensure_bootstrap()
+
+        channel_id: int | None = None
+        if isinstance(message.channel, discord.Thread):
+            channel_id = message.channel.parent_id
+        elif isinstance(message.channel, discord.abc.GuildChannel):
+            channel_id = message.channel.id
+
+        if channel_id in GUIDELINES_AUTO_CHANNEL_IDS and self.should_auto_answer(message, channel_id):
+            # The AI round-trip runs in the background so prefix commands never wait on it.
+            task = asyncio.create_task(self._auto_answer_in_background(message))
+            self._auto_answers.add(task)
+            task.add_done_callback(self._auto_answers.discard)
 
         await super().on_message(message)
 
+    async def _auto_answer_in_background(self, message: discord.Message) -> None:
+        try:
+            await self.auto_answer_guidelines(message)
+        except Exception as e:
+            print(f"[guidelines-auto] Auto-answer failed for message {message.id}: {e}")
+
+    def should_auto_answer(self, message: discord.Message, channel_id: int) -> bool:
+        """Cheap, synchronous gate in front of the AI call; ordered from cheapest to most expensive check."""
+        if not OPENAI_API_KEY or not isinstance(message.author, discord.Member):
+            return False
+        text = message.content
+        if not text or len(text) > GUIDELINES_AUTO_MAX_CHARS:
+            return False
+        if len(text) < 8 or sum(ch.isalpha() for ch in text) < 4:
+            return False
+        is_question, mentions_keyword, has_troll_word = classify_message(text)
+        if has_troll_word or not (is_question and mentions_keyword):
+            return False
+        # Peek the user's bucket first so a rejected user never drains the shared channel budget.
+        user_bucket = self.auto_answer_user_buckets.get(message.author.id)
+        if not user_bucket.available():
+            return False
+        if not self.auto_answer_channel_buckets.get(channel_id).consume():
+            return False
+        return user_bucket.consume()
+
+    async def auto_answer_guidelines(self, message: discord.Message) -> None:
+        member = message.author
+        question = message.content.strip()
+        context = self.guidelines.build_context(question)
+        saved_context = await self.get_guideline_context(member.id)
+        if saved_context:
+            context = f"{context}\n\nSaved member background:\n{saved_context}".strip()
+        role_name = await self.resolve_member_rank(member)
+        try:
+            async with message.channel.typing():
+                answer = await self.ai.answer_guidelines(question, role_name, context)
+        except Exception as e:
+            print(f"[guidelines] Auto-answer failed for {member.id}: {e}")
+            return
+        chunks = smart_chunk(answer, size=1900)
+        try:
+            await message.reply(chunks[0], mention_author=False)
+            for chunk in chunks[1:]:
+                await message.channel.send(chunk)
+        except discord.HTTPException as e:
+            print(f"[guidelines] Failed to send auto-answer in {message.channel.id}: {e}")
+
     # --- Roblox webhook with activity embeds ---
     async def roblox_handler(self, request):
         print("[/roblox] hit")
@@ -1085,11 +2930,13 @@ class MD_BOT(commands.Bot):
                     if session_start:
                         await connection.execute("DELETE FROM roblox_sessions WHERE roblox_id = $1", roblox_id)
                         duration = (utcnow() - session_start).total_seconds()
-                        await connection.execute(
+                        xid = await connection.fetchval(
                             "INSERT INTO roblox_time (member_id, time_spent) VALUES ($1, $2) "
-                            "ON CONFLICT (member_id) DO UPDATE SET time_spent = roblox_time.time_spent + $2",
+                            "ON CONFLICT (member_id) DO UPDATE SET time_spent = roblox_time.time_spent + $2 "
+                            f"RETURNING {CURRENT_XID_SQL}",
                             discord_id, int(duration)
                         )
+                        self.weekly.record_seconds(discord_id, int(duration), utcnow(), xid=xid)
 
                 mins = int((utcnow() - session_start).total_seconds() // 60) if session_start else 0
                 async with self.db_pool.acquire() as connection:
@@ -1167,13 +3014,21 @@ async def on_ready():
     print(f'[READY] Logged in as {bot.user.name}')
     print("Activity channel:", bot.get_channel(ACTIVITY_LOG_CHANNEL_ID))
     print("Command log channel:", bot.get_channel(COMMAND_LOG_CHANNEL_ID))
-    check_weekly_tasks.start()
-    orientation_reminder_loop.start()
+    # Singleton jobs only run on the elected instance; commands and webhooks run everywhere.
+    bot.leader.start([
+        check_weekly_tasks, orientation_reminder_loop, task_log_partition_maintenance, task_log_retention_loop,
+    ], on_elected=catch_up_weekly_close)
+    # Every instance keeps its own weekly totals; the first pass seeds them.
+    if not weekly_store_reconcile_loop.is_running():
+        weekly_store_reconcile_loop.start()
 
 @bot.event
 async def on_member_update(before: discord.Member, after: discord.Member):
     before_roles = {r.id for r in before.roles}
     after_roles  = {r.id for r in after.roles}
+    if before_roles != after_roles:
+        # The fallback rank is derived from the top role, so a role change makes it stale.
+        bot.member_profiles.invalidate_rank(after.id)
     if MEDICAL_STUDENT_ROLE_ID and (MEDICAL_STUDENT_ROLE_ID not in before_roles) and (MEDICAL_STUDENT_ROLE_ID in after_roles):
         assigned = utcnow()
         deadline = assigned + datetime.timedelta(days=14)
@@ -1521,59 +3376,31 @@ async def announce(interaction: discord.Interaction, color: str = "blue"):
     await interaction.response.send_modal(AnnouncementForm(color_obj=color_obj))
 
 # ---------- Tasks ----------
-async def fetch_enabled_task_types() -> list[str]:
-    """Return enabled task types ordered for command autocompletes."""
-    if not bot.db_pool:
-        return list(TASK_TYPES)
-    async with bot.db_pool.acquire() as conn:
-        rows = await conn.fetch(
-            "SELECT task_type FROM task_types WHERE enabled = TRUE ORDER BY task_type ASC"
-        )
-    return [r["task_type"] for r in rows]
-
-
-async def get_task_type_robux_map(enabled_only: bool = False) -> dict[str, int]:
-    query = "SELECT task_type, robux_value FROM task_types"
-    if enabled_only:
-        query += " WHERE enabled = TRUE"
-    if not bot.db_pool:
-        return {k.casefold(): v for k, v in TASK_ROBUX_PAYOUTS.items()}
-    async with bot.db_pool.acquire() as conn:
-        rows = await conn.fetch(query)
-    return {(r["task_type"] or "").casefold(): int(r["robux_value"] or 0) for r in rows}
-
-
-async def is_quota_paused(conn: asyncpg.Connection | None = None) -> bool:
-    """Return the persistent weekly quota pause state."""
-    if not bot.db_pool:
-        return False
+async def is_quota_paused() -> bool:
+    """Return the persistent weekly quota pause state (served from the settings cache)."""
+    return bot.settings.get("quota_paused")
 
-    if conn is not None:
-        value = await conn.fetchval(
-            "SELECT setting_value FROM bot_settings WHERE setting_key = 'quota_paused'"
-        )
-        return bool(value)
 
-    async with bot.db_pool.acquire() as acquired_conn:
-        return await is_quota_paused(acquired_conn)
+async def count_weekly_tasks(conn: asyncpg.Connection, member_id: int, wk: str | None = None) -> int:
+    """Count a member's task logs in a quota week (the current one by default)."""
+    wk = wk or quota_week_key()
+    start, end = quota_week_bounds(wk)
+    # The timestamp bounds are redundant with week_key but let Postgres prune partitions.
+    count = await conn.fetchval(
+        "SELECT COUNT(*) FROM task_logs "
+        "WHERE week_key = $1 AND member_id = $2 AND timestamp >= $3 AND timestamp < $4",
+        wk, member_id, start, end,
+    )
+    return int(count or 0)
 
 
-async def sync_weekly_task_counter(conn: asyncpg.Connection, member_id: int) -> int:
-    """Keep the legacy weekly_tasks counter aligned with weekly_task_logs."""
-    count = await conn.fetchval(
-        "SELECT COUNT(*) FROM weekly_task_logs WHERE member_id = $1",
+async def fetch_member_task_totals(conn: asyncpg.Connection, member_id: int) -> list[asyncpg.Record]:
+    """Return a member's all-time per-type counts from the member_task_totals rollup."""
+    return await conn.fetch(
+        "SELECT normalized_type, NULLIF(task_type, '') AS ttype, count AS cnt "
+        "FROM member_task_totals WHERE member_id = $1 ORDER BY count DESC, task_type ASC",
         member_id,
     )
-    count = int(count or 0)
-    if count:
-        await conn.execute(
-            "INSERT INTO weekly_tasks (member_id, tasks_completed) VALUES ($1, $2) "
-            "ON CONFLICT (member_id) DO UPDATE SET tasks_completed = EXCLUDED.tasks_completed",
-            member_id, count,
-        )
-    else:
-        await conn.execute("DELETE FROM weekly_tasks WHERE member_id = $1", member_id)
-    return count
 
 
 async def task_type_autocomplete(
@@ -1581,19 +3408,11 @@ async def task_type_autocomplete(
     current: str
 ) -> list[app_commands.Choice[str]]:
     del interaction
-    try:
-        task_types = await fetch_enabled_task_types()
-    except Exception:
-        task_types = list(TASK_TYPES)
-    current_lower = current.lower().strip()
-    filtered = [t for t in task_types if current_lower in t.lower()] if current_lower else task_types
-    return [app_commands.Choice(name=t, value=t) for t in filtered[:25]]
+    return [app_commands.Choice(name=t, value=t) for t in bot.task_catalog.search(current)]
 
 
-async def is_valid_task_type(task_type: str) -> bool:
-    task_types = await fetch_enabled_task_types()
-    normalized = task_type.strip().casefold()
-    return any(t.casefold() == normalized for t in task_types)
+def is_valid_task_type(task_type: str) -> bool:
+    return bot.task_catalog.is_enabled(task_type)
 
 
 def is_test_task_type(task_type: str | None) -> bool:
@@ -1639,42 +3458,64 @@ class LogTaskForm(discord.ui.Modal, title='Add Comments (optional)'):
         member_id = interaction.user.id
         comments_str = self.comments.value or "No comments"
 
+        now = utcnow()
         async with bot.db_pool.acquire() as conn:
-            # permanent + weekly + counter
-            await conn.execute(
-                "INSERT INTO task_logs (member_id, task, task_type, proof_url, comments, timestamp) "
-                "VALUES ($1, $2, $3, $4, $5, $6)",
-                member_id, self.task_type, self.task_type, self.proof.url, comments_str, utcnow()
+            logged = await conn.fetchrow(
+                "INSERT INTO task_logs (member_id, task, task_type, proof_url, comments, timestamp, week_key) "
+                f"VALUES ($1, $2, $3, $4, $5, $6, $7) RETURNING log_id, {CURRENT_XID_SQL} AS xid",
+                member_id, self.task_type, self.task_type, self.proof.url, comments_str, now, quota_week_key(now)
             )
-            await conn.execute(
-                "INSERT INTO weekly_task_logs (member_id, task, task_type, proof_url, comments, timestamp) "
-                "VALUES ($1, $2, $3, $4, $5, $6)",
-                member_id, self.task_type, self.task_type, self.proof.url, comments_str, utcnow()
-            )
-            tasks_completed = await sync_weekly_task_counter(conn, member_id)
+            tasks_completed = await count_weekly_tasks(conn, member_id, quota_week_key(now))
+        log_id = logged["log_id"]
+        bot.weekly.record_tasks(member_id, self.task_type, now, xid=logged["xid"])
 
-        full_description = f"**Task Type:** {self.task_type}\n\n**Comments:**\n{comments_str}"
-        await send_long_embed(
-            target=log_channel,
-            title="✅ Task Logged",
-            description=full_description,
-            color=discord.Color.green(),
-            footer_text=f"Member ID: {member_id}",
-            author_name=interaction.user.display_name,
-            author_icon_url=interaction.user.avatar.url if interaction.user.avatar else None,
-            image_url=self.proof.url
-        )
-        await log_action("Task Logged", f"User: {interaction.user.mention}\nType: **{self.task_type}**")
+        # The log is committed; acknowledge now and let the pipeline do the rest.
         await interaction.response.send_message(
             f"Your task has been logged! You have completed {tasks_completed} task(s) this week.",
             ephemeral=True
         )
-        await maybe_send_promotion_alert(interaction.user)
+
+        user = interaction.user
+        task_type = self.task_type
+        proof_url = self.proof.url
+        full_description = f"**Task Type:** {task_type}\n\n**Comments:**\n{comments_str}"
+        # Built now, so a retry after a partial send only posts the missing parts.
+        post_log_embed = ResumableSend(log_channel, build_long_embeds(
+            title="✅ Task Logged",
+            description=full_description,
+            color=discord.Color.green(),
+            footer_text=f"Member ID: {member_id}",
+            author_name=user.display_name,
+            author_icon_url=user.avatar.url if user.avatar else None,
+            image_url=proof_url
+        ))
+
+        async def hash_proof():
+            match = await bot.proof_hasher.record(bot.db_pool, [log_id], now, member_id, proof_url)
+            if match:
+                async def flag_log_embed():
+                    await post_log_embed.flag(describe_proof_match(match), discord.Color.orange())
+
+                # Queued behind the log embed for this member, so it edits the posted log.
+                bot.side_effects.submit(member_id, "duplicate proof flag", flag_log_embed)
+
+        async def audit():
+            await log_action("Task Logged", f"User: {user.mention}\nType: **{task_type}**")
+
+        async def promotion_check():
+            # The alert is one message sent last, and a failed send is logged
+            # rather than raised, so a retry never follows a posted alert.
+            await maybe_send_promotion_alert(user)
+
+        bot.side_effects.submit(member_id, "task log embed", post_log_embed)
+        bot.side_effects.submit(member_id, "task log audit", audit)
+        bot.side_effects.submit(member_id, "promotion check", promotion_check)
+        bot.proof_checks.submit(member_id, "proof hash", hash_proof)
 
 @tasks_group.command(name="log", description="Log a completed task with proof and type.")
 @app_commands.autocomplete(task_type=task_type_autocomplete)
 async def tasks_log(interaction: discord.Interaction, task_type: str, proof: discord.Attachment):
-    if not await is_valid_task_type(task_type):
+    if not is_valid_task_type(task_type):
         await interaction.response.send_message(
             "That task type is not enabled. Ask management to add it first.",
             ephemeral=True
@@ -1682,28 +3523,84 @@ async def tasks_log(interaction: discord.Interaction, task_type: str, proof: dis
         return
     await interaction.response.send_modal(LogTaskForm(proof=proof, task_type=task_type))
 
+# One round trip for /tasks my. "test" matching mirrors is_test_task_type().
+MY_WEEK_QUERY = (
+    "WITH b AS ("
+    "  SELECT COALESCE(NULLIF(task_type, ''), task) AS ttype, COUNT(*) AS cnt FROM task_logs "
+    "  WHERE week_key = $1 AND member_id = $2 AND timestamp >= $3 AND timestamp < $4 "
+    "  GROUP BY 1"
+    ") SELECT "
+    "(SELECT COALESCE(SUM(cnt) FILTER (WHERE md_normalize_label(ttype) LIKE '%test%'), 0) FROM b) AS test_count, "
+    "(SELECT COALESCE(SUM(cnt) FILTER (WHERE md_normalize_label(ttype) NOT LIKE '%test%'), 0) FROM b) AS misc_count, "
+    "(SELECT COALESCE(json_agg(json_build_array(ttype, cnt) ORDER BY cnt DESC, ttype), '[]') FROM b) AS breakdown, "
+    "(SELECT time_spent FROM roblox_time WHERE member_id = $2) AS time_spent, "
+    "(SELECT COUNT(*) FROM strikes WHERE member_id = $2 AND expires_at > $5) AS active_strikes"
+)
+
+
+def quota_projection(
+    test_count: int, misc_count: int, minutes: int,
+    week_start: datetime.datetime, week_end: datetime.datetime, now: datetime.datetime,
+) -> str:
+    """One line on whether the current weekly pace reaches quota before the reset."""
+    left_in_week = week_end - now
+    needs = [
+        (WEEKLY_TEST_REQUIREMENT - test_count, test_count, "test task(s)"),
+        (WEEKLY_MISC_REQUIREMENT - misc_count, misc_count, "miscellaneous task(s)"),
+        (WEEKLY_TIME_REQUIREMENT - minutes, minutes, "on-site minute(s)"),
+    ]
+    outstanding = [(left, done, label) for left, done, label in needs if left > 0]
+    if not outstanding:
+        return f"✅ Quota met with {human_remaining(left_in_week)} to spare."
+    elapsed = max(now - week_start, datetime.timedelta(hours=1))
+    eta = datetime.timedelta(0)
+    for left, done, _ in outstanding:
+        if done <= 0:
+            eta = None
+            break
+        eta = max(eta, elapsed * (left / done))
+    still_needed = ", ".join(f"{left} {label}" for left, _, label in outstanding)
+    if eta is not None and eta <= left_in_week:
+        return f"📈 At this pace you'll meet quota in about {human_remaining(eta)} (still need {still_needed})."
+    return f"⏳ {human_remaining(left_in_week)} until reset — still need {still_needed}."
+
+
 @tasks_group.command(name="my", description="Check your weekly tasks and time.")
 async def tasks_my(interaction: discord.Interaction):
     member_id = interaction.user.id
+    now = utcnow()
+    wk = quota_week_key(now)
+    week_start, week_end = quota_week_bounds(wk)
+    stats = bot.weekly.get(member_id)
     async with bot.db_pool.acquire() as conn:
-        weekly_rows = await conn.fetch(
-            "SELECT COALESCE(NULLIF(task_type, ''), task) AS ttype "
-            "FROM weekly_task_logs WHERE member_id = $1",
-            member_id,
-        )
-        time_spent_seconds = await conn.fetchval("SELECT time_spent FROM roblox_time WHERE member_id = $1", member_id) or 0
-        active_strikes     = await conn.fetchval("SELECT COUNT(*) FROM strikes WHERE member_id=$1 AND expires_at > $2", member_id, utcnow())
-    time_spent_minutes = time_spent_seconds // 60
-    test_count = sum(1 for row in weekly_rows if is_test_task_type(row["ttype"]))
-    misc_count = len(weekly_rows) - test_count
+        if stats is not None:
+            active_strikes = await conn.fetchval(
+                "SELECT COUNT(*) FROM strikes WHERE member_id = $1 AND expires_at > $2", member_id, now
+            )
+        else:
+            row = await conn.fetchrow(MY_WEEK_QUERY, wk, member_id, week_start, week_end, now)
+    if stats is not None:
+        test_count, misc_count, time_spent_minutes = stats.test_count, stats.misc_count, stats.minutes
+        breakdown = stats.breakdown()
+    else:
+        test_count = int(row["test_count"])
+        misc_count = int(row["misc_count"])
+        time_spent_minutes = (row["time_spent"] or 0) // 60
+        breakdown = json.loads(row["breakdown"])
+        active_strikes = row["active_strikes"]
     met_quota, progress = quota_status(test_count, misc_count, time_spent_minutes)
     paused = await is_quota_paused()
     status = "⏸️ Paused" if paused else ("✅ Met" if met_quota else "❌ Below")
-    await interaction.response.send_message(
-        f"Weekly quota: **{status}** — {progress}. "
-        f"Active strikes: **{active_strikes}/3**.",
-        ephemeral=True
-    )
+    lines = [
+        f"Weekly quota: **{status}** — {progress}. Active strikes: **{active_strikes}/3**.",
+    ]
+    if not paused:
+        lines.append(quota_projection(test_count, misc_count, time_spent_minutes, week_start, week_end, now))
+    if breakdown:
+        lines.append("")
+        lines.append("**This week:**")
+        lines.extend(f"• {ttype or 'Uncategorized'} — {cnt}" for ttype, cnt in breakdown)
+    await interaction.response.send_message("\n".join(lines), ephemeral=True)
 
 
 @tasks_group.command(name="quota_pause", description="(Mgmt) Pause the weekly quota, or re-enable it if paused.")
@@ -1724,11 +3621,13 @@ async def tasks_quota_pause(interaction: discord.Interaction):
                 "updated_at = EXCLUDED.updated_at",
                 paused, interaction.user.id, utcnow(),
             )
+    # NOTIFY updates every instance; apply it here too so this reply is never stale.
+    bot.settings.set_local("quota_paused", paused)
 
     state = "paused" if paused else "re-enabled"
     detail = (
-        "The automatic weekly report, strikes, and reset will be skipped while it is paused. "
-        "Task and time progress will continue to be recorded."
+        "The automatic weekly report, strikes, and on-site time reset will be skipped while it is paused. "
+        "Tasks still count toward the quota week they were logged in, so they do not carry over."
         if paused
         else "The automatic weekly report, quota enforcement, and reset are active again."
     )
@@ -1744,14 +3643,9 @@ async def tasks_quota_pause(interaction: discord.Interaction):
 @tasks_group.command(name="member", description="Show a member's task totals by type (all-time).")
 async def tasks_member(interaction: discord.Interaction, member: discord.Member | None = None):
     target = member or interaction.user
-    async with bot.db_pool.acquire() as conn:
-        rows = await conn.fetch(
-            "SELECT COALESCE(NULLIF(task_type, ''), task) AS ttype, COUNT(*) AS cnt "
-            "FROM task_logs WHERE member_id = $1 GROUP BY ttype ORDER BY cnt DESC, ttype ASC",
-            target.id,
-        )
-        total = await conn.fetchval("SELECT COUNT(*) FROM task_logs WHERE member_id = $1", target.id)
-    robux_map = await get_task_type_robux_map(enabled_only=False)
+    async with bot.acquire_read() as conn:
+        rows = await fetch_member_task_totals(conn, target.id)
+    total = sum(int(r['cnt']) for r in rows)
     if not rows:
         await interaction.response.send_message(f"No tasks found for {target.display_name}.", ephemeral=True)
         return
@@ -1759,8 +3653,8 @@ async def tasks_member(interaction: discord.Interaction, member: discord.Member
     total_robux = 0
     for r in rows:
         base = r['ttype'] or "Uncategorized"
-        label = TASK_PLURALS.get(base, base + ("s" if not base.endswith("s") else ""))
-        robux_each = robux_map.get(base.casefold(), 0)
+        label = task_type_plural(base)
+        robux_each = bot.task_catalog.payout(base)
         subtotal = robux_each * int(r['cnt'])
         total_robux += subtotal
         lines.append(f"**{label}** — {r['cnt']} *(R${robux_each} each · R${subtotal} total)*")
@@ -1785,7 +3679,7 @@ async def tasks_add(
     comments: app_commands.Range[str, 0, 4000] | None = None,
     proof: discord.Attachment | None = None,
 ):
-    if not await is_valid_task_type(task_type):
+    if not is_valid_task_type(task_type):
         await interaction.response.send_message(
             "That task type is not enabled. Use `/tasks type_add` first.",
             ephemeral=True
@@ -1795,34 +3689,24 @@ async def tasks_add(
     now = utcnow()
     proof_url    = proof.url if proof else None
     comments_val = comments or "Added by management"
-    robux_map = await get_task_type_robux_map(enabled_only=False)
-    robux_each = robux_map.get(task_type.casefold(), TASK_ROBUX_PAYOUTS.get(task_type, 0))
+    robux_each = bot.task_catalog.payout(task_type)
 
     async with bot.db_pool.acquire() as conn:
         async with conn.transaction():
-            batch_rows = [(member.id, task_type, task_type, proof_url, comments_val, now)] * count
-            await conn.executemany(
-                "INSERT INTO task_logs (member_id, task, task_type, proof_url, comments, timestamp) "
-                "VALUES ($1, $2, $3, $4, $5, $6)",
-                batch_rows
-            )
-            await conn.executemany(
-                "INSERT INTO weekly_task_logs (member_id, task, task_type, proof_url, comments, timestamp) "
-                "VALUES ($1, $2, $3, $4, $5, $6)",
-                batch_rows
+            log_ids = await conn.fetch(
+                "WITH b AS (SELECT nextval('task_log_batch_seq') AS batch_id) "
+                "INSERT INTO task_logs (member_id, task, task_type, proof_url, comments, timestamp, week_key, batch_id) "
+                "SELECT $1, $2, $3, $4, $5, $6, $7, b.batch_id FROM b, generate_series(1, $8) "
+                f"RETURNING log_id, {CURRENT_XID_SQL} AS xid",
+                member.id, task_type, task_type, proof_url, comments_val, now, quota_week_key(now), count
             )
-            await sync_weekly_task_counter(conn, member.id)
 
-        rows = await conn.fetch(
-            "SELECT COALESCE(NULLIF(task_type, ''), task) AS ttype, COUNT(*) AS cnt "
-            "FROM task_logs WHERE member_id = $1 GROUP BY ttype ORDER BY cnt DESC, ttype ASC",
-            member.id,
-        )
+        rows = await fetch_member_task_totals(conn, member.id)
+    bot.weekly.record_tasks(member.id, task_type, now, count, xid=log_ids[0]["xid"])
 
     lines = []
     for r in rows:
-        base = r['ttype'] or "Uncategorized"
-        label = TASK_PLURALS.get(base, base + ("s" if not base.endswith("s") else ""))
+        label = task_type_plural(r['ttype'] or "Uncategorized")
         lines.append(f"{label} — {r['cnt']}")
 
     added_robux = int(robux_each) * int(count)
@@ -1837,6 +3721,21 @@ async def tasks_add(
 
     await log_action("Tasks Added", f"By: {interaction.user.mention}\nMember: {member.mention}\nType: **{task_type}** × {count}")
     await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    if proof_url:
+        # The batch shares one attachment: hash it once, store it for every log.
+        batch_log_ids = sorted(r["log_id"] for r in log_ids)
+
+        async def hash_proof():
+            match = await bot.proof_hasher.record(bot.db_pool, batch_log_ids, now, member.id, proof_url)
+            if match:
+                await log_action(
+                    "Duplicate Proof Flagged",
+                    f"Added by: {interaction.user.mention}\nMember: {member.mention}\n"
+                    f"Log #{batch_log_ids[0]}: {describe_proof_match(match)}",
+                )
+
+        bot.proof_checks.submit(member.id, "proof hash", hash_proof)
     await maybe_send_promotion_alert(member)
 
 @tasks_group.command(name="type_add", description="(Mgmt) Add a task type that members can log.")
@@ -1857,8 +3756,9 @@ async def tasks_type_add(
             cleaned
         )
         if exists:
-            await conn.execute(
-                "UPDATE task_types SET enabled = TRUE, robux_value = $2, updated_at = now() WHERE lower(task_type) = lower($1)",
+            stored_name = await conn.fetchval(
+                "UPDATE task_types SET enabled = TRUE, robux_value = $2, updated_at = now() "
+                "WHERE lower(task_type) = lower($1) RETURNING task_type",
                 cleaned, int(robux_value)
             )
             message = f"Enabled existing task type: **{cleaned}** with payout **R${robux_value}**."
@@ -1867,146 +3767,1038 @@ async def tasks_type_add(
                 "INSERT INTO task_types (task_type, enabled, robux_value) VALUES ($1, TRUE, $2)",
                 cleaned, int(robux_value)
             )
+            stored_name = cleaned
             message = f"Added new task type: **{cleaned}** with payout **R${robux_value}**."
+    # NOTIFY refreshes every instance; apply it here too so the next autocomplete sees it.
+    bot.task_catalog.apply(stored_name, True, int(robux_value))
+
+    await log_action("Task Type Added", f"By: {interaction.user.mention}\nTask Type: **{cleaned}**\nRobux: **R${robux_value}**")
+    await interaction.response.send_message(message, ephemeral=True)
+
+@tasks_group.command(name="type_remove", description="(Mgmt) Remove/disable a loggable task type.")
+@app_commands.checks.has_role(MANAGEMENT_ROLE_ID)
+@app_commands.autocomplete(task_type=task_type_autocomplete)
+async def tasks_type_remove(interaction: discord.Interaction, task_type: str):
+    if task_type.casefold() == "medical department recruitment":
+        await interaction.response.send_message(
+            "You can't disable Department of Medical Sciences Recruitment because weekly payout logic depends on it.",
+            ephemeral=True
+        )
+        return
+
+    async with bot.db_pool.acquire() as conn:
+        row = await conn.fetchrow(
+            "SELECT task_type, enabled FROM task_types WHERE lower(task_type) = lower($1)",
+            task_type
+        )
+        if not row:
+            await interaction.response.send_message("That task type does not exist.", ephemeral=True)
+            return
+        if not row["enabled"]:
+            await interaction.response.send_message("That task type is already disabled.", ephemeral=True)
+            return
+        await conn.execute(
+            "UPDATE task_types SET enabled = FALSE, updated_at = now() WHERE task_type = $1",
+            row["task_type"]
+        )
+    entry = bot.task_catalog.get(row["task_type"])
+    bot.task_catalog.apply(row["task_type"], False, entry.robux_value if entry else 0)
+
+    await log_action("Task Type Removed", f"By: {interaction.user.mention}\nTask Type: **{row['task_type']}**")
+    await interaction.response.send_message(f"Disabled task type: **{row['task_type']}**.", ephemeral=True)
+
+@tasks_group.command(name="type_list", description="List currently enabled task types.")
+async def tasks_type_list(interaction: discord.Interaction):
+    task_types = bot.task_catalog.enabled_names
+    if not task_types:
+        await interaction.response.send_message("No task types are currently enabled.", ephemeral=True)
+        return
+    lines = "\n".join(f"• {t} — **R${bot.task_catalog.payout(t)}**" for t in task_types)
+    embed = discord.Embed(
+        title="🧾 Enabled Task Types",
+        description=lines,
+        color=discord.Color.blurple(),
+        timestamp=utcnow()
+    )
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+LEADERBOARD_PAGE_SIZE = 10
+LEADERBOARD_CACHE_TTL = 30  # seconds; repeat views and page flips within this window skip the DB
+LEADERBOARD_SCOPES = {
+    "week": "This Week",
+    "last_week": "Last Week",
+    "30d": "Last 30 Days",
+    "all": "All Time",
+}
+# Tasks come from the member_daily_tasks rollup. On-site minutes only exist per
+# quota week (archived in weekly_reports, live in roblox_time), so minutes are
+# summed over whole weeks.
+LEADERBOARD_QUERY = (
+    "WITH t AS ("
+    "  SELECT member_id, SUM(count)::int AS tasks FROM member_daily_tasks "
+    "  WHERE ($1::date IS NULL OR day >= $1) AND ($2::date IS NULL OR day < $2) GROUP BY member_id"
+    "), m AS ("
+    "  SELECT member_id, SUM(minutes)::int AS minutes FROM ("
+    "    SELECT member_id, minutes FROM weekly_reports WHERE $3::text[] IS NULL OR week_key = ANY($3)"
+    "    UNION ALL SELECT member_id, time_spent / 60 FROM roblox_time WHERE $4"
+    "  ) s GROUP BY member_id"
+    ") "
+    "SELECT member_id, COALESCE(t.tasks, 0) AS tasks, COALESCE(m.minutes, 0) AS minutes, COUNT(*) OVER () AS total "
+    "FROM t FULL JOIN m USING (member_id) "
+    "WHERE COALESCE(t.tasks, 0) > 0 OR COALESCE(m.minutes, 0) > 0 "
+    "ORDER BY tasks DESC, minutes DESC, member_id LIMIT $5 OFFSET $6"
+)
+_leaderboard_pages: dict[tuple[int, str, int], tuple[float, str, int]] = {}
+
+
+def leaderboard_window(
+    scope: str, now: datetime.datetime | None = None
+) -> tuple[datetime.date | None, datetime.date | None, list[str] | None, bool]:
+    """Return (first_day, end_day, archived week keys, include live time) for a leaderboard scope."""
+    now = now or utcnow()
+    wk = quota_week_key(now)
+    week_start, _ = quota_week_bounds(wk)
+    if scope == "week":
+        first = quota_day(week_start)
+        return first, first + datetime.timedelta(days=7), [], True
+    if scope == "last_week":
+        prev_wk = quota_week_key(week_start - datetime.timedelta(seconds=1))
+        first = quota_day(quota_week_bounds(prev_wk)[0])
+        return first, first + datetime.timedelta(days=7), [prev_wk], False
+    if scope == "30d":
+        today = quota_day(now)
+        first = today - datetime.timedelta(days=29)
+        # A shifted day's ISO week is its quota week.
+        weeks = {week_key(datetime.datetime.combine(first + datetime.timedelta(days=i), datetime.time()))
+                 for i in range(30)}
+        weeks.discard(wk)
+        return first, today + datetime.timedelta(days=1), sorted(weeks), True
+    return None, None, None, True
+
+
+async def leaderboard_page(guild: discord.Guild, scope: str, page: int) -> tuple[str, int, int]:
+    """Render one leaderboard page; returns (description, page actually shown, page count)."""
+    page = max(0, page)
+    cache_key = (guild.id, scope, page)
+    now_mono = time.monotonic()
+    cached = _leaderboard_pages.get(cache_key)
+    if cached and cached[0] > now_mono:
+        return cached[1], page, cached[2]
+
+    rows = bot.weekly.leaderboard(LEADERBOARD_PAGE_SIZE, page * LEADERBOARD_PAGE_SIZE) if scope == "week" else None
+    if rows is None:
+        first_day, end_day, weeks, include_live = leaderboard_window(scope)
+        async with bot.acquire_read() as conn:
+            rows = await conn.fetch(
+                LEADERBOARD_QUERY, first_day, end_day, weeks, include_live,
+                LEADERBOARD_PAGE_SIZE, page * LEADERBOARD_PAGE_SIZE,
+            )
+    if not rows and page > 0:
+        # The board shrank (or the page was stale); show the first page instead.
+        return await leaderboard_page(guild, scope, 0)
+    if not rows:
+        return "", 0, 1
+
+    pages = -(-int(rows[0]["total"]) // LEADERBOARD_PAGE_SIZE)
+    rank_emoji = ["🥇", "🥈", "🥉"]
+    lines = []
+    for i, r in enumerate(rows, start=page * LEADERBOARD_PAGE_SIZE):
+        member = guild.get_member(r["member_id"])
+        name = member.display_name if member else f"Unknown ({r['member_id']})"
+        prefix = rank_emoji[i] if i < 3 else f"**{i+1}.**"
+        lines.append(f"{prefix} **{name}** — {r['tasks']} tasks, {r['minutes']} mins")
+    description = "\n".join(lines)
+
+    if len(_leaderboard_pages) > 256:
+        for key in [k for k, v in _leaderboard_pages.items() if v[0] <= now_mono]:
+            del _leaderboard_pages[key]
+    _leaderboard_pages[cache_key] = (now_mono + LEADERBOARD_CACHE_TTL, description, pages)
+    return description, page, pages
+
+
+def build_leaderboard_embed(scope: str, description: str, page: int, pages: int) -> discord.Embed:
+    embed = discord.Embed(
+        title=f"🏆 {LEADERBOARD_SCOPES[scope]} Leaderboard",
+        description=description,
+        color=discord.Color.gold(),
+        timestamp=utcnow(),
+    )
+    embed.set_footer(text=f"Page {page + 1}/{pages}")
+    return embed
+
+
+class LeaderboardView(discord.ui.View):
+    def __init__(self, scope: str, page: int, pages: int):
+        super().__init__(timeout=300)
+        self.scope = scope
+        self.page = page
+        self.pages = pages
+        self.message: discord.Message | None = None
+        self._sync_buttons()
+
+    def _sync_buttons(self) -> None:
+        self.previous_page.disabled = self.page <= 0
+        self.next_page.disabled = self.page >= self.pages - 1
+
+    async def on_timeout(self):
+        for item in self.children:
+            item.disabled = True
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except Exception:
+                pass
+
+    async def _show(self, interaction: discord.Interaction, page: int) -> None:
+        description, self.page, self.pages = await leaderboard_page(interaction.guild, self.scope, page)
+        self._sync_buttons()
+        await interaction.response.edit_message(
+            embed=build_leaderboard_embed(self.scope, description, self.page, self.pages), view=self
+        )
+
+    @discord.ui.button(label="Previous", style=discord.ButtonStyle.secondary, emoji="◀️")
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        del button
+        await self._show(interaction, self.page - 1)
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary, emoji="▶️")
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        del button
+        await self._show(interaction, self.page + 1)
+
+
+@tasks_group.command(name="leaderboard", description="Displays the leaderboard (tasks + on-site minutes).")
+@app_commands.choices(scope=[app_commands.Choice(name=label, value=value) for value, label in LEADERBOARD_SCOPES.items()])
+async def tasks_leaderboard(interaction: discord.Interaction, scope: str = "week"):
+    if not interaction.guild:
+        await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
+        return
+    description, page, pages = await leaderboard_page(interaction.guild, scope, 0)
+    if not description:
+        await interaction.response.send_message(
+            f"No activity logged for {LEADERBOARD_SCOPES[scope].lower()}.", ephemeral=True
+        )
+        return
+    await log_action("Viewed Leaderboard", f"Requester: {interaction.user.mention}\nScope: **{LEADERBOARD_SCOPES[scope]}**")
+    embed = build_leaderboard_embed(scope, description, page, pages)
+    if pages <= 1:
+        await interaction.response.send_message(embed=embed)
+        return
+    view = LeaderboardView(scope, page, pages)
+    await interaction.response.send_message(embed=embed, view=view)
+    view.message = await interaction.original_response()
+
+UNDO_MAX_ROWS = 500
+# One statement removes the rows and everything keyed by them; {target} yields
+# the (log_id, timestamp) pairs to revert and always binds member_id as $1.
+UNDO_DELETE_QUERY = (
+    "WITH doomed AS ("
+    "  DELETE FROM task_logs l USING ({target}) x "
+    "  WHERE l.log_id = x.log_id AND l.timestamp = x.timestamp AND l.member_id = $1 "
+    "  RETURNING l.log_id, l.timestamp, COALESCE(NULLIF(l.task_type, ''), l.task) AS ttype, l.batch_id"
+    "), payloads AS ("
+    "  DELETE FROM task_log_payloads p USING doomed d WHERE p.log_id = d.log_id AND p.timestamp = d.timestamp"
+    "), hashes AS ("
+    "  DELETE FROM proof_hashes h USING doomed d WHERE h.log_id = d.log_id AND h.timestamp = d.timestamp"
+    f") SELECT log_id, timestamp, ttype, batch_id, {CURRENT_XID_SQL} AS xid FROM doomed"
+)
+# {target}s for UNDO_DELETE_QUERY, one per way of picking the logs to remove.
+UNDO_RANGE_TARGET = "SELECT log_id, timestamp FROM task_logs WHERE member_id = $1 AND log_id BETWEEN $2 AND $3"
+UNDO_LATEST_TARGET = (
+    "SELECT log_id, timestamp FROM task_logs "
+    "WHERE member_id = $1 AND timestamp >= $2 AND timestamp < $3 "
+    "ORDER BY timestamp DESC, log_id DESC LIMIT $4"
+)
+UNDO_BATCH_TARGET = "SELECT log_id, timestamp FROM task_logs WHERE member_id = $1 AND batch_id = $2"
+# Rows logged before batches existed are their own batch.
+UNDO_SINGLE_LOG_TARGET = "SELECT $2::bigint AS log_id, $3::timestamptz AS timestamp"
+
+
+async def undo_task_logs(
+    conn: asyncpg.Connection, member_id: int, week_start: datetime.datetime, week_end: datetime.datetime, *,
+    count: int | None = None, last_batch: bool = False, log_range: tuple[int, int] | None = None,
+) -> list[asyncpg.Record]:
+    """Remove a member's ``count`` latest logs this week, their latest batch, or a log ID range.
+
+    The rollups are reverted in bulk rather than row by row; call inside a
+    transaction. Returns the removed rows.
+    """
+    if log_range is not None:
+        target, args = UNDO_RANGE_TARGET, log_range
+    elif last_batch:
+        last_log = await conn.fetchrow(
+            "SELECT log_id, timestamp, batch_id FROM task_logs "
+            "WHERE member_id = $1 AND timestamp >= $2 AND timestamp < $3 "
+            "ORDER BY timestamp DESC, log_id DESC LIMIT 1",
+            member_id, week_start, week_end,
+        )
+        if not last_log:
+            return []
+        if last_log["batch_id"] is not None:
+            target, args = UNDO_BATCH_TARGET, (last_log["batch_id"],)
+        else:
+            target, args = UNDO_SINGLE_LOG_TARGET, (last_log["log_id"], last_log["timestamp"])
+    else:
+        target, args = UNDO_LATEST_TARGET, (week_start, week_end, count or 1)
+    await conn.execute("SET LOCAL md.skip_rollup = 'on'")
+    removed = await conn.fetch(UNDO_DELETE_QUERY.format(target=target), member_id, *args)
+    await revert_task_rollup_delta(conn, [(member_id, r["ttype"], r["timestamp"]) for r in removed])
+    return removed
+
+
+@tasks_group.command(name="undo", description="(Mgmt) Remove a member's most recent task logs, a batch, or a log ID range.")
+@app_commands.checks.has_role(MANAGEMENT_ROLE_ID)
+@app_commands.describe(
+    count="How many of this week's most recent logs to remove (default 1)",
+    last_batch="Remove everything from the command that wrote their latest log this week",
+    from_log_id="First log ID of a range to remove (with to_log_id)",
+    to_log_id="Last log ID of a range to remove (with from_log_id)",
+)
+async def tasks_undo(
+    interaction: discord.Interaction,
+    member: discord.Member,
+    count: app_commands.Range[int, 1, UNDO_MAX_ROWS] | None = None,
+    last_batch: bool = False,
+    from_log_id: int | None = None,
+    to_log_id: int | None = None,
+):
+    member_id = member.id
+    wk = quota_week_key()
+    week_start, week_end = quota_week_bounds(wk)
+    by_range = from_log_id is not None or to_log_id is not None
+    if by_range and (from_log_id is None or to_log_id is None or last_batch or count is not None):
+        await interaction.response.send_message(
+            "Use either `count`, `last_batch`, or both `from_log_id` and `to_log_id`.", ephemeral=True
+        )
+        return
+    if last_batch and count is not None:
+        await interaction.response.send_message("`last_batch` can't be combined with `count`.", ephemeral=True)
+        return
+    if by_range:
+        from_log_id, to_log_id = sorted((from_log_id, to_log_id))
+        if to_log_id - from_log_id >= UNDO_MAX_ROWS:
+            await interaction.response.send_message(
+                f"That range spans more than {UNDO_MAX_ROWS} log IDs; split it up.", ephemeral=True
+            )
+            return
+
+    async with bot.db_pool.acquire() as conn:
+        async with conn.transaction():
+            removed = await undo_task_logs(
+                conn, member_id, week_start, week_end, count=count, last_batch=last_batch,
+                log_range=(from_log_id, to_log_id) if by_range else None,
+            )
+            new_count = await count_weekly_tasks(conn, member_id, wk) if removed else None
+
+    if not removed:
+        what = "no task logs in that range" if by_range else "no weekly tasks logged"
+        await interaction.response.send_message(f"{member.display_name} has {what}.", ephemeral=True)
+        return
+
+    by_type: dict[str, int] = {}
+    for r in removed:
+        bot.weekly.record_tasks(member_id, r["ttype"], r["timestamp"], -1, xid=r["xid"])
+        label = r["ttype"] or "Uncategorized"
+        by_type[label] = by_type.get(label, 0) + 1
+    log_ids = [r["log_id"] for r in removed]
+    batches = sorted({r["batch_id"] for r in removed if r["batch_id"] is not None})
+    summary = "\n".join(
+        f"• {label} — {n}" for label, n in sorted(by_type.items(), key=lambda item: (-item[1], item[0].casefold()))
+    )
+    scope = f"log #{min(log_ids)}" if len(log_ids) == 1 else f"logs #{min(log_ids)}–#{max(log_ids)}"
+    if batches:
+        scope += f", batch {', '.join(f'#{b}' for b in batches[:5])}" + ("…" if len(batches) > 5 else "")
+    # Only a log ID range can reach past this week; those weeks' reports are already out.
+    older = sum(1 for r in removed if not week_start <= r["timestamp"] < week_end)
+    await log_action(
+        "Removed Task Logs",
+        f"By: {interaction.user.mention}\nMember: {member.mention}\nRemoved: **{len(removed)}** ({scope})\n"
+        + (f"From earlier weeks: **{older}**\n" if older else "")
+        + summary,
+    )
+    older_note = f"{older} of them were from earlier weeks and don't change this week's count. " if older else ""
+    await interaction.response.send_message(
+        f"Removed **{len(removed)}** task log(s) for {member.mention} ({scope}):\n{summary}\n"
+        f"{older_note}They now have {new_count} task(s) this week.",
+        ephemeral=True
+    )
+
+@tasks_group.command(name="log_lookup", description="Show a logged task by ID, including archived proof and comments.")
+async def tasks_log_lookup(interaction: discord.Interaction, log_id: int):
+    async with bot.acquire_read() as conn:
+        row = await conn.fetchrow(
+            "SELECT log_id, member_id, COALESCE(NULLIF(task_type, ''), task) AS ttype, timestamp, week_key, "
+            "proof_url, comments, archived FROM task_log_history WHERE log_id = $1",
+            log_id,
+        )
+    if not row or (row["member_id"] != interaction.user.id and not is_management(interaction.user)):
+        await interaction.response.send_message(f"No task log #{log_id} found.", ephemeral=True)
+        return
+    embed = discord.Embed(
+        title=f"🧾 Task Log #{row['log_id']}",
+        description=(
+            f"**Member:** <@{row['member_id']}>\n"
+            f"**Task Type:** {row['ttype'] or 'Uncategorized'}\n"
+            f"**Quota week:** {row['week_key']}\n\n"
+            f"**Comments:**\n{(row['comments'] or 'No comments')[:3500]}"
+        ),
+        color=discord.Color.blurple(),
+        timestamp=row["timestamp"],
+    )
+    if row["proof_url"]:
+        embed.set_image(url=row["proof_url"])
+    if row["archived"]:
+        embed.set_footer(text="Proof and comments served from cold storage")
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+HISTORY_PAGE_SIZE = 10
+
+
+def _parse_day(value: str | None) -> datetime.datetime | None:
+    """Parse an optional YYYY-MM-DD (UTC); raises ValueError on bad input."""
+    if not value or not value.strip():
+        return None
+    return datetime.datetime.strptime(value.strip(), "%Y-%m-%d").replace(tzinfo=datetime.timezone.utc)
+
+
+async def fetch_task_history_page(
+    conn: asyncpg.Connection,
+    member_id: int,
+    *,
+    before: tuple[datetime.datetime, int] | None = None,
+    after: tuple[datetime.datetime, int] | None = None,
+    task_type: str | None = None,
+    since: datetime.datetime | None = None,
+    until: datetime.datetime | None = None,
+    limit: int = HISTORY_PAGE_SIZE,
+) -> tuple[list[asyncpg.Record], bool]:
+    """Fetch one page of a member's logs, newest first, keyed on (timestamp, log_id).
+
+    ``before`` pages towards older logs and ``after`` towards newer ones. Each
+    page is a single range scan of task_logs_member_ts_idx, however deep it is.
+    Returns the rows plus whether more exist past them in that direction.
+    """
+    args: list[Any] = [member_id]
+
+    def param(value: Any) -> str:
+        args.append(value)
+        return f"${len(args)}"
+
+    clauses = ["member_id = $1"]
+    if task_type:
+        clauses.append(f"lower(COALESCE(NULLIF(task_type, ''), task)) = lower({param(task_type)})")
+    if since:
+        clauses.append(f"timestamp >= {param(since)}")
+    if until:
+        clauses.append(f"timestamp < {param(until)}")
+    order = "DESC"
+    if before:
+        # The plain timestamp bound is redundant but lets Postgres prune partitions.
+        ts = param(before[0])
+        clauses.append(f"timestamp <= {ts} AND (timestamp, log_id) < ({ts}, {param(before[1])})")
+    elif after:
+        ts = param(after[0])
+        clauses.append(f"timestamp >= {ts} AND (timestamp, log_id) > ({ts}, {param(after[1])})")
+        order = "ASC"
+    rows = await conn.fetch(
+        "SELECT log_id, timestamp, COALESCE(NULLIF(task_type, ''), task) AS ttype FROM task_logs "
+        f"WHERE {' AND '.join(clauses)} ORDER BY timestamp {order}, log_id {order} LIMIT {param(limit + 1)}",
+        *args,
+    )
+    more = len(rows) > limit
+    rows = rows[:limit]
+    if after:
+        rows.reverse()
+    return rows, more
+
+
+class TaskHistoryView(discord.ui.View):
+    def __init__(self, member: discord.abc.User, filters: dict[str, Any], rows: list[asyncpg.Record], has_older: bool):
+        super().__init__(timeout=600)
+        self.member = member
+        self.filters = filters
+        self.rows = rows
+        self.page = 1
+        self.has_newer = False
+        self.has_older = has_older
+        self.message: discord.Message | None = None
+        self._sync_buttons()
+
+    def _sync_buttons(self) -> None:
+        self.newer_page.disabled = not self.has_newer
+        self.older_page.disabled = not self.has_older
+
+    def build_embed(self) -> discord.Embed:
+        lines = [
+            f"`#{r['log_id']}` • {discord.utils.format_dt(r['timestamp'], 'f')} • {r['ttype'] or 'Uncategorized'}"
+            for r in self.rows
+        ]
+        embed = discord.Embed(
+            title=f"📜 Task History for {self.member.display_name}",
+            description="\n".join(lines) or "No task logs match these filters.",
+            color=discord.Color.blurple(),
+        )
+        applied = [
+            f"type: {self.filters['task_type']}" if self.filters.get("task_type") else None,
+            f"from {self.filters['since']:%Y-%m-%d}" if self.filters.get("since") else None,
+            f"to {(self.filters['until'] - datetime.timedelta(days=1)):%Y-%m-%d}" if self.filters.get("until") else None,
+        ]
+        footer = f"Page {self.page}"
+        if any(applied):
+            footer += " • " + ", ".join(a for a in applied if a)
+        embed.set_footer(text=footer + " • /tasks log_lookup <id> for proof and comments")
+        return embed
+
+    async def on_timeout(self):
+        for item in self.children:
+            item.disabled = True
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except Exception:
+                pass
+
+    async def _turn(self, interaction: discord.Interaction, older: bool) -> None:
+        if self.rows:
+            edge = self.rows[-1] if older else self.rows[0]
+            cursor = {"before" if older else "after": (edge["timestamp"], edge["log_id"])}
+            async with bot.acquire_read() as conn:
+                rows, more = await fetch_task_history_page(conn, self.member.id, **cursor, **self.filters)
+                restart = not rows and not older
+                if restart:
+                    # Everything newer was removed meanwhile; start over from the newest.
+                    rows, more = await fetch_task_history_page(conn, self.member.id, **self.filters)
+            if restart:
+                self.rows, self.page, self.has_newer, self.has_older = rows, 1, False, more
+            elif rows and older:
+                self.rows, self.page, self.has_older, self.has_newer = rows, self.page + 1, more, True
+            elif rows:
+                self.rows, self.page, self.has_newer, self.has_older = rows, max(1, self.page - 1), more, True
+            elif older:
+                self.has_older = False
+        self._sync_buttons()
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+    @discord.ui.button(label="Newer", style=discord.ButtonStyle.secondary, emoji="◀️")
+    async def newer_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        del button
+        await self._turn(interaction, older=False)
+
+    @discord.ui.button(label="Older", style=discord.ButtonStyle.secondary, emoji="▶️")
+    async def older_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        del button
+        await self._turn(interaction, older=True)
+
+
+@tasks_group.command(name="history", description="Browse logged tasks, newest first (yours, or a member's for management).")
+@app_commands.autocomplete(task_type=task_type_autocomplete)
+@app_commands.describe(
+    member="Member to browse (management only; defaults to you)",
+    task_type="Only show this task type",
+    start="First day, YYYY-MM-DD (UTC)",
+    end="Last day, inclusive, YYYY-MM-DD (UTC)",
+)
+async def tasks_history(
+    interaction: discord.Interaction,
+    member: discord.Member | None = None,
+    task_type: str | None = None,
+    start: str | None = None,
+    end: str | None = None,
+):
+    target = member or interaction.user
+    if target.id != interaction.user.id and not is_management(interaction.user):
+        await interaction.response.send_message("You can only browse your own task history.", ephemeral=True)
+        return
+    try:
+        since = _parse_day(start)
+        last_day = _parse_day(end)
+    except ValueError:
+        await interaction.response.send_message("Use `YYYY-MM-DD` for dates, e.g. `2024-01-31`.", ephemeral=True)
+        return
+    until = last_day + datetime.timedelta(days=1) if last_day else None
+    filters = {"task_type": task_type, "since": since, "until": until}
+
+    async with bot.acquire_read() as conn:
+        rows, has_older = await fetch_task_history_page(conn, target.id, **filters)
+    view = TaskHistoryView(target, filters, rows, has_older)
+    await interaction.response.send_message(embed=view.build_embed(), view=view, ephemeral=True)
+    view.message = await interaction.original_response()
+
+@tasks_group.command(name="weekly_preview", description="(Mgmt+) Preview this week's activity summary without resetting data.")
+@app_commands.checks.has_role(MANAGEMENT_ROLE_ID)
+async def tasks_weekly_preview(interaction: discord.Interaction):
+    if not interaction.guild:
+        await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
+        return
+    dept_member_ids = department_member_ids(interaction.guild)
+    if dept_member_ids is None:
+        await interaction.response.send_message("The department role is not configured or could not be found.", ephemeral=True)
+        return
+
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    wk = quota_week_key()
+    results = await compute_weekly_results(interaction.guild, dept_member_ids, wk)
+    preview = render_weekly_summary(
+        wk, results, "This is a live preview of the week so far; no data was reset and no strikes were issued."
+    )
+    await send_ephemeral_embeds(interaction, "Weekly Task Summary (Preview)", preview, discord.Color.from_str("#5aa9ff"))
+
+
+async def weekly_report_autocomplete(interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+    del interaction
+    if not bot.db_pool:
+        return []
+    async with bot.db_pool.acquire() as conn:
+        rows = await conn.fetch(
+            "SELECT DISTINCT week_key FROM weekly_reports WHERE week_key ILIKE $1 ORDER BY week_key DESC LIMIT 25",
+            f"%{current.strip()}%",
+        )
+    return [app_commands.Choice(name=r["week_key"], value=r["week_key"]) for r in rows]
+
+
+@tasks_group.command(name="weekly_report", description="(Mgmt) Re-render an archived weekly report.")
+@app_commands.checks.has_role(MANAGEMENT_ROLE_ID)
+@app_commands.describe(week="Week key, e.g. 2024-W07", compare_to="Optional second week to compare totals against")
+@app_commands.autocomplete(week=weekly_report_autocomplete, compare_to=weekly_report_autocomplete)
+async def tasks_weekly_report(interaction: discord.Interaction, week: str, compare_to: str | None = None):
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    async with bot.db_pool.acquire() as conn:
+        results = await load_weekly_report(conn, week)
+        other = await load_weekly_report(conn, compare_to) if compare_to else []
+    if not results:
+        await interaction.followup.send(f"No archived report for **{week}**.", ephemeral=True)
+        return
+
+    def totals(rows: list[dict[str, Any]]) -> tuple[int, int, int, int]:
+        return (
+            sum(r["tasks"] for r in rows),
+            sum(r["minutes"] for r in rows),
+            sum(r["robux"] for r in rows),
+            sum(1 for r in rows if r["outcome"] == "met"),
+        )
+
+    tasks_total, minutes_total, robux_total, met_total = totals(results)
+    closing = f"**Totals:** {tasks_total} tasks · {minutes_total} mins · R${robux_total} · {met_total}/{len(results)} met quota"
+    if compare_to:
+        if other:
+            o_tasks, o_minutes, o_robux, o_met = totals(other)
+            closing += (
+                f"\n**vs {compare_to}:** {tasks_total - o_tasks:+} tasks · {minutes_total - o_minutes:+} mins · "
+                f"R${robux_total - o_robux:+} · {met_total - o_met:+} met quota"
+            )
+        else:
+            closing += f"\nNo archived report for **{compare_to}** to compare against."
+    summary = render_weekly_summary(week, results, closing)
+    await send_ephemeral_embeds(interaction, f"Weekly Task Summary — {week} (Archived)", summary, discord.Color.from_str("#5aa9ff"))
+
+@tasks_group.command(name="rollup_rebuild", description="(Mgmt) Rebuild the per-member task rollups from the task logs.")
+@app_commands.checks.has_role(MANAGEMENT_ROLE_ID)
+async def tasks_rollup_rebuild(interaction: discord.Interaction):
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    started = time.monotonic()
+    async with bot.db_pool.acquire() as conn:
+        async with conn.transaction():
+            rows = await rebuild_member_task_totals(conn)
+            await rebuild_member_daily_tasks(conn)
+    elapsed = time.monotonic() - started
+    await log_action("Task Rollup Rebuilt", f"By: {interaction.user.mention}\nRows: **{rows}**\nTook: **{elapsed:.1f}s**")
+    await interaction.followup.send(
+        f"Rebuilt task totals: **{rows}** member/type row(s) in {elapsed:.1f}s. "
+        "Months detached with `/tasks archive_partitions` are not included in a rebuild.",
+        ephemeral=True,
+    )
+
+@tasks_group.command(name="archive_partitions", description="(Mgmt) Detach monthly task log partitions older than a month (YYYY-MM).")
+@app_commands.checks.has_role(MANAGEMENT_ROLE_ID)
+@app_commands.describe(before="Detach every month strictly before this one, e.g. 2024-01")
+async def tasks_archive_partitions(interaction: discord.Interaction, before: str):
+    try:
+        cutoff = datetime.datetime.strptime(before.strip(), "%Y-%m").replace(tzinfo=datetime.timezone.utc)
+    except ValueError:
+        await interaction.response.send_message("Use the format `YYYY-MM`, e.g. `2024-01`.", ephemeral=True)
+        return
+    if cutoff > _month_start(utcnow()):
+        await interaction.response.send_message("You can only archive months before the current month.", ephemeral=True)
+        return
+
+    # DETACH waits for locks on a busy table; acknowledge before Discord's deadline.
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    cutoff_name = task_log_partition_name(cutoff)
+    async with bot.db_pool.acquire() as conn:
+        async with conn.transaction():
+            rows = await conn.fetch(
+                "SELECT c.relname AS name FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'task_logs'::regclass AND c.relname ~ '^task_logs_p[0-9]{6}$' "
+                "ORDER BY c.relname"
+            )
+            # Zero-padded YYYYMM names sort chronologically.
+            names = [r["name"] for r in rows if r["name"] < cutoff_name]
+            for name in names:
+                await conn.execute(f"ALTER TABLE task_logs DETACH PARTITION {name}")
+                await conn.execute(f"ALTER TABLE {name} RENAME TO archived_{name}")
+
+    if not names:
+        await interaction.followup.send(f"No task log partitions before **{before}** to archive.", ephemeral=True)
+        return
+    listed = ", ".join(f"`archived_{name}`" for name in names)
+    await log_action("Task Log Partitions Archived", f"By: {interaction.user.mention}\nBefore: **{before}**\nTables: {listed}")
+    await interaction.followup.send(
+        f"Detached **{len(names)}** partition(s): {listed}. They are no longer part of `task_logs` "
+        "and can be dumped (e.g. `pg_dump -t`) and dropped.",
+        ephemeral=True,
+    )
+
+# ---------- Bulk export / import (COPY) ----------
+# Exports stream COPY output straight into a temp file and imports stream the
+# uploaded CSV back through COPY in chunks, so memory stays flat at any size.
+# Imports only append: rows whose log_id is still in task_logs are skipped, so
+# re-importing an export never double counts. To change an existing log, clear
+# its log_id (it is imported as a new log) and undo the old one.
+EXPORT_QUERIES: dict[str, str] = {
+    "tasks": (
+        "SELECT l.log_id, l.member_id, COALESCE(NULLIF(l.task_type, ''), l.task) AS task_type, l.week_key, "
+        "l.timestamp, COALESCE(t.robux_value, 0) AS robux_value, l.proof_url, l.comments "
+        "FROM task_log_history l "
+        "LEFT JOIN task_types t ON lower(t.task_type) = lower(COALESCE(NULLIF(l.task_type, ''), l.task)) "
+        "WHERE l.timestamp >= $1 AND l.timestamp < $2 ORDER BY l.timestamp, l.log_id"
+    ),
+    "strikes": (
+        "SELECT strike_id, member_id, reason, issued_at, expires_at, set_by, auto FROM strikes "
+        "WHERE issued_at >= $1 AND issued_at < $2 ORDER BY issued_at, strike_id"
+    ),
+    # On-site time only survives the weekly reset in the archived reports.
+    "time": (
+        "SELECT week_key, member_id, minutes, tasks, test_count, misc_count, robux, outcome, generated_at "
+        "FROM weekly_reports WHERE generated_at >= $1 AND generated_at < $2 ORDER BY week_key, member_id"
+    ),
+}
+TASK_LOG_COPY_COLUMNS = ["member_id", "task", "task_type", "proof_url", "comments", "timestamp", "week_key"]
+IMPORT_CHUNK_ROWS = 5000
+IMPORT_MAX_ERRORS = 10
+
+
+class TaskImportError(Exception):
+    pass
+
+
+async def next_task_log_batch(conn: asyncpg.Connection) -> int:
+    """Reserve a batch_id for rows that one command writes in several statements."""
+    return await conn.fetchval("SELECT nextval('task_log_batch_seq')")
+
+
+async def copy_task_logs(conn: asyncpg.Connection, records: list[tuple], batch_id: int) -> None:
+    """COPY rows (TASK_LOG_COPY_COLUMNS order) into task_logs under ``batch_id`` and update the rollups once.
+
+    Call inside a transaction: the per-row rollup triggers are switched off
+    for the rest of it.
+    """
+    await conn.execute("SET LOCAL md.skip_rollup = 'on'")
+    await conn.copy_records_to_table(
+        "task_logs", records=[(*r, batch_id) for r in records], columns=TASK_LOG_COPY_COLUMNS + ["batch_id"]
+    )
+    await apply_task_rollup_delta(conn, [(r[0], r[2] or r[1], r[5]) for r in records])
+
+
+def _parse_day_range(start: str, end: str) -> tuple[datetime.datetime, datetime.datetime] | None:
+    """Parse inclusive YYYY-MM-DD bounds into a half-open UTC range."""
+    try:
+        first = datetime.datetime.strptime(start.strip(), "%Y-%m-%d").replace(tzinfo=datetime.timezone.utc)
+        last = datetime.datetime.strptime(end.strip(), "%Y-%m-%d").replace(tzinfo=datetime.timezone.utc)
+    except ValueError:
+        return None
+    if last < first:
+        return None
+    return first, last + datetime.timedelta(days=1)
+
+
+def _task_log_import_record(row: dict[str, str | None], now: datetime.datetime) -> tuple[int | None, tuple]:
+    """Validate one CSV row; returns its exported log_id (if any) and the COPY record."""
+    try:
+        member_id = int((row.get("member_id") or "").strip())
+    except ValueError:
+        raise TaskImportError("member_id must be a Discord user ID") from None
+    try:
+        log_id = int(row["log_id"].strip()) if (row.get("log_id") or "").strip() else None
+    except ValueError:
+        raise TaskImportError("log_id must be a number or empty") from None
+    if not bot.task_catalog.is_enabled(row.get("task_type")):
+        raise TaskImportError(f"unknown or disabled task type {row.get('task_type')!r}")
+    entry = bot.task_catalog.get(row.get("task_type"))
+    try:
+        ts = datetime.datetime.fromisoformat((row.get("timestamp") or "").strip())
+    except ValueError:
+        raise TaskImportError("timestamp must be ISO 8601, e.g. 2024-01-05 10:00:00+00") from None
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=datetime.timezone.utc)
+    if ts > now:
+        raise TaskImportError("timestamp is in the future")
+    proof_url = (row.get("proof_url") or "").strip() or None
+    comments = (row.get("comments") or "").strip() or "Imported by management"
+    return log_id, (member_id, entry.name, entry.name, proof_url, comments, ts, quota_week_key(ts))
+
+
+async def _drop_existing_task_logs(conn: asyncpg.Connection, batch: list[tuple[int | None, tuple]]) -> list[tuple]:
+    """Return the records of ``batch`` whose exported (log_id, timestamp) is not already logged."""
+    keyed = [(log_id, record[5]) for log_id, record in batch if log_id is not None]
+    if not keyed:
+        return [record for _, record in batch]
+    rows = await conn.fetch(
+        "SELECT l.log_id, l.timestamp FROM task_logs l "
+        "JOIN unnest($1::bigint[], $2::timestamptz[]) AS k(log_id, ts) ON l.log_id = k.log_id AND l.timestamp = k.ts",
+        [k[0] for k in keyed], [k[1] for k in keyed],
+    )
+    existing = {(r["log_id"], r["timestamp"]) for r in rows}
+    return [record for log_id, record in batch if log_id is None or (log_id, record[5]) not in existing]
 
-    await log_action("Task Type Added", f"By: {interaction.user.mention}\nTask Type: **{cleaned}**\nRobux: **R${robux_value}**")
-    await interaction.response.send_message(message, ephemeral=True)
 
-@tasks_group.command(name="type_remove", description="(Mgmt) Remove/disable a loggable task type.")
+@tasks_group.command(name="export", description="(Mgmt) Export task logs, strikes or weekly time for a date range as CSV.")
 @app_commands.checks.has_role(MANAGEMENT_ROLE_ID)
-@app_commands.autocomplete(task_type=task_type_autocomplete)
-async def tasks_type_remove(interaction: discord.Interaction, task_type: str):
-    if task_type.casefold() == "medical department recruitment":
-        await interaction.response.send_message(
-            "You can't disable Department of Medical Sciences Recruitment because weekly payout logic depends on it.",
-            ephemeral=True
-        )
+@app_commands.describe(
+    start="First day, YYYY-MM-DD (UTC)",
+    end="Last day, inclusive, YYYY-MM-DD (UTC)",
+    compress="Gzip the file (use for large ranges)",
+)
+@app_commands.choices(dataset=[
+    app_commands.Choice(name="Task logs", value="tasks"),
+    app_commands.Choice(name="Strikes", value="strikes"),
+    app_commands.Choice(name="Weekly time (archived reports)", value="time"),
+])
+async def tasks_export(interaction: discord.Interaction, dataset: str, start: str, end: str, compress: bool = False):
+    bounds = _parse_day_range(start, end)
+    if not bounds:
+        await interaction.response.send_message("Use `YYYY-MM-DD` for both dates, with `start` on or before `end`.", ephemeral=True)
         return
+    await interaction.response.defer(ephemeral=True, thinking=True)
 
-    async with bot.db_pool.acquire() as conn:
-        row = await conn.fetchrow(
-            "SELECT task_type, enabled FROM task_types WHERE lower(task_type) = lower($1)",
-            task_type
-        )
-        if not row:
-            await interaction.response.send_message("That task type does not exist.", ephemeral=True)
-            return
-        if not row["enabled"]:
-            await interaction.response.send_message("That task type is already disabled.", ephemeral=True)
+    filename = f"{dataset}_{start.strip()}_{end.strip()}.csv" + (".gz" if compress else "")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / filename
+        with (gzip.open(path, "wb") if compress else open(path, "wb")) as fh:
+            async with bot.acquire_read() as conn:
+                status = await conn.copy_from_query(
+                    EXPORT_QUERIES[dataset], *bounds, output=fh, format="csv", header=True
+                )
+        row_count = int(status.split()[-1])
+        size = path.stat().st_size
+        limit = interaction.guild.filesize_limit if interaction.guild else 10 * 1024 * 1024
+        if size > limit:
+            await interaction.followup.send(
+                f"The export is {size / 1024 / 1024:.1f} MB, over the {limit // 1024 // 1024} MB upload limit. "
+                "Narrow the date range" + ("." if compress else " or enable `compress`."),
+                ephemeral=True,
+            )
             return
-        await conn.execute(
-            "UPDATE task_types SET enabled = FALSE, updated_at = now() WHERE task_type = $1",
-            row["task_type"]
+        await interaction.followup.send(
+            f"Exported **{row_count}** row(s) of **{dataset}** from {start.strip()} to {end.strip()}.",
+            file=discord.File(path, filename=filename),
+            ephemeral=True,
         )
+    await log_action(
+        "Data Exported",
+        f"By: {interaction.user.mention}\nDataset: **{dataset}**\nRange: {start.strip()} → {end.strip()}\nRows: **{row_count}**",
+    )
 
-    await log_action("Task Type Removed", f"By: {interaction.user.mention}\nTask Type: **{row['task_type']}**")
-    await interaction.response.send_message(f"Disabled task type: **{row['task_type']}**.", ephemeral=True)
 
-@tasks_group.command(name="type_list", description="List currently enabled task types.")
-async def tasks_type_list(interaction: discord.Interaction):
-    if not bot.db_pool:
-        task_rows = [(t, TASK_ROBUX_PAYOUTS.get(t, 0)) for t in TASK_TYPES]
-    else:
-        async with bot.db_pool.acquire() as conn:
-            task_rows = await conn.fetch(
-                "SELECT task_type, robux_value FROM task_types WHERE enabled = TRUE ORDER BY task_type ASC"
-            )
-    if not task_rows:
-        await interaction.response.send_message("No task types are currently enabled.", ephemeral=True)
-        return
-    lines = "\n".join(
-        f"• {row[0] if isinstance(row, tuple) else row['task_type']} — **R${row[1] if isinstance(row, tuple) else int(row['robux_value'] or 0)}**"
-        for row in task_rows
-    )
-    embed = discord.Embed(
-        title="🧾 Enabled Task Types",
-        description=lines,
-        color=discord.Color.blurple(),
-        timestamp=utcnow()
-    )
-    await interaction.response.send_message(embed=embed, ephemeral=True)
+@tasks_group.command(name="import", description="(Mgmt) Append task logs from a CSV or .csv.gz in the export format.")
+@app_commands.checks.has_role(MANAGEMENT_ROLE_ID)
+@app_commands.describe(
+    file="CSV with member_id, task_type and timestamp columns (log_id, proof_url, comments optional); "
+    "rows whose log_id is already logged are skipped",
+)
+async def tasks_import(interaction: discord.Interaction, file: discord.Attachment):
+    await interaction.response.defer(ephemeral=True, thinking=True)
 
-@tasks_group.command(name="leaderboard", description="Displays the weekly leaderboard (tasks + on-site minutes).")
-async def tasks_leaderboard(interaction: discord.Interaction):
-    async with bot.db_pool.acquire() as conn:
-        task_rows = await conn.fetch("SELECT member_id, COUNT(*) AS tasks_completed FROM weekly_task_logs GROUP BY member_id")
-        time_rows = await conn.fetch("SELECT member_id, time_spent FROM roblox_time")
+    errors: list[str] = []
+    imported = 0
+    skipped = 0
+    now = utcnow()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "upload"
+        async with aiohttp.ClientSession() as session:
+            async with session.get(file.url) as resp:
+                if resp.status != 200:
+                    await interaction.followup.send(f"Couldn't download the attachment (HTTP {resp.status}).", ephemeral=True)
+                    return
+                with open(path, "wb") as out:
+                    async for chunk in resp.content.iter_chunked(64 * 1024):
+                        out.write(chunk)
 
-    task_map = {r['member_id']: int(r['tasks_completed'] or 0) for r in task_rows}
-    time_map = {r['member_id']: r['time_spent'] for r in time_rows}
+        opener = gzip.open if file.filename.lower().endswith(".gz") else open
+        try:
+            async with bot.db_pool.acquire() as conn:
+                async with conn.transaction():
+                    batch_id = await next_task_log_batch(conn)
+                    with opener(path, "rt", encoding="utf-8-sig", newline="") as fh:
+                        reader = csv.DictReader(fh)
+                        missing = {"member_id", "task_type", "timestamp"} - set(reader.fieldnames or [])
+                        if missing:
+                            raise TaskImportError(f"Missing column(s): {', '.join(sorted(missing))}.")
+                        batch: list[tuple[int | None, tuple]] = []
+
+                        async def flush() -> None:
+                            nonlocal imported, skipped
+                            records = await _drop_existing_task_logs(conn, batch)
+                            skipped += len(batch) - len(records)
+                            if records:
+                                await copy_task_logs(conn, records, batch_id)
+                                imported += len(records)
+
+                        for row in reader:
+                            try:
+                                batch.append(_task_log_import_record(row, now))
+                            except TaskImportError as e:
+                                errors.append(f"line {reader.line_num}: {e}")
+                                if len(errors) >= IMPORT_MAX_ERRORS:
+                                    break
+                            # Once anything is invalid the import is rolled back; just keep validating.
+                            if errors:
+                                batch.clear()
+                            elif len(batch) >= IMPORT_CHUNK_ROWS:
+                                await flush()
+                                batch.clear()
+                        if errors:
+                            raise TaskImportError("Nothing was imported; fix these rows and upload again.")
+                        if batch:
+                            await flush()
+        except (TaskImportError, UnicodeDecodeError, csv.Error, OSError) as e:
+            detail = "\n".join(errors)
+            await interaction.followup.send(f"Import rejected: {e}" + (f"\n```\n{detail}\n```" if detail else ""), ephemeral=True)
+            return
 
-    member_ids = set(task_map.keys()) | set(time_map.keys())
-    if not member_ids:
-        await interaction.response.send_message("No activity logged this week.", ephemeral=True)
-        return
+    bot.weekly.schedule_reload()
+    await log_action(
+        "Task Logs Imported",
+        f"By: {interaction.user.mention}\nFile: `{file.filename}`\nRows: **{imported}**\nAlready logged: **{skipped}**",
+    )
+    note = f" Skipped **{skipped}** row(s) whose log_id is already logged." if skipped else ""
+    await interaction.followup.send(f"Imported **{imported}** task log(s) from `{file.filename}`.{note}", ephemeral=True)
 
-    records = []
-    for mid in member_ids:
-        member = interaction.guild.get_member(mid)
-        name = member.display_name if member else f"Unknown ({mid})"
-        tasks_done = task_map.get(mid, 0)
-        minutes_done = (time_map.get(mid, 0) // 60)
-        records.append((name, tasks_done, minutes_done, mid))
+BATCH_CREDIT_MAX_MEMBERS = 200
+PROMOTION_CHECK_CONCURRENCY = 4
 
-    records.sort(key=lambda x: (-x[1], -x[2], x[0].lower()))
 
-    embed = discord.Embed(title="🏆 Weekly Leaderboard", color=discord.Color.gold(), timestamp=utcnow())
-    lines = []
-    rank_emoji = ["🥇", "🥈", "🥉"]
-    for i, (name, tasks_done, minutes_done, _) in enumerate(records[:10]):
-        prefix = rank_emoji[i] if i < 3 else f"**{i+1}.**"
-        lines.append(f"{prefix} **{name}** — {tasks_done} tasks, {minutes_done} mins")
-    embed.description = "\n".join(lines)
-    await log_action("Viewed Leaderboard", f"Requester: {interaction.user.mention}")
-    await interaction.response.send_message(embed=embed)
+def _parse_batch_csv(data: bytes) -> dict[int, int | None]:
+    """Read member_id[,count] rows (header optional) into {member_id: count or None}."""
+    wanted: dict[int, int | None] = {}
+    for row in csv.reader(data.decode("utf-8-sig").splitlines()):
+        if not row or not row[0].strip().isdigit():
+            continue  # header or blank line
+        count = int(row[1]) if len(row) > 1 and row[1].strip().isdigit() else None
+        wanted[int(row[0].strip())] = count
+    return wanted
+
 
-@tasks_group.command(name="undo", description="Removes the last logged task for a member.")
+@tasks_group.command(name="add_batch", description="(Mgmt) Credit a task to many members at once (mentions, a role, or a CSV).")
 @app_commands.checks.has_role(MANAGEMENT_ROLE_ID)
-async def tasks_undo(interaction: discord.Interaction, member: discord.Member):
-    member_id = member.id
+@app_commands.autocomplete(task_type=task_type_autocomplete)
+@app_commands.describe(
+    members="Mentions or user IDs, separated by spaces or commas",
+    role="Credit every member with this role",
+    csv_file="CSV of member_id[,count] rows; a count here overrides the default",
+    count="Tasks to credit each member (default 1)",
+)
+async def tasks_add_batch(
+    interaction: discord.Interaction,
+    task_type: str,
+    members: str | None = None,
+    role: discord.Role | None = None,
+    csv_file: discord.Attachment | None = None,
+    count: app_commands.Range[int, 1, 100] = 1,
+    comments: app_commands.Range[str, 0, 4000] | None = None,
+    proof: discord.Attachment | None = None,
+):
+    entry = bot.task_catalog.get(task_type)
+    if entry is None or not entry.enabled:
+        await interaction.response.send_message(
+            "That task type is not enabled. Use `/tasks type_add` first.",
+            ephemeral=True
+        )
+        return
+    if not interaction.guild or not (members or role or csv_file):
+        await interaction.response.send_message("Give me `members`, a `role`, or a `csv_file` to credit.", ephemeral=True)
+        return
+    await interaction.response.defer(ephemeral=True, thinking=True)
+
+    wanted: dict[int, int | None] = {}
+    for raw_id in re.findall(r"\d{15,21}", members or ""):
+        wanted[int(raw_id)] = None
+    if role:
+        for m in role.members:
+            if not m.bot:
+                wanted.setdefault(m.id, None)
+    if csv_file:
+        try:
+            wanted.update(_parse_batch_csv(await csv_file.read()))
+        except (UnicodeDecodeError, ValueError, csv.Error) as e:
+            await interaction.followup.send(f"Couldn't read `{csv_file.filename}`: {e}", ephemeral=True)
+            return
+
+    targets: list[tuple[discord.Member, int]] = []
+    skipped: list[str] = []
+    for member_id, member_count in wanted.items():
+        member = interaction.guild.get_member(member_id)
+        if not member or member.bot:
+            skipped.append(f"<@{member_id}>")
+        elif member_count is not None and not 1 <= member_count <= 100:
+            skipped.append(f"{member.mention} (count {member_count})")
+        else:
+            targets.append((member, member_count or count))
+    if not targets:
+        await interaction.followup.send("None of those are members of this server.", ephemeral=True)
+        return
+    if len(targets) > BATCH_CREDIT_MAX_MEMBERS:
+        await interaction.followup.send(
+            f"That's {len(targets)} members; the limit is {BATCH_CREDIT_MAX_MEMBERS} per batch.", ephemeral=True
+        )
+        return
+
+    now = utcnow()
+    wk = quota_week_key(now)
+    proof_url = proof.url if proof else None
+    comments_val = comments or "Added by management"
+    records = [
+        (member.id, entry.name, entry.name, proof_url, comments_val, now, wk)
+        for member, member_count in targets
+        for _ in range(member_count)
+    ]
     async with bot.db_pool.acquire() as conn:
         async with conn.transaction():
-            last_log = await conn.fetchrow(
-                "SELECT log_id, task FROM weekly_task_logs WHERE member_id = $1 ORDER BY timestamp DESC LIMIT 1",
-                member_id
-            )
-            if not last_log:
-                await interaction.response.send_message(f"{member.display_name} has no weekly tasks logged.", ephemeral=True)
-                return
-            await conn.execute("DELETE FROM weekly_task_logs WHERE log_id = $1", last_log['log_id'])
-            new_count = await sync_weekly_task_counter(conn, member_id)
-    await log_action("Removed Last Weekly Task", f"By: {interaction.user.mention}\nMember: {member.mention}\nRemoved: **{last_log['task']}**")
-    await interaction.response.send_message(
-        f"Removed last weekly task for {member.mention}: '{last_log['task']}'. They now have {new_count} tasks.",
-        ephemeral=True
-    )
+            await copy_task_logs(conn, records, await next_task_log_batch(conn))
+            xid = await conn.fetchval(f"SELECT {CURRENT_XID_SQL}")
+    for member, member_count in targets:
+        bot.weekly.record_tasks(member.id, entry.name, now, member_count, xid=xid)
 
-@tasks_group.command(name="weekly_preview", description="(Mgmt+) Preview the weekly activity summary style without resetting data.")
-@app_commands.checks.has_role(MANAGEMENT_ROLE_ID)
-async def tasks_weekly_preview(interaction: discord.Interaction):
-    wk = week_key()
-    now = utcnow()
-    week_end = now + datetime.timedelta(days=(6 - now.weekday()))
-    week_start = week_end - datetime.timedelta(days=6)
+    # Promotion checks each need a connection; cap them so the batch can't drain the pool.
+    gate = asyncio.Semaphore(PROMOTION_CHECK_CONCURRENCY)
 
-    preview = (
-        f"--- Weekly Task Report (**{wk}**) ---\n"
-        f"Week of **{pretty_date(week_start)}** to **{pretty_date(week_end)}**\n\n"
-        "**✅ Met Requirement (0):**\n—\n\n"
-        "**❌ Below Quota (0):**\n—\n\n"
-        "**🚫 0 Activity (0):**\n—\n\n"
-        "**🟦 Excused (0):**\n—\n\n"
-        "*Robux totals and task counts are calculated from weekly log entries. Recruitment +200 promotion bonuses must be manually verified by management.*\n\n"
-        "This is only a preview command for style testing; no data was reset."
+    async def check_promotion(member: discord.Member) -> None:
+        async with gate:
+            await maybe_send_promotion_alert(member)
+
+    outcomes = await asyncio.gather(*(check_promotion(m) for m, _ in targets), return_exceptions=True)
+    for (member, _), outcome in zip(targets, outcomes):
+        if isinstance(outcome, Exception):
+            print(f"[promotion-alert] Check failed for member {member.id}: {outcome}")
+
+    robux_each = entry.robux_value
+    credited = "\n".join(f"{member.mention} — {member_count}" for member, member_count in targets)
+    desc = (
+        f"Credited **{entry.name}** to **{len(targets)}** member(s) (**{len(records)}** task(s)).\n"
+        f"Estimated payout added: **R${robux_each * len(records)}** *(R${robux_each} each)*.\n\n"
+        f"**Credited:**\n{credited}"
     )
+    if skipped:
+        desc += f"\n\n**Skipped (not in server or bad count):** {', '.join(skipped)}"
+    embed = discord.Embed(title="✅ Batch Tasks Added", description=desc[:4000], color=discord.Color.green(), timestamp=utcnow())
+    if proof_url:
+        embed.set_image(url=proof_url)
 
-    embed = discord.Embed(
-        title="Weekly Task Summary (Preview)",
-        description=preview,
-        color=discord.Color.from_str("#5aa9ff"),
-        timestamp=utcnow(),
+    await log_action(
+        "Batch Tasks Added",
+        f"By: {interaction.user.mention}\nType: **{entry.name}**\nMembers: **{len(targets)}**\nTasks: **{len(records)}**",
     )
-    await interaction.response.send_message(embed=embed, ephemeral=True)
+    await interaction.followup.send(embed=embed, ephemeral=True)
 
 # ---------- Welcome + DM ----------
 @bot.tree.command(name="welcome", description="Sends the official welcome message.")
@@ -2082,7 +4874,7 @@ async def verification_audit(interaction: discord.Interaction, ping: bool = Fals
         )
         return
 
-    async with bot.db_pool.acquire() as conn:
+    async with bot.acquire_read() as conn:
         rows = await conn.fetch("SELECT discord_id FROM roblox_verification")
     verified_ids = {int(row["discord_id"]) for row in rows}
 
@@ -2271,7 +5063,7 @@ async def orientation_pending(interaction: discord.Interaction):
         return
 
     ids = [m.id for m in students]
-    async with bot.db_pool.acquire() as conn:
+    async with bot.acquire_read() as conn:
         rows = await conn.fetch(
             "SELECT discord_id, deadline, passed FROM orientations WHERE discord_id = ANY($1::bigint[])",
             ids,
@@ -2309,16 +5101,32 @@ async def orientation_pending(interaction: discord.Interaction):
     await log_action("Orientation Pending Viewed", f"By: {interaction.user.mention}\nPending count: {len(pending_members)}")
 
 # ---------- Strikes ----------
-async def issue_strike(member: discord.Member, reason: str, *, set_by: int | None, auto: bool) -> int:
+ACTIVE_STRIKE_COUNT_QUERY = "SELECT COUNT(*) FROM strikes WHERE member_id=$1 AND expires_at > $2"
+RECENT_STRIKE_COUNT_QUERY = "SELECT COUNT(*) FROM strikes WHERE member_id=$1 AND issued_at >= $2"
+ACTIVE_STRIKES_QUERY = (
+    "SELECT reason, expires_at, issued_at, auto FROM strikes WHERE member_id=$1 AND expires_at > $2 ORDER BY expires_at ASC"
+)
+
+async def issue_strike(
+    member: discord.Member, reason: str, *, set_by: int | None, auto: bool, quota_week: str | None = None
+) -> int | None:
+    """Record a strike and DM the member; returns their active count.
+
+    With ``quota_week`` the strike is issued at most once per member and week,
+    and None is returned when it already was.
+    """
     now = utcnow()
     expires = now + datetime.timedelta(days=90)
     async with bot.db_pool.acquire() as conn:
-        await conn.execute(
-            "INSERT INTO strikes (member_id, reason, issued_at, expires_at, set_by, auto) "
-            "VALUES ($1, $2, $3, $4, $5, $6)",
-            member.id, reason, now, expires, set_by, auto
+        strike_id = await conn.fetchval(
+            "INSERT INTO strikes (member_id, reason, issued_at, expires_at, set_by, auto, quota_week) "
+            "VALUES ($1, $2, $3, $4, $5, $6, $7) "
+            "ON CONFLICT (member_id, quota_week) WHERE quota_week IS NOT NULL DO NOTHING RETURNING strike_id",
+            member.id, reason, now, expires, set_by, auto, quota_week
         )
-        active = await conn.fetchval("SELECT COUNT(*) FROM strikes WHERE member_id=$1 AND expires_at > $2", member.id, now)
+        if strike_id is None:
+            return None
+        active = await conn.fetchval(ACTIVE_STRIKE_COUNT_QUERY, member.id, now)
 
     try:
         await member.send(
@@ -2352,7 +5160,7 @@ async def strikes_remove(interaction: discord.Interaction, member: discord.Membe
             return
         ids = [r['strike_id'] for r in rows]
         await conn.execute("DELETE FROM strikes WHERE strike_id = ANY($1::int[])", ids)
-        remaining = await conn.fetchval("SELECT COUNT(*) FROM strikes WHERE member_id=$1 AND expires_at > $2", member.id, now)
+        remaining = await conn.fetchval(ACTIVE_STRIKE_COUNT_QUERY, member.id, now)
     await log_action("Strikes Removed", f"Member: {member.mention}\nRemoved: **{len(ids)}**\nActive remaining: **{remaining}/3**")
     await interaction.response.send_message(f"Removed **{len(ids)}** strike(s) from {member.mention}. Active remaining: **{remaining}/3**.", ephemeral=True)
 
@@ -2360,8 +5168,8 @@ async def strikes_remove(interaction: discord.Interaction, member: discord.Membe
 async def strikes_view(interaction: discord.Interaction, member: discord.Member | None = None):
     target = member or interaction.user
     now = utcnow()
-    async with bot.db_pool.acquire() as conn:
-        active_rows = await conn.fetch("SELECT reason, expires_at, issued_at, auto FROM strikes WHERE member_id=$1 AND expires_at > $2 ORDER BY expires_at ASC", target.id, now)
+    async with bot.acquire_read() as conn:
+        active_rows = await conn.fetch(ACTIVE_STRIKES_QUERY, target.id, now)
         total = await conn.fetchval("SELECT COUNT(*) FROM strikes WHERE member_id=$1", target.id)
     if not active_rows:
         desc = f"**Active strikes:** 0/3\n**Total strikes ever:** {total}"
@@ -2372,156 +5180,363 @@ async def strikes_view(interaction: discord.Interaction, member: discord.Member
     await interaction.response.send_message(embed=embed, ephemeral=True)
 
 # ---------- Weekly task summary + strikes + reset ----------
-@tasks.loop(time=datetime.time(hour=4, minute=0, tzinfo=datetime.timezone.utc))
-async def check_weekly_tasks():
-    # Only fire on Sunday UTC
-    if utcnow().weekday() != 6:
-        return
+WEEKLY_REPORT_FOOTNOTE = (
+    "*Robux totals and task counts are calculated from weekly log entries. "
+    "Recruitment +200 promotion bonuses must be manually verified by management.*"
+)
+WEEKLY_OUTCOME_ORDER = {"met": 0, "below": 1, "zero": 2}
+
+
+# The Sunday report in one pass: department members (passed in, so members
+# with no activity still get a "zero" row), their week's logs and on-site
+# time. Test matching mirrors is_test_task_type() and the outcome mirrors
+# quota_status(); rows come back in render order. Robux and the breakdown
+# order are folded from the breakdown in Python (fetch_weekly_results), with
+# the same payout() and sort_breakdown() the in-memory store uses, so both
+# paths agree on labels Python and the database case-map differently.
+WEEKLY_RESULTS_QUERY = (
+    "WITH dept AS (SELECT DISTINCT unnest($4::bigint[]) AS member_id), "
+    "typed AS ("
+    "  SELECT l.member_id, COALESCE(NULLIF(l.task_type, ''), NULLIF(l.task, ''), 'Uncategorized') AS ttype, "
+    "         COUNT(*)::int AS cnt "
+    "  FROM task_logs l JOIN dept USING (member_id) "
+    "  WHERE l.week_key = $1 AND l.timestamp >= $2 AND l.timestamp < $3 "
+    "  GROUP BY 1, 2"
+    "), per_member AS ("
+    "  SELECT t.member_id, SUM(t.cnt)::int AS tasks, "
+    "         COALESCE(SUM(t.cnt) FILTER (WHERE md_normalize_label(t.ttype) LIKE '%test%'), 0)::int AS test_count, "
+    "         COALESCE(SUM(t.cnt) FILTER (WHERE md_normalize_label(t.ttype) NOT LIKE '%test%'), 0)::int AS misc_count, "
+    "         json_agg(json_build_array(t.ttype, t.cnt)) AS breakdown "
+    "  FROM typed t "
+    "  GROUP BY t.member_id"
+    "), scored AS ("
+    "  SELECT d.member_id, COALESCE(m.tasks, 0) AS tasks, COALESCE(m.test_count, 0) AS test_count, "
+    "         COALESCE(m.misc_count, 0) AS misc_count, COALESCE(r.time_spent, 0) / 60 AS minutes, "
+    "         COALESCE(m.breakdown, '[]'::json) AS breakdown, "
+    "         m.member_id IS NULL AND r.member_id IS NULL AS idle "
+    "  FROM dept d LEFT JOIN per_member m USING (member_id) LEFT JOIN roblox_time r USING (member_id)"
+    ") "
+    "SELECT member_id, tasks, test_count, misc_count, minutes, breakdown, "
+    "       CASE WHEN idle THEN 'zero' "
+    "            WHEN minutes >= $5 AND test_count >= $6 AND misc_count >= $7 THEN 'met' "
+    "            ELSE 'below' END AS outcome "
+    "FROM scored "
+    "ORDER BY CASE WHEN idle THEN 2 WHEN minutes >= $5 AND test_count >= $6 AND misc_count >= $7 THEN 0 ELSE 1 END, "
+    "         tasks DESC, minutes DESC, member_id"
+)
+
+
+async def compute_weekly_results(
+    guild: discord.Guild, dept_member_ids: set[int], wk: str, primary: bool = False
+) -> list[dict[str, Any]]:
+    """Compute each department member's quota outcome for a quota week, ready to render or archive.
+
+    The live week is served from the in-memory store when it can vouch for
+    it; otherwise WEEKLY_RESULTS_QUERY does the work. Reads go to the replica
+    unless ``primary`` is set; anything that issues strikes from the result
+    must read the primary.
+    """
+    member_ids = [member_id for member_id in dept_member_ids if guild.get_member(member_id)]
+    stats = None if primary else bot.weekly.snapshot(wk)
+    if stats is not None:
+        return weekly_results_from_stats(member_ids, stats)
+
+    acquire = bot.db_pool.acquire if primary else bot.acquire_read
+    async with acquire() as conn:
+        return await fetch_weekly_results(conn, wk, member_ids, bot.task_catalog)
+
+
+async def fetch_weekly_results(
+    conn: asyncpg.Connection, wk: str, member_ids: list[int], catalog: TaskTypeCatalog
+) -> list[dict[str, Any]]:
+    """Run WEEKLY_RESULTS_QUERY and price each breakdown with ``catalog``."""
+    week_start, week_end = quota_week_bounds(wk)
+    rows = await conn.fetch(
+        WEEKLY_RESULTS_QUERY, wk, week_start, week_end, member_ids,
+        WEEKLY_TIME_REQUIREMENT, WEEKLY_TEST_REQUIREMENT, WEEKLY_MISC_REQUIREMENT,
+    )
+    results = []
+    for r in rows:
+        breakdown = sort_breakdown((ttype, cnt) for ttype, cnt in json.loads(r["breakdown"]))
+        robux = sum(catalog.payout(ttype) * cnt for ttype, cnt in breakdown)
+        results.append({**dict(r), "robux": robux, "breakdown": breakdown})
+    return results
+
+
+def weekly_results_from_stats(member_ids: list[int], stats: dict[int, WeeklyMemberStats]) -> list[dict[str, Any]]:
+    """The in-memory twin of WEEKLY_RESULTS_QUERY."""
+    results: list[dict[str, Any]] = []
+    for member_id in member_ids:
+        st = stats.get(member_id)
+        if st is None:
+            results.append({
+                "member_id": member_id, "tasks": 0, "test_count": 0, "misc_count": 0,
+                "minutes": 0, "robux": 0, "breakdown": [], "outcome": "zero",
+            })
+            continue
+        quota_met, _ = quota_status(st.test_count, st.misc_count, st.minutes)
+        results.append({
+            "member_id": member_id,
+            "tasks": st.tasks,
+            "test_count": st.test_count,
+            "misc_count": st.misc_count,
+            "minutes": st.minutes,
+            "robux": st.robux,
+            "breakdown": st.breakdown(),
+            "outcome": "met" if quota_met else "below",
+        })
+    results.sort(key=lambda r: (WEEKLY_OUTCOME_ORDER[r["outcome"]], -r["tasks"], -r["minutes"], r["member_id"]))
+    return results
+
+
+async def save_weekly_report(conn: asyncpg.Connection, wk: str, results: list[dict[str, Any]]) -> None:
+    """Persist a week's computed results so it can be re-rendered without the raw data."""
+    await conn.executemany(
+        "INSERT INTO weekly_reports "
+        "(week_key, member_id, tasks, test_count, misc_count, minutes, robux, breakdown, outcome, generated_at) "
+        "VALUES ($1, $2, $3, $4, $5, $6, $7, $8::jsonb, $9, $10) "
+        "ON CONFLICT (week_key, member_id) DO UPDATE SET "
+        "tasks = EXCLUDED.tasks, test_count = EXCLUDED.test_count, misc_count = EXCLUDED.misc_count, "
+        "minutes = EXCLUDED.minutes, robux = EXCLUDED.robux, breakdown = EXCLUDED.breakdown, "
+        "outcome = EXCLUDED.outcome, generated_at = EXCLUDED.generated_at",
+        [
+            (
+                wk, r["member_id"], r["tasks"], r["test_count"], r["misc_count"], r["minutes"], r["robux"],
+                json.dumps(r["breakdown"]), r["outcome"], utcnow(),
+            )
+            for r in results
+        ],
+    )
+
+
+async def load_weekly_report(conn: asyncpg.Connection, wk: str) -> list[dict[str, Any]]:
+    rows = await conn.fetch(
+        "SELECT member_id, tasks, test_count, misc_count, minutes, robux, breakdown, outcome "
+        "FROM weekly_reports WHERE week_key = $1",
+        wk,
+    )
+    results = [
+        {
+            **dict(r),
+            "breakdown": [tuple(item) for item in json.loads(r["breakdown"] or "[]")],
+        }
+        for r in rows
+    ]
+    results.sort(key=lambda r: (WEEKLY_OUTCOME_ORDER.get(r["outcome"], 3), -r["tasks"], -r["minutes"], r["member_id"]))
+    return results
+
+
+def render_weekly_summary(wk: str, results: list[dict[str, Any]], closing_line: str) -> str:
+    week_start, week_end = quota_week_bounds(wk)
+    # Label the week Monday..Sunday as the report always has, even though it closes Sunday 04:00.
+    first_day = week_start + QUOTA_WEEK_SHIFT
+
+    def fmt_breakdown(task_breakdown: list[tuple[str, int]]) -> str:
+        if not task_breakdown:
+            return "no logged tasks"
+        return ", ".join(f"{count}× {task_type}" for task_type, count in task_breakdown)
+
+    def progress_of(r: dict[str, Any]) -> str:
+        return quota_status(r["test_count"], r["misc_count"], r["minutes"])[1]
+
+    def fmt_active(lst):
+        return "\n".join(
+            f"• <@{r['member_id']}> | {r['robux']}R$ — {progress_of(r)} ({fmt_breakdown(r['breakdown'])})"
+            for r in lst
+        ) if lst else "—"
+
+    def fmt_zero(lst):
+        return "\n".join(f"• <@{r['member_id']}> | {r['robux']}R$ — {progress_of(r)}" for r in lst) if lst else "—"
+
+    met = [r for r in results if r["outcome"] == "met"]
+    not_met = [r for r in results if r["outcome"] == "below"]
+    zero = [r for r in results if r["outcome"] == "zero"]
+
+    summary = (
+        f"--- Weekly Task Report (**{wk}**) ---\n"
+        f"Week of **{pretty_date(first_day)}** to **{pretty_date(week_end)}**\n\n"
+    )
+    summary += f"**✅ Met Requirement ({len(met)}):**\n{fmt_active(met)}\n\n"
+    summary += f"**❌ Below Quota ({len(not_met)}):**\n{fmt_active(not_met)}\n\n"
+    summary += f"**🚫 0 Activity ({len(zero)}):**\n{fmt_zero(zero)}\n\n"
+    summary += f"{WEEKLY_REPORT_FOOTNOTE}\n\n"
+    summary += closing_line
+    return summary
+
+
+def department_member_ids(guild: discord.Guild) -> set[int] | None:
+    dept_role = guild.get_role(DEPARTMENT_ROLE_ID) if DEPARTMENT_ROLE_ID else None
+    if not dept_role:
+        return None
+    return {m.id for m in dept_role.members if not m.bot}
+
+
+# Serialises close-outs across instances: a new leader's catch-up waits for a
+# run the previous leader is still finishing, then finds it completed.
+WEEKLY_CLOSE_LOCK_KEY = 0x4D445F574B4C5943  # "MD_WKLYC"
+
+
+def last_closed_quota_week(now: datetime.datetime | None = None) -> str:
+    """Key of the most recent quota week that has already ended."""
+    return quota_week_key((now or utcnow()) - datetime.timedelta(days=7))
+
+
+async def close_quota_week(wk: str) -> None:
+    """Report, announce, strike and reset the ended quota week ``wk``.
+
+    Each step is recorded in weekly_runs, so a run cut short (a crash or a lost
+    lock session) is resumed from its saved report by the next leader.
+    """
+    async with bot.db_pool.acquire() as lock_conn:
+        await lock_conn.execute("SELECT pg_advisory_lock($1)", WEEKLY_CLOSE_LOCK_KEY)
+        try:
+            await _close_quota_week(wk)
+        finally:
+            # A dead session has already released the lock.
+            with contextlib.suppress(Exception):
+                await lock_conn.execute("SELECT pg_advisory_unlock($1)", WEEKLY_CLOSE_LOCK_KEY)
+
 
-    if await is_quota_paused():
+async def _close_quota_week(wk: str) -> None:
+    async with bot.db_pool.acquire() as conn:
+        run = await conn.fetchrow("SELECT announced_at, completed_at FROM weekly_runs WHERE week_key = $1", wk)
+    if run and run["completed_at"]:
+        # A previous leader finished this week before failing over.
+        print(f"Weekly quota check skipped: {wk} was already completed.")
+        return
+    if not run and await is_quota_paused():
+        # Record the skip so a later election does not close the paused week after all.
+        async with bot.db_pool.acquire() as conn:
+            await conn.execute(
+                "INSERT INTO weekly_runs (week_key, completed_at) VALUES ($1, now()) ON CONFLICT DO NOTHING", wk
+            )
         print("Weekly quota check skipped: quota is paused.")
         return
 
-    wk = week_key()
-    now = utcnow()
-    week_end = now
-    week_start = week_end - datetime.timedelta(days=6)
     announcement_channel = bot.get_channel(WEEKLY_QUOTA_CHANNEL_ID)
     if not announcement_channel:
         print("Weekly check failed: Announcement channel not found.")
         return
 
     guild = announcement_channel.guild
-    dept_role = guild.get_role(DEPARTMENT_ROLE_ID)
-    if not dept_role:
+    dept_member_ids = department_member_ids(guild)
+    if dept_member_ids is None:
         print("Weekly check failed: Department role not found.")
         return
 
-    dept_member_ids = {m.id for m in dept_role.members if not m.bot}
+    if run:
+        # A previous leader saved the report and stopped part-way; resume from it.
+        print(f"Weekly quota check resuming {wk} from its saved report.")
+        async with bot.db_pool.acquire() as conn:
+            results = await load_weekly_report(conn, wk)
+    else:
+        results = await compute_weekly_results(guild, dept_member_ids, wk, primary=True)
+        async with bot.db_pool.acquire() as conn:
+            async with conn.transaction():
+                await save_weekly_report(conn, wk, results)
+                await conn.execute("INSERT INTO weekly_runs (week_key) VALUES ($1) ON CONFLICT DO NOTHING", wk)
 
-    async with bot.db_pool.acquire() as conn:
-        all_tasks = await conn.fetch(
-            "SELECT member_id, COUNT(*) AS tasks_completed "
-            "FROM weekly_task_logs GROUP BY member_id"
-        )
-        all_time = await conn.fetch("SELECT member_id, time_spent FROM roblox_time")
-        payout_rows = await conn.fetch(
-            "SELECT member_id, COALESCE(NULLIF(task_type, ''), task) AS ttype, COUNT(*) AS cnt "
-            "FROM weekly_task_logs GROUP BY member_id, ttype"
+    if not (run and run["announced_at"]):
+        await send_long_embed(
+            target=announcement_channel,
+            title="Weekly Task Summary",
+            description=render_weekly_summary(wk, results, "Weekly counts will now be reset."),
+            color=discord.Color.from_str("#5aa9ff"),
+            footer_text=None
         )
-        db_robux_rows = await conn.fetch("SELECT task_type, robux_value FROM task_types")
+        async with bot.db_pool.acquire() as conn:
+            await conn.execute("UPDATE weekly_runs SET announced_at = now() WHERE week_key = $1", wk)
 
-    tasks_map = {r['member_id']: int(r['tasks_completed'] or 0) for r in all_tasks if r['member_id'] in dept_member_ids}
-    time_map = {r['member_id']: r['time_spent'] for r in all_time if r['member_id'] in dept_member_ids}
-    payout_lookup = {
-        **{task_type.casefold(): value for task_type, value in TASK_ROBUX_PAYOUTS.items()},
-        **{(r['task_type'] or '').casefold(): int(r['robux_value'] or 0) for r in db_robux_rows},
-    }
-    robux_map: dict[int, int] = {}
-    task_breakdown_map: dict[int, list[tuple[str, int]]] = {}
-    test_count_map: dict[int, int] = {}
-    misc_count_map: dict[int, int] = {}
-    for row in payout_rows:
-        member_id = row['member_id']
-        if member_id not in dept_member_ids:
+    for r in results:
+        if r["outcome"] == "met":
             continue
-        task_type = row['ttype'] or "Uncategorized"
-        count = int(row['cnt'] or 0)
-        task_breakdown_map.setdefault(member_id, []).append((task_type, count))
-        if is_test_task_type(task_type):
-            test_count_map[member_id] = test_count_map.get(member_id, 0) + count
-        else:
-            misc_count_map[member_id] = misc_count_map.get(member_id, 0) + count
-        payout = payout_lookup.get(task_type.casefold(), 0)
-        if payout:
-            robux_map[member_id] = robux_map.get(member_id, 0) + (payout * count)
-    for breakdown in task_breakdown_map.values():
-        breakdown.sort(key=lambda item: (-item[1], item[0].casefold()))
-    met, not_met, zero = [], [], []
-    considered_ids = set(tasks_map.keys()) | set(time_map.keys())
-
-    for member_id in considered_ids:
-        member = guild.get_member(member_id)
+        member = guild.get_member(r["member_id"])
         if not member:
             continue
-        tasks_done = tasks_map.get(member_id, 0)
-        time_done_minutes = (time_map.get(member_id, 0)) // 60
-        robux_total = robux_map.get(member_id, 0)
-        task_breakdown = task_breakdown_map.get(member_id, [])
-        test_count = test_count_map.get(member_id, 0)
-        misc_count = misc_count_map.get(member_id, 0)
-        quota_met, progress = quota_status(test_count, misc_count, time_done_minutes)
-        if quota_met:
-            met.append((member, tasks_done, time_done_minutes, robux_total, task_breakdown, progress))
-        else:
-            not_met.append((member, tasks_done, time_done_minutes, robux_total, task_breakdown, progress))
+        _, progress = quota_status(r["test_count"], r["misc_count"], r["minutes"])
+        await issue_strike(member, f"Failed weekly quota ({progress})", set_by=None, auto=True, quota_week=wk)
 
-    zero_ids = dept_member_ids - considered_ids
-    for mid in zero_ids:
-        member = guild.get_member(mid)
-        if member:
-            _, progress = quota_status(0, 0, 0)
-            zero.append((member, robux_map.get(mid, 0), progress))
+    # Reset weekly time tracking; task logs are week-keyed and need no reset.
+    async with bot.db_pool.acquire() as conn:
+        async with conn.transaction():
+            await conn.execute("TRUNCATE TABLE roblox_time, roblox_sessions")
+            await conn.execute("UPDATE weekly_runs SET completed_at = now() WHERE week_key = $1", wk)
+    try:
+        await bot.weekly.load(bot.db_pool)
+    except Exception as e:
+        # The week is done; the reconcile loop will pick up the reset.
+        print(f"[weekly-store] Reload after the weekly reset failed: {e}")
+    print(f"Weekly tasks and time for {wk} checked and reset.")
 
-    # Post report
-    def fmt_breakdown(task_breakdown: list[tuple[str, int]]) -> str:
-        if not task_breakdown:
-            return "no logged tasks"
-        return ", ".join(f"{count}× {task_type}" for task_type, count in task_breakdown)
 
-    def fmt_met(lst):
-        return "\n".join(
-            f"• {m.mention} | {robux}R$ — {progress} ({fmt_breakdown(breakdown)})"
-            for m, t, mins, robux, breakdown, progress in lst
-        ) if lst else "—"
+async def _close_quota_weeks(weeks: list[str]) -> None:
+    for wk in weeks:
+        try:
+            await close_quota_week(wk)
+        except Exception as e:
+            print(f"Weekly check for {wk} failed: {e}")
 
-    def fmt_not_met(lst):
-        return "\n".join(
-            f"• {m.mention} | {robux}R$ — {progress} ({fmt_breakdown(breakdown)})"
-            for m, t, mins, robux, breakdown, progress in lst
-        ) if lst else "—"
 
-    def fmt_zero(lst):
-        return "\n".join(f"• {m.mention} | {robux}R$ — {progress}" for m, robux, progress in lst) if lst else "—"
+def start_weekly_close(weeks: list[str]) -> asyncio.Task:
+    """Close ``weeks`` in order in a task of its own, so stepping down never cancels a run half done."""
+    task = asyncio.create_task(_close_quota_weeks(weeks))
+    bot.weekly_closes.add(task)
+    task.add_done_callback(bot.weekly_closes.discard)
+    return task
 
-    summary = (
-        f"--- Weekly Task Report (**{wk}**) ---\n"
-        f"Week of **{pretty_date(week_start)}** to **{pretty_date(week_end)}**\n\n"
-    )
-    summary += f"**✅ Met Requirement ({len(met)}):**\n{fmt_met(met)}\n\n"
-    summary += f"**❌ Below Quota ({len(not_met)}):**\n{fmt_not_met(not_met)}\n\n"
-    summary += f"**🚫 0 Activity ({len(zero)}):**\n{fmt_zero(zero)}\n\n"
-    summary += "*Robux totals and task counts are calculated from weekly log entries. Recruitment +200 promotion bonuses must be manually verified by management.*\n\n"
-    summary += "Weekly counts will now be reset."
-
-    await send_long_embed(
-        target=announcement_channel,
-        title="Weekly Task Summary",
-        description=summary,
-        color=discord.Color.from_str("#5aa9ff"),
-        footer_text=None
-    )
 
-    for member, _tasks, _mins, _robux, _breakdown, progress in not_met:
-        await issue_strike(member, f"Failed weekly quota ({progress})", set_by=None, auto=True)
-    for member, _robux, progress in zero:
-        await issue_strike(member, f"Failed weekly quota ({progress})", set_by=None, auto=True)
+async def catch_up_weekly_close() -> None:
+    """On election, resume close-outs a previous leader left unfinished and close a missed Sunday.
 
-    # Reset weekly tables
+    The timed loop only fires at the next Sunday 04:00, so without this a week
+    whose leader failed over, or that had no leader at 04:00, is never closed.
+    Only the latest ended week can be caught up: time tracking keeps no
+    history, and minutes logged since it ended are counted toward it. A fresh
+    install with no runs yet waits for its first Sunday.
+    """
     async with bot.db_pool.acquire() as conn:
-        await conn.execute("TRUNCATE TABLE weekly_tasks, weekly_task_logs, roblox_time, roblox_sessions")
-    print("Weekly tasks and time checked and reset.")
+        rows = await conn.fetch("SELECT week_key, completed_at FROM weekly_runs ORDER BY week_key")
+    weeks = [r["week_key"] for r in rows if r["completed_at"] is None]
+    last_closed = last_closed_quota_week()
+    if rows and rows[-1]["week_key"] < last_closed:
+        weeks.append(last_closed)
+    if weeks:
+        print(f"[leader] Catching up weekly close-out for {', '.join(weeks)}.")
+        await start_weekly_close(weeks)
+
+
+@tasks.loop(time=datetime.time(hour=4, minute=0, tzinfo=datetime.timezone.utc))
+async def check_weekly_tasks():
+    # Only fire on Sunday UTC
+    if utcnow().weekday() != 6:
+        return
+    # Shielded: stepping down cancels this loop, but the close-out runs to the end.
+    await asyncio.shield(start_weekly_close([last_closed_quota_week()]))
+
+@tasks.loop(seconds=WEEKLY_STORE_RECONCILE_SECONDS)
+async def weekly_store_reconcile_loop():
+    if not bot.db_pool:
+        return
+    try:
+        drifted = await bot.weekly.load(bot.db_pool)
+    except Exception as e:
+        print(f"[weekly-store] Reconcile failed; serving the last totals: {e}")
+        return
+    if drifted:
+        print(f"[weekly-store] Reconciled {drifted} member(s) that drifted from the database.")
 
 # ---------- Orientation reminder loop ----------
+PENDING_ORIENTATIONS_QUERY = (
+    "SELECT discord_id, deadline, warned_5d, passed, expired_handled "
+    "FROM orientations WHERE passed = FALSE"
+)
+
 @tasks.loop(minutes=30)
 async def orientation_reminder_loop():
     try:
         alert_channel = bot.get_channel(ORIENTATION_ALERT_CHANNEL_ID)
         async with bot.db_pool.acquire() as conn:
-            rows = await conn.fetch(
-                "SELECT discord_id, deadline, warned_5d, passed, expired_handled "
-                "FROM orientations WHERE passed = FALSE"
-            )
+            rows = await conn.fetch(PENDING_ORIENTATIONS_QUERY)
         if not rows:
             return
 
@@ -2584,14 +5599,82 @@ async def orientation_reminder_loop():
 async def before_orientation_loop():
     await bot.wait_until_ready()
 
+# ---------- task_logs partition maintenance ----------
+@tasks.loop(hours=12)
+async def task_log_partition_maintenance():
+    try:
+        async with bot.db_pool.acquire() as conn:
+            created = await ensure_task_log_partitions(conn)
+        if created:
+            print(f"[DB] Created task_logs partitions: {', '.join(created)}")
+    except Exception as e:
+        print(f"task_log_partition_maintenance error: {e}")
+        await log_action("Task Log Partition Maintenance Failed", f"Error: `{e}`\nNew logs keep landing in `task_logs_default`.")
+
+@task_log_partition_maintenance.before_loop
+async def before_partition_maintenance():
+    await bot.wait_until_ready()
+
+# ---------- task_logs payload retention ----------
+async def archive_task_log_payloads(conn: asyncpg.Connection, cutoff: datetime.datetime, batch_size: int = 5000) -> int:
+    """Move proof_url/comments of logs older than ``cutoff`` into task_log_payloads.
+
+    Works in batches, one transaction each, so it never holds locks on more
+    than ``batch_size`` hot rows. Returns how many rows were archived.
+    """
+    total = 0
+    while True:
+        moved = await conn.fetchval(
+            "WITH picked AS ("
+            "  SELECT log_id, timestamp, proof_url, comments FROM task_logs "
+            "  WHERE timestamp < $1 AND (proof_url IS NOT NULL OR comments IS NOT NULL) "
+            "  LIMIT $2 FOR UPDATE SKIP LOCKED"
+            "), stored AS ("
+            "  INSERT INTO task_log_payloads (log_id, timestamp, proof_url, comments) "
+            "  SELECT log_id, timestamp, proof_url, comments FROM picked "
+            "  ON CONFLICT (log_id, timestamp) DO UPDATE "
+            "  SET proof_url = EXCLUDED.proof_url, comments = EXCLUDED.comments "
+            "  RETURNING log_id, timestamp"
+            "), cleared AS ("
+            # Only clear what was stored; the hot row wins over a leftover payload.
+            "  UPDATE task_logs l SET proof_url = NULL, comments = NULL FROM stored s "
+            "  WHERE l.log_id = s.log_id AND l.timestamp = s.timestamp RETURNING 1"
+            ") SELECT COUNT(*) FROM cleared",
+            cutoff, batch_size,
+        )
+        total += int(moved or 0)
+        if not moved or moved < batch_size:
+            return total
+
+
+@tasks.loop(hours=6)
+async def task_log_retention_loop():
+    if TASK_LOG_PAYLOAD_RETENTION_DAYS <= 0:
+        return
+    try:
+        cutoff = utcnow() - datetime.timedelta(days=TASK_LOG_PAYLOAD_RETENTION_DAYS)
+        async with bot.db_pool.acquire() as conn:
+            archived = await archive_task_log_payloads(conn, cutoff)
+        if archived:
+            print(f"[DB] Archived payloads of {archived} task log(s) older than {cutoff:%Y-%m-%d}.")
+    except Exception as e:
+        print(f"task_log_retention_loop error: {e}")
+
+@task_log_retention_loop.before_loop
+async def before_retention_loop():
+    await bot.wait_until_ready()
+
 # ---------- /rank with autocomplete ----------
-def _normalize_label(value: str | None) -> str:
-    return " ".join((value or "").replace("-", " ").split()).strip().casefold()
+def _count_matching_tasks(totals: list[asyncpg.Record], labels: set[str]) -> int:
+    wanted = {_normalize_label(label) for label in labels}
+    return sum(int(r["cnt"]) for r in totals if r["normalized_type"] in wanted)
 
 
-async def _count_matching_tasks(conn: asyncpg.Connection, member_id: int, labels: set[str]) -> int:
-    rows = await conn.fetch("SELECT COALESCE(NULLIF(task_type, ''), task) AS ttype FROM task_logs WHERE member_id = $1", member_id)
-    return sum(1 for r in rows if _normalize_label(r["ttype"]) in labels)
+# Weeks with at least one logged task, read from the daily rollup so the
+# promotion check never scans a member's whole task_logs history.
+PROMOTION_ACTIVE_WEEKS_QUERY = (
+    "SELECT COUNT(DISTINCT date_trunc('week', day)) FROM member_daily_tasks WHERE member_id=$1"
+)
 
 
 async def evaluate_promotion(member: discord.Member) -> tuple[str | None, str]:
@@ -2604,18 +5687,18 @@ async def evaluate_promotion(member: discord.Member) -> tuple[str | None, str]:
         assigned_at = orientation_row["assigned_at"] if orientation_row else None
         passed_orientation = (orientation_row["passed"] if orientation_row else False) or False
         passed_at = orientation_row["passed_at"] if orientation_row else None
-        total_tasks = await conn.fetchval("SELECT COUNT(*) FROM task_logs WHERE member_id=$1", member.id) or 0
-        strikes_30 = await conn.fetchval("SELECT COUNT(*) FROM strikes WHERE member_id=$1 AND issued_at >= $2", member.id, now - datetime.timedelta(days=30)) or 0
-        strikes_60 = await conn.fetchval("SELECT COUNT(*) FROM strikes WHERE member_id=$1 AND issued_at >= $2", member.id, now - datetime.timedelta(days=60)) or 0
-        week_rows = await conn.fetch("SELECT DISTINCT to_char(timestamp, 'IYYY-IW') AS week FROM task_logs WHERE member_id=$1", member.id)
-        weeks_active = len([r["week"] for r in week_rows if r["week"]])
-        assoc_req_count = await _count_matching_tasks(conn, member.id, PROMOTION_TASK_ALIASES["associate_checkup"])
-        anomaly_test_count = await _count_matching_tasks(conn, member.id, PROMOTION_TASK_ALIASES["anomaly_test"])
-        interview_count = await _count_matching_tasks(conn, member.id, PROMOTION_TASK_ALIASES["interview"])
-        pharmacy_count = await _count_matching_tasks(conn, member.id, PROMOTION_TASK_ALIASES["pharmacy_counter_duty"])
-        anomaly_checkup_count = await _count_matching_tasks(conn, member.id, PROMOTION_TASK_ALIASES["anomaly_checkup"])
-        specimen_count = await _count_matching_tasks(conn, member.id, PROMOTION_TASK_ALIASES["specimen_testing"])
-        surgery_count = await _count_matching_tasks(conn, member.id, PROMOTION_TASK_ALIASES["surgery"])
+        totals = await fetch_member_task_totals(conn, member.id)
+        total_tasks = sum(int(r["cnt"]) for r in totals)
+        strikes_30 = await conn.fetchval(RECENT_STRIKE_COUNT_QUERY, member.id, now - datetime.timedelta(days=30)) or 0
+        strikes_60 = await conn.fetchval(RECENT_STRIKE_COUNT_QUERY, member.id, now - datetime.timedelta(days=60)) or 0
+        weeks_active = await conn.fetchval(PROMOTION_ACTIVE_WEEKS_QUERY, member.id) or 0
+        assoc_req_count = _count_matching_tasks(totals, PROMOTION_TASK_ALIASES["associate_checkup"])
+        anomaly_test_count = _count_matching_tasks(totals, PROMOTION_TASK_ALIASES["anomaly_test"])
+        interview_count = _count_matching_tasks(totals, PROMOTION_TASK_ALIASES["interview"])
+        pharmacy_count = _count_matching_tasks(totals, PROMOTION_TASK_ALIASES["pharmacy_counter_duty"])
+        anomaly_checkup_count = _count_matching_tasks(totals, PROMOTION_TASK_ALIASES["anomaly_checkup"])
+        specimen_count = _count_matching_tasks(totals, PROMOTION_TASK_ALIASES["specimen_testing"])
+        surgery_count = _count_matching_tasks(totals, PROMOTION_TASK_ALIASES["surgery"])
     start_dt = assigned_at or member.joined_at or passed_at
     days_in_dept = (now - start_dt).days if start_dt else 0
     if weeks_active >= 16 and days_in_dept >= 120 and strikes_60 == 0:
@@ -2664,6 +5747,7 @@ class PromotionAlertView(discord.ui.View):
                 "ON CONFLICT (discord_id) DO UPDATE SET rank = EXCLUDED.rank, set_by = EXCLUDED.set_by, set_at = EXCLUDED.set_at",
                 member.id, target["name"], interaction.user.id, utcnow()
             )
+        bot.remember_member_rank(member.id, target["name"])
         for role in member.guild.roles:
             if _normalize_label(role.name) == _normalize_label(target["name"]):
                 await member.add_roles(role, reason=f"Auto-ranked via promotion alert by {interaction.user}")
@@ -2704,18 +5788,8 @@ async def maybe_send_promotion_alert(member: discord.Member):
         print(f"[promotion-alert] Failed to send alert for member {member.id}: {e}")
 
 async def group_role_autocomplete(interaction: discord.Interaction, current: str):
-    current_lower = (current or "").lower()
-    roles = await fetch_group_ranks()
-    if not roles:
-        return []
-    out = []
-    for r in roles:
-        name = r.get('name', '')
-        if not current_lower or name.lower().startswith(current_lower):
-            out.append(app_commands.Choice(name=name, value=name))
-        if len(out) >= 25:
-            break
-    return out
+    del interaction
+    return [app_commands.Choice(name=name, value=name) for name in bot.search_group_ranks(current)]
 
 @bot.tree.command(name="rank", description="(Rank Manager) Set a member's Roblox/Discord rank to a group role.")
 @app_commands.checks.has_role(RANK_MANAGER_ROLE_ID)
@@ -2766,6 +5840,7 @@ async def rank(interaction: discord.Interaction, member: discord.Member, group_r
             "ON CONFLICT (discord_id) DO UPDATE SET rank = EXCLUDED.rank, set_by = EXCLUDED.set_by, set_at = EXCLUDED.set_at",
             member.id, target['name'], interaction.user.id, utcnow()
         )
+    bot.remember_member_rank(member.id, target['name'])
 
     # Assign matching Discord role if present
     assigned_role = None
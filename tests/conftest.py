@@ -0,0 +1,204 @@
+# Shared fixtures for the database-backed tests.
+#
+# Point MD_TEST_DATABASE_URL at a Postgres 14+ server the tests may create
+# databases on, e.g.
+#
+#   MD_TEST_DATABASE_URL=postgresql://postgres@localhost/postgres python -m pytest -q
+#
+# A throwaway database is created, migrated and seeded once per session and
+# dropped afterwards. Without the variable every database test is skipped.
+
+import asyncio
+import datetime
+import os
+import sys
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+
+import asyncpg
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main  # noqa: E402
+
+TEST_DSN = os.getenv("MD_TEST_DATABASE_URL")
+TEST_DATABASE = f"md_test_{os.getpid()}"
+
+SEED_MEMBERS = 2_000
+SEED_TASK_LOGS = 200_000
+SEED_MONTHS = 6
+SEED_TASK_TYPES = ["Checkup", "Interview", "Post-Op Interview", "Anomaly Checkup", "Anomaly Test", "Pharmacy"]
+
+
+def _with_database(dsn: str, database: str) -> str:
+    parts = urlsplit(dsn)
+    return urlunsplit(parts._replace(path=f"/{database}"))
+
+
+@pytest.fixture(scope="session")
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def run(loop):
+    return loop.run_until_complete
+
+
+@pytest.fixture(scope="session")
+def db(run):
+    """A migrated, seeded connection to a throwaway database."""
+    if not TEST_DSN:
+        pytest.skip("MD_TEST_DATABASE_URL is not set")
+    name = TEST_DATABASE
+    admin = run(asyncpg.connect(TEST_DSN))
+    run(admin.execute(f"DROP DATABASE IF EXISTS {name}"))
+    run(admin.execute(f"CREATE DATABASE {name}"))
+    conn = run(asyncpg.connect(_with_database(TEST_DSN, name)))
+    try:
+        run(main.apply_schema_migrations(conn))
+        run(seed(conn))
+        yield conn
+    finally:
+        run(conn.close())
+        run(admin.execute(f"DROP DATABASE IF EXISTS {name} WITH (FORCE)"))
+        run(admin.close())
+
+
+@pytest.fixture
+def other_db(db, run):
+    """A second connection to the seeded database, for writes that commit while ``db`` holds a snapshot."""
+    conn = run(asyncpg.connect(_with_database(TEST_DSN, TEST_DATABASE)))
+    yield conn
+    run(conn.close())
+
+
+async def seed(conn: asyncpg.Connection) -> None:
+    """Load a few months of synthetic activity, then rebuild the rollups and ANALYZE."""
+    now = main.utcnow()
+    first_month = main._add_months(main._month_start(now), -SEED_MONTHS)
+    await main.ensure_task_log_partitions(conn, first_month=first_month)
+    span = int((now - first_month).total_seconds())
+    async with conn.transaction():
+        await conn.execute("SET LOCAL md.skip_rollup = 'on'")
+        await conn.execute(
+            "INSERT INTO task_logs (member_id, task, task_type, proof_url, comments, timestamp, week_key) "
+            "SELECT m, t, t, 'https://cdn.example/p.png', 'seed', ts, "
+            "       to_char((ts AT TIME ZONE 'UTC') + interval '20 hours', 'IYYY-\"W\"IW') "
+            "FROM (SELECT 1000 + (g::bigint * 7919) % $1 AS m, ($2::text[])[1 + g % array_length($2, 1)] AS t, "
+            "             $3::timestamptz + (g::bigint * 104729 % $4) * interval '1 second' AS ts "
+            "      FROM generate_series(1, $5) g) s",
+            SEED_MEMBERS, SEED_TASK_TYPES, first_month, span, SEED_TASK_LOGS,
+        )
+        await main.rebuild_member_task_totals(conn)
+        await main.rebuild_member_daily_tasks(conn)
+    await conn.execute(
+        "INSERT INTO strikes (member_id, reason, issued_at, expires_at, auto) "
+        "SELECT 1000 + g % $1, 'seed', $2::timestamptz - g * interval '1 hour', "
+        "       $2::timestamptz - g * interval '1 hour' + interval '30 days', FALSE "
+        "FROM generate_series(1, 20000) g",
+        SEED_MEMBERS, now,
+    )
+    # Nearly everyone has passed; the reminder loop only cares about the rest.
+    await conn.execute(
+        "INSERT INTO orientations (discord_id, assigned_at, deadline, passed, passed_at) "
+        "SELECT 1000 + g, $1::timestamptz - interval '30 days', $1::timestamptz - interval '16 days', "
+        "       g % 50 <> 0, $1::timestamptz - interval '20 days' "
+        "FROM generate_series(0, 19999) g",
+        now,
+    )
+    await conn.execute("INSERT INTO roblox_time (member_id, time_spent) SELECT 1000 + g, g * 37 FROM generate_series(0, 499) g")
+    await conn.execute("ANALYZE")
+
+
+class CapturingConnection:
+    """Stands in for a connection to record the SQL a helper would run."""
+
+    def __init__(self):
+        self.calls: list[tuple[str, tuple]] = []
+
+    async def fetch(self, query: str, *args):
+        self.calls.append((query, args))
+        return []
+
+    async def fetchval(self, query: str, *args):
+        self.calls.append((query, args))
+        return 0
+
+    async def fetchrow(self, query: str, *args):
+        self.calls.append((query, args))
+        return None
+
+
+@pytest.fixture
+def capture():
+    return CapturingConnection()
+
+
+class FakePool:
+    """Stands in for an asyncpg.Pool whose every acquire() yields ``conn``.
+
+    Like asyncpg's, acquire() works both as ``async with`` and as ``await``
+    followed by release().
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def acquire(self, *, timeout=None):
+        return _FakeAcquire(self.conn)
+
+    async def release(self, conn, *, timeout=None):
+        pass
+
+
+class _FakeAcquire:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __await__(self):
+        yield from asyncio.sleep(0).__await__()
+        return self.conn
+
+    async def __aenter__(self):
+        return self.conn
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def rollback(db, run):
+    """Run ``body(conn)`` on the seeded database inside a transaction that is always rolled back."""
+
+    def in_rollback(body):
+        async def wrapped():
+            # Repeatable read, so code that opens its own snapshot can nest in it.
+            tx = db.transaction(isolation="repeatable_read")
+            await tx.start()
+            try:
+                return await body(db)
+            finally:
+                await tx.rollback()
+
+        return run(wrapped())
+
+    return in_rollback
+
+
+@pytest.fixture(scope="session")
+def seeded_week() -> str:
+    return main.quota_week_key(main.utcnow())
+
+
+@pytest.fixture(scope="session")
+def busy_member(db, run) -> int:
+    """The member with the most logs, so their queries see the deepest history."""
+    return run(db.fetchval("SELECT member_id FROM member_task_totals GROUP BY member_id ORDER BY sum(count) DESC LIMIT 1"))
+
+
+def days_ago(days: int) -> datetime.datetime:
+    return main.utcnow() - datetime.timedelta(days=days)
@@ -0,0 +1,19 @@
+# /tasks import must not double count rows that came from an export.
+
+import main
+
+
+def test_rows_with_an_existing_log_id_are_dropped(db, run, busy_member):
+    logged = run(db.fetchrow("SELECT log_id, timestamp FROM task_logs WHERE member_id = $1 LIMIT 1", busy_member))
+    ts = logged["timestamp"]
+    record = (busy_member, "Checkup", "Checkup", None, "Imported by management", ts, main.quota_week_key(ts))
+    batch = [
+        (logged["log_id"], record),
+        (logged["log_id"] + 10**9, record),
+        (None, record),
+    ]
+    kept = run(main._drop_existing_task_logs(db, batch))
+    assert kept == [record, record]
+    # Only the (log_id, timestamp) pair identifies a log.
+    moved = (busy_member, "Checkup", "Checkup", None, "x", ts.replace(year=ts.year - 5), "")
+    assert run(main._drop_existing_task_logs(db, [(logged["log_id"], moved)])) == [moved]
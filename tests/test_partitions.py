@@ -0,0 +1,24 @@
+# Monthly partition maintenance against the seeded database.
+
+import main
+
+
+def test_creating_a_month_moves_its_stranded_default_rows(db, run):
+    far = main._add_months(main._month_start(main.utcnow()), 40)
+    name = main.task_log_partition_name(far)
+    before = run(db.fetchval("SELECT sum(count) FROM member_task_totals"))
+    log_id = run(db.fetchval(
+        "INSERT INTO task_logs (member_id, task, task_type, timestamp, week_key) "
+        "VALUES (42, 'Checkup', 'Checkup', $1, 'far') RETURNING log_id",
+        far,
+    ))
+    try:
+        assert run(db.fetchval("SELECT tableoid::regclass::text FROM task_logs WHERE log_id = $1", log_id)) == "task_logs_default"
+        created = run(main.ensure_task_log_partitions(db, months_ahead=40))
+        assert name in created
+        assert run(db.fetchval("SELECT tableoid::regclass::text FROM task_logs WHERE log_id = $1", log_id)) == name
+        assert not run(db.fetchval("SELECT count(*) FROM task_logs_default"))
+        assert run(db.fetchval("SELECT sum(count) FROM member_task_totals")) == before + 1
+    finally:
+        run(db.execute("DELETE FROM task_logs WHERE log_id = $1", log_id))
+    assert run(db.fetchval("SELECT sum(count) FROM member_task_totals")) == before
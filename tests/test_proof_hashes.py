@@ -0,0 +1,39 @@
+# Duplicate-proof lookup against the seeded database.
+
+import hashlib
+
+import main
+
+
+def _signed(bits: int) -> int:
+    return bits - (1 << 64) if bits >= 1 << 63 else bits
+
+
+def test_near_duplicates_are_matched_by_bit_distance(rollback):
+    now = main.utcnow()
+    dhash = _signed(0xF0F0_1234_8888_0F0F)
+
+    async def body(conn):
+        await conn.executemany(
+            "INSERT INTO proof_hashes (log_id, timestamp, member_id, sha256, dhash, bands) VALUES ($1, $2, 7, $3, $4, $5)",
+            [(log_id, now, hashlib.sha256(b"original").digest(), dhash, main.proof_hash_bands(dhash)) for log_id in (2**40, 2**40 + 1)],
+        )
+
+        async def lookup(candidate: int, own_log_ids: list[int]):
+            candidate = _signed(candidate)
+            return await conn.fetchrow(
+                main.PROOF_MATCH_QUERY, hashlib.sha256(b"re-encoded").digest(), main.proof_hash_bands(candidate),
+                candidate, own_log_ids, now, main.PROOF_NEAR_DUPLICATE_DISTANCE,
+            )
+
+        return (
+            await lookup(0xF0F0_1234_8888_0F0F ^ 0b101, [2**41]),
+            await lookup(0xF0F0_1234_8888_0F0F ^ 0b1111, [2**41]),
+            # A batch never matches its own rows.
+            await lookup(0xF0F0_1234_8888_0F0F, [2**40, 2**40 + 1]),
+        )
+
+    near, too_far, own_batch = rollback(body)
+    assert near is not None and near["log_id"] == 2**40 and not near["exact"]
+    assert too_far is None
+    assert own_batch is None
@@ -0,0 +1,103 @@
+# Query-plan regressions: every hot per-member or per-week query must be served
+# by an index on the seeded dataset, never by a sequential scan of a big table.
+
+import json
+
+import main
+
+from conftest import days_ago
+
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+
+def plan_nodes(run, db, query: str, *args) -> list[dict]:
+    """Flatten an EXPLAIN plan; partitions and their indexes are reported as their parents."""
+    raw = run(db.fetchval(f"EXPLAIN (FORMAT JSON) {query}", *args))
+    nodes, stack = [], [json.loads(raw)[0]["Plan"]]
+    while stack:
+        node = stack.pop()
+        stack.extend(node.get("Plans", []))
+        for key in ("Relation Name", "Index Name"):
+            if node.get(key):
+                node[key] = run(db.fetchval(
+                    "SELECT COALESCE(pg_partition_root($1::regclass), $1::regclass)::text", node[key]
+                ))
+        if node.get("Index Name") and not node.get("Relation Name"):
+            # Bitmap Index Scan nodes only name the index.
+            node["Relation Name"] = run(db.fetchval(
+                "SELECT indrelid::regclass::text FROM pg_index WHERE indexrelid = $1::regclass", node["Index Name"]
+            ))
+        nodes.append(node)
+    return nodes
+
+
+def assert_indexed(nodes: list[dict], relation: str, index: str | None = None) -> None:
+    """``relation`` is only read through indexes (``index``, when given)."""
+    seq = [n for n in nodes if n["Node Type"] == "Seq Scan" and n.get("Relation Name") == relation]
+    assert not seq, f"sequential scan on {relation}"
+    used = {n.get("Index Name") for n in nodes if n["Node Type"] in INDEX_SCANS and n.get("Relation Name") == relation}
+    assert used, f"no index scan on {relation}: {[n['Node Type'] for n in nodes]}"
+    if index:
+        assert index in used, f"expected {index}, got {used}"
+
+
+def test_week_keyed_count_uses_week_index(run, db, capture, busy_member, seeded_week):
+    run(main.count_weekly_tasks(capture, busy_member, seeded_week))
+    (query, args), = capture.calls
+    assert_indexed(plan_nodes(run, db, query, *args), "task_logs")
+
+
+def test_my_week_query_uses_indexes(run, db, busy_member, seeded_week):
+    now = main.utcnow()
+    week_start, week_end = main.quota_week_bounds(seeded_week)
+    nodes = plan_nodes(run, db, main.MY_WEEK_QUERY, seeded_week, busy_member, week_start, week_end, now)
+    assert_indexed(nodes, "task_logs")
+    assert_indexed(nodes, "strikes", "strikes_member_expires_idx")
+
+
+def test_member_history_is_a_keyset_range_scan(run, db, capture, busy_member):
+    run(main.fetch_task_history_page(capture, busy_member))
+    run(main.fetch_task_history_page(capture, busy_member, before=(days_ago(40), 10**9)))
+    run(main.fetch_task_history_page(capture, busy_member, after=(days_ago(90), 0)))
+    for query, args in capture.calls:
+        assert_indexed(plan_nodes(run, db, query, *args), "task_logs", "task_logs_member_ts_idx")
+
+
+def test_member_totals_read_the_rollup(run, db, capture, busy_member):
+    run(main.fetch_member_task_totals(capture, busy_member))
+    (query, args), = capture.calls
+    assert_indexed(plan_nodes(run, db, query, *args), "member_task_totals")
+
+
+def test_bounded_leaderboards_read_the_daily_rollup_by_index(run, db):
+    for scope in ("week", "last_week", "30d"):
+        first_day, end_day, weeks, include_live = main.leaderboard_window(scope)
+        nodes = plan_nodes(
+            run, db, main.LEADERBOARD_QUERY, first_day, end_day, weeks, include_live, main.LEADERBOARD_PAGE_SIZE, 0,
+        )
+        assert_indexed(nodes, "member_daily_tasks")
+        assert not any((n.get("Relation Name") or "").startswith("task_logs") for n in nodes), scope
+
+
+def test_promotion_active_weeks_read_the_daily_rollup(run, db, busy_member):
+    nodes = plan_nodes(run, db, main.PROMOTION_ACTIVE_WEEKS_QUERY, busy_member)
+    assert_indexed(nodes, "member_daily_tasks", "member_daily_tasks_member_idx")
+    expected = run(db.fetchval(
+        "SELECT COUNT(DISTINCT to_char(md_quota_day(timestamp), 'IYYY-IW')) FROM task_logs WHERE member_id=$1", busy_member
+    ))
+    assert run(db.fetchval(main.PROMOTION_ACTIVE_WEEKS_QUERY, busy_member)) == expected
+
+
+def test_strike_lookups_use_member_indexes(run, db, busy_member):
+    now = main.utcnow()
+    for query in (main.ACTIVE_STRIKE_COUNT_QUERY, main.ACTIVE_STRIKES_QUERY):
+        assert_indexed(plan_nodes(run, db, query, busy_member, now), "strikes", "strikes_member_expires_idx")
+    assert_indexed(
+        plan_nodes(run, db, main.RECENT_STRIKE_COUNT_QUERY, busy_member, days_ago(30)),
+        "strikes", "strikes_member_issued_idx",
+    )
+
+
+def test_orientation_loop_uses_pending_index(run, db):
+    nodes = plan_nodes(run, db, main.PENDING_ORIENTATIONS_QUERY)
+    assert_indexed(nodes, "orientations", "orientations_pending_idx")
@@ -0,0 +1,49 @@
+# acquire_read must only route to a replica that is streaming and close behind the primary.
+
+import main
+
+from conftest import FakePool
+
+
+class ReplicaConnection:
+    """Answers REPLICA_LAG_QUERY with a fixed streaming state and lag."""
+
+    def __init__(self, streaming, lag):
+        self.row = {"streaming": streaming, "lag": lag}
+
+    async def fetchrow(self, query, *args, timeout=None):
+        assert query == main.REPLICA_LAG_QUERY
+        return self.row
+
+
+def read_target(run, monkeypatch, replica_conn):
+    primary = object()
+    monkeypatch.setattr(main.bot, "db_pool", FakePool(primary))
+    monkeypatch.setattr(main.bot, "replica_pool", FakePool(replica_conn))
+    monkeypatch.setattr(main.bot, "_replica_lag", 0.0)
+    monkeypatch.setattr(main.bot, "_replica_checked_at", 0.0)
+
+    async def acquire():
+        async with main.bot.acquire_read() as conn:
+            return "primary" if conn is primary else "replica"
+
+    return run(acquire())
+
+
+def test_caught_up_replica_serves_reads(run, monkeypatch):
+    assert read_target(run, monkeypatch, ReplicaConnection(True, 0)) == "replica"
+    assert read_target(run, monkeypatch, ReplicaConnection(True, main.REPLICA_MAX_LAG_SECONDS - 1)) == "replica"
+
+
+def test_lagging_replica_routes_reads_to_primary(run, monkeypatch):
+    assert read_target(run, monkeypatch, ReplicaConnection(True, main.REPLICA_MAX_LAG_SECONDS + 30)) == "primary"
+
+
+def test_replica_that_stopped_streaming_routes_reads_to_primary(run, monkeypatch):
+    # Replay equals receive on a disconnected standby, so its lag reads as zero.
+    assert read_target(run, monkeypatch, ReplicaConnection(False, 0)) == "primary"
+
+
+def test_lag_query_treats_a_primary_as_current(run, db):
+    row = run(db.fetchrow(main.REPLICA_LAG_QUERY))
+    assert row["streaming"] and row["lag"] == 0
@@ -0,0 +1,25 @@
+# Payload archiving must never clear a hot row it did not store.
+
+import datetime
+
+import main
+
+
+def test_archive_overwrites_a_leftover_payload_before_clearing(db, run):
+    oldest = run(db.fetchrow(
+        "SELECT log_id, timestamp, proof_url, comments FROM task_logs ORDER BY timestamp, log_id LIMIT 1"
+    ))
+    run(db.execute(
+        "INSERT INTO task_log_payloads (log_id, timestamp, proof_url, comments) VALUES ($1, $2, 'stale', 'stale')",
+        oldest["log_id"], oldest["timestamp"],
+    ))
+    cutoff = oldest["timestamp"] + datetime.timedelta(microseconds=1)
+    assert run(main.archive_task_log_payloads(db, cutoff)) >= 1
+    hot = run(db.fetchrow(
+        "SELECT proof_url, comments FROM task_logs WHERE log_id = $1 AND timestamp = $2", oldest["log_id"], oldest["timestamp"]
+    ))
+    assert hot["proof_url"] is None and hot["comments"] is None
+    history = run(db.fetchrow(
+        "SELECT proof_url, comments, archived FROM task_log_history WHERE log_id = $1", oldest["log_id"]
+    ))
+    assert (history["proof_url"], history["comments"], history["archived"]) == (oldest["proof_url"], oldest["comments"], True)
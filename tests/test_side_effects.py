@@ -0,0 +1,80 @@
+# Retried side effects must not repost what already went out.
+
+import discord
+
+import main
+
+
+class FlakyChannel:
+    """Accepts every message except the second, which fails once."""
+
+    def __init__(self):
+        self.posted: list[str] = []
+        self.calls = 0
+
+    async def send(self, *, embed: discord.Embed):
+        self.calls += 1
+        if self.calls == 2:
+            raise ConnectionError("gateway hiccup")
+        self.posted.append(embed.description)
+
+
+def test_retried_long_embed_resumes_at_the_failed_part(run):
+    channel = FlakyChannel()
+    embeds = main.build_long_embeds("Log", "word " * 2000, discord.Color.green(), "footer")
+    assert len(embeds) > 2
+    pipeline = main.SideEffectPipeline(concurrency=1, base_delay=0)
+
+    async def go():
+        pipeline.submit(1, "embed", main.ResumableSend(channel, embeds))
+        await pipeline.join()
+
+    run(go())
+    assert channel.posted == [e.description for e in embeds]
+
+
+class RecordingMessage:
+    def __init__(self, embed: discord.Embed):
+        self.description = embed.description
+        self.edits: list[str] = []
+
+    async def edit(self, *, embed: discord.Embed):
+        self.edits.append(embed.description)
+
+
+class RecordingChannel:
+    def __init__(self):
+        self.messages: list[RecordingMessage] = []
+
+    async def send(self, *, embed: discord.Embed):
+        self.messages.append(RecordingMessage(embed))
+        return self.messages[-1]
+
+
+def test_duplicate_proof_flag_lands_on_the_log_embed(run):
+    warning = "⚠️ **Possible duplicate proof:** exact copy of log #1 by <@2>."
+    pipeline = main.SideEffectPipeline(concurrency=1, base_delay=0)
+
+    def log_embed(channel):
+        return main.ResumableSend(channel, main.build_long_embeds("✅ Task Logged", "Proof", discord.Color.green(), None))
+
+    # Flagged before the post goes out: the log is posted with the warning.
+    early = RecordingChannel()
+    early_send = log_embed(early)
+    run(early_send.flag(warning, discord.Color.orange()))
+    # Flagged after it went out: the posted log is edited, once even if retried.
+    late = RecordingChannel()
+    late_send = log_embed(late)
+
+    async def go():
+        pipeline.submit(1, "embed", early_send)
+        pipeline.submit(2, "embed", late_send)
+        pipeline.submit(2, "flag", lambda: late_send.flag(warning, discord.Color.orange()))
+        pipeline.submit(2, "flag again", lambda: late_send.flag(warning, discord.Color.orange()))
+        await pipeline.join()
+
+    run(go())
+    assert [m.description for m in early.messages] == [f"{warning}\n\nProof"]
+    assert [m.description for m in late.messages] == ["Proof"]
+    assert late.messages[0].edits == [f"{warning}\n\nProof"] * 2
+    assert late_send.embeds[0].colour == discord.Color.orange()
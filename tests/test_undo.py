@@ -0,0 +1,82 @@
+# /tasks undo against the seeded database: what it deletes and what it leaves in the rollups.
+
+import datetime
+
+import main
+
+from conftest import days_ago
+
+MEMBER = 9_200_001
+
+
+async def log_tasks(conn, task_type: str, stamps: list[datetime.datetime], batch: bool = False) -> list[int]:
+    batch_id = await conn.fetchval("SELECT nextval('task_log_batch_seq')") if batch else None
+    rows = await conn.fetch(
+        "INSERT INTO task_logs (member_id, task, task_type, timestamp, week_key, batch_id) "
+        "SELECT $1, $2, $2, ts, to_char((ts AT TIME ZONE 'UTC') + interval '20 hours', 'IYYY-\"W\"IW'), "
+        "       COALESCE($4, nextval('task_log_batch_seq')) "
+        "FROM unnest($3::timestamptz[]) ts RETURNING log_id",
+        MEMBER, task_type, stamps, batch_id,
+    )
+    return [r["log_id"] for r in rows]
+
+
+async def rollup_rows(conn) -> tuple[list, list]:
+    totals = await conn.fetch(
+        "SELECT normalized_type, task_type, count, first_at, last_at FROM member_task_totals "
+        "WHERE member_id = $1 ORDER BY normalized_type", MEMBER,
+    )
+    daily = await conn.fetch("SELECT day, count FROM member_daily_tasks WHERE member_id = $1 ORDER BY day", MEMBER)
+    return [tuple(r) for r in totals], [tuple(r) for r in daily]
+
+
+def test_undos_leave_the_rollups_as_a_rebuild_would(rollback):
+    week_start, week_end = main.quota_week_bounds(main.quota_week_key())
+    minute = datetime.timedelta(minutes=1)
+    old_checkups = [days_ago(20), days_ago(10)]
+    interviews = [week_start + minute, week_start + 2 * minute, week_start + 3 * minute]
+
+    async def body(conn):
+        await log_tasks(conn, "Checkup", old_checkups)
+        batch_a = await log_tasks(conn, "Interview", interviews, batch=True)
+        await log_tasks(conn, "Checkup", [week_start + 4 * minute])
+        await log_tasks(conn, "Checkup", [week_start + 5 * minute])
+        await log_tasks(conn, "Checkup", [main.utcnow() - minute] * 2, batch=True)
+
+        undone = []
+        for kwargs in ({"last_batch": True}, {"count": 2}, {"log_range": (batch_a[0], batch_a[1])}):
+            removed = await main.undo_task_logs(conn, MEMBER, week_start, week_end, **kwargs)
+            undone.append(len(removed))
+        maintained = await rollup_rows(conn)
+        await main.rebuild_member_task_totals(conn)
+        await main.rebuild_member_daily_tasks(conn)
+        return undone, maintained, await rollup_rows(conn)
+
+    undone, (totals, daily), rebuilt = rollback(body)
+    assert undone == [2, 2, 2]
+    assert (totals, daily) == rebuilt
+    # first_at/last_at are re-derived from what is left, not kept from the deleted rows.
+    assert [(t[0], t[2], t[3], t[4]) for t in totals] == [
+        ("checkup", 2, old_checkups[0], old_checkups[1]),
+        ("interview", 1, interviews[2], interviews[2]),
+    ]
+
+
+def test_pre_batch_logs_are_undone_as_their_own_batch(rollback):
+    now = main.utcnow()
+    week_start, week_end = main.quota_week_bounds(main.quota_week_key(now))
+    big = 2**33
+
+    async def body(conn):
+        await conn.execute(
+            "INSERT INTO task_logs (log_id, member_id, task, task_type, timestamp, week_key, batch_id) "
+            "VALUES ($1, $2, 'Checkup', 'Checkup', $3, $4, NULL)",
+            big, MEMBER, now, main.quota_week_key(now),
+        )
+        removed = await main.undo_task_logs(conn, MEMBER, week_start, week_end, last_batch=True)
+        left = await conn.fetchval("SELECT count(*) FROM task_logs WHERE log_id = $1", big)
+        return removed, left
+
+    removed, left = rollback(body)
+    assert [r["log_id"] for r in removed] == [big]
+    assert not left
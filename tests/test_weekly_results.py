@@ -0,0 +1,73 @@
+# The SQL weekly report and the in-memory store must produce identical results.
+
+import datetime
+
+import main
+
+from conftest import FakePool
+
+# Labels Python and the database case-map differently (ß, İ) or only by case.
+EXTRA_TYPES = [("Straße Test", 30), ("STRASSE TEST", 5), ("İnterview", 12), ("Checkup", 7), ("checkup", 7)]
+
+
+def test_sql_results_match_the_in_memory_store(rollback, seeded_week):
+    catalog = main.TaskTypeCatalog()
+    for name, robux in EXTRA_TYPES:
+        catalog.apply(name, True, robux)
+    week_start, _ = main.quota_week_bounds(seeded_week)
+    store = main.WeeklyAggregateStore(catalog)
+    # Active members, members with only on-site time, and members with nothing at all.
+    member_ids = list(range(1000, 1600)) + [9_000_001, 9_000_002]
+
+    async def body(conn):
+        await conn.execute(
+            "INSERT INTO task_logs (member_id, task, task_type, timestamp, week_key) "
+            "SELECT 1000 + g % 40, t, t, $1::timestamptz + g * interval '1 minute', $2 "
+            "FROM generate_series(1, 500) g, LATERAL (SELECT ($3::text[])[1 + g % array_length($3, 1)] AS t) x",
+            week_start, seeded_week, [name for name, _ in EXTRA_TYPES],
+        )
+        await store.load(FakePool(conn))
+        return await main.fetch_weekly_results(conn, seeded_week, member_ids, catalog)
+
+    sql = rollback(body)
+    assert store.week_key == seeded_week
+    memory = main.weekly_results_from_stats(member_ids, store.members)
+    assert len(sql) == len(memory) == 602
+    assert {r["outcome"] for r in sql} >= {"below", "zero"}
+    assert any(r["robux"] for r in sql)
+    assert sql == memory
+
+
+def test_last_closed_quota_week_turns_over_at_the_sunday_reset():
+    sunday = datetime.datetime(2024, 3, 10, 4, 0, tzinfo=datetime.timezone.utc)
+    assert main.last_closed_quota_week(sunday) == main.week_key(sunday) == "2024-W10"
+    assert main.last_closed_quota_week(sunday - datetime.timedelta(minutes=1)) == "2024-W09"
+
+
+def test_election_catch_up_resumes_unfinished_and_missed_weeks(rollback, monkeypatch):
+    week = datetime.timedelta(days=7)
+    now = main.utcnow()
+    last_closed = main.last_closed_quota_week(now)
+    started = []
+
+    async def fake_start(weeks):
+        started.append(weeks)
+
+    monkeypatch.setattr(main, "start_weekly_close", fake_start)
+
+    async def body(conn):
+        monkeypatch.setattr(main.bot, "db_pool", FakePool(conn))
+        await conn.execute("DELETE FROM weekly_runs")
+        # A fresh install has nothing to catch up on.
+        await main.catch_up_weekly_close()
+        await conn.execute(
+            "INSERT INTO weekly_runs (week_key, completed_at) VALUES ($1, now()), ($2, NULL)",
+            main.last_closed_quota_week(now - 3 * week), main.last_closed_quota_week(now - 2 * week),
+        )
+        await main.catch_up_weekly_close()
+        await conn.execute("INSERT INTO weekly_runs (week_key, completed_at) VALUES ($1, now())", last_closed)
+        await conn.execute("UPDATE weekly_runs SET completed_at = now()")
+        await main.catch_up_weekly_close()
+
+    rollback(body)
+    assert started == [[main.last_closed_quota_week(now - 2 * week), last_closed]]
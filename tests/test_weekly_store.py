@@ -0,0 +1,127 @@
+# The in-memory weekly store must neither lose nor double count writes that race a reload.
+
+import asyncio
+import datetime
+
+import main
+
+from conftest import FakePool
+
+MEMBER = 9_100_001
+
+
+class PausingConnection:
+    """Proxies ``conn``, pausing once the load has read its snapshot until ``release`` is set."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.reading = asyncio.Event()
+        self.release = asyncio.Event()
+
+    def transaction(self, **kwargs):
+        return self.conn.transaction(**kwargs)
+
+    async def fetch(self, query: str, *args):
+        rows = await self.conn.fetch(query, *args)
+        if "roblox_time" in query:
+            self.reading.set()
+            await self.release.wait()
+        return rows
+
+
+async def log_task(conn, task_type: str, ts: datetime.datetime):
+    return await conn.fetchrow(
+        "INSERT INTO task_logs (member_id, task, task_type, timestamp, week_key) VALUES ($1, $2, $2, $3, $4) "
+        f"RETURNING log_id, timestamp, {main.CURRENT_XID_SQL} AS xid",
+        MEMBER, task_type, ts, main.quota_week_key(ts),
+    )
+
+
+async def close_session(conn, seconds: int) -> int:
+    return await conn.fetchval(
+        "INSERT INTO roblox_time (member_id, time_spent) VALUES ($1, $2) "
+        "ON CONFLICT (member_id) DO UPDATE SET time_spent = roblox_time.time_spent + $2 "
+        f"RETURNING {main.CURRENT_XID_SQL}",
+        MEMBER, seconds,
+    )
+
+
+async def undo(conn, log) -> int:
+    return await conn.fetchval(
+        f"DELETE FROM task_logs WHERE log_id = $1 AND timestamp = $2 RETURNING {main.CURRENT_XID_SQL}",
+        log["log_id"], log["timestamp"],
+    )
+
+
+async def cleanup(conn) -> None:
+    await conn.execute("DELETE FROM task_logs WHERE member_id = $1", MEMBER)
+    await conn.execute("DELETE FROM roblox_time WHERE member_id = $1", MEMBER)
+
+
+def test_writes_committed_after_the_snapshot_are_replayed(run, db, other_db):
+    store = main.WeeklyAggregateStore(main.TaskTypeCatalog())
+    now = main.utcnow()
+
+    async def go():
+        conn = PausingConnection(db)
+        load = asyncio.create_task(store.load(FakePool(conn)))
+        await conn.reading.wait()
+        kept = await log_task(other_db, "Checkup", now)
+        store.record_tasks(MEMBER, "Checkup", now, xid=kept["xid"])
+        undone = await log_task(other_db, "Interview", now)
+        store.record_tasks(MEMBER, "Interview", now, xid=undone["xid"])
+        store.record_tasks(MEMBER, "Interview", now, -1, xid=await undo(other_db, undone))
+        store.record_seconds(MEMBER, 120, now, xid=await close_session(other_db, 120))
+        conn.release.set()
+        await load
+
+    try:
+        run(go())
+    finally:
+        run(cleanup(other_db))
+    assert store.get(MEMBER).by_type == {"Checkup": 1}
+    assert store.get(MEMBER).seconds == 120
+
+
+def test_writes_committed_before_the_snapshot_are_not_replayed(run, db, other_db):
+    # A writer commits, then awaits (counts, pool release) before recording;
+    # the reload's snapshot already holds the change by then.
+    store = main.WeeklyAggregateStore(main.TaskTypeCatalog())
+    now = main.utcnow()
+
+    async def go():
+        kept = await log_task(other_db, "Checkup", now)
+        undone = await log_task(other_db, "Interview", now)
+        session_xid = await close_session(other_db, 300)
+        conn = PausingConnection(db)
+        load = asyncio.create_task(store.load(FakePool(conn)))
+        await conn.reading.wait()
+        store.record_tasks(MEMBER, "Checkup", now, xid=kept["xid"])
+        store.record_tasks(MEMBER, "Interview", now, xid=undone["xid"])
+        store.record_seconds(MEMBER, 300, now, xid=session_xid)
+        conn.release.set()
+        await load
+        assert store.get(MEMBER).by_type == {"Checkup": 1, "Interview": 1}
+        assert store.get(MEMBER).seconds == 300
+        # Undone before the next reload's snapshot, recorded while it reads.
+        undo_xid = await undo(other_db, undone)
+        conn = PausingConnection(db)
+        load = asyncio.create_task(store.load(FakePool(conn)))
+        await conn.reading.wait()
+        store.record_tasks(MEMBER, "Interview", now, -1, xid=undo_xid)
+        conn.release.set()
+        await load
+
+    try:
+        run(go())
+    finally:
+        run(cleanup(other_db))
+    assert store.get(MEMBER).by_type == {"Checkup": 1}
+    assert store.get(MEMBER).seconds == 300
+
+
+def test_sessions_from_another_week_are_ignored(run):
+    store = main.WeeklyAggregateStore(main.TaskTypeCatalog())
+    store.week_key = main.quota_week_key()
+    store.record_seconds(1, 300, main.utcnow() - datetime.timedelta(days=8), xid=1)
+    assert store.get(1).seconds == 0